@@ -0,0 +1,268 @@
+"""Offline agent-runner benchmark.
+
+Starts the stub LLM/API server and the agent runner (pointed at the stub via
+ANTHROPIC_BASE_URL and API_BASE_URL), drives `POST /run` at a fixed
+concurrency across every agent in `prompts/agents`, and reports latency
+percentiles, throughput, validation pass rate and event-emission overhead.
+No real tokens are spent.
+
+    cd apps/agent-runner
+    python bench/run_bench.py --requests 500 --concurrency 50 --latency-ms 800
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+RUNNER_DIR = Path(__file__).resolve().parents[1]
+PROMPTS_DIR = RUNNER_DIR.parents[1] / "prompts"
+
+
+def percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def wait_healthy(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{url}/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become healthy within {timeout}s")
+
+
+def start_processes(args, workdir: Path) -> list:
+    stub = subprocess.Popen(
+        [
+            sys.executable, str(RUNNER_DIR / "bench" / "stub_server.py"),
+            "--port", str(args.stub_port),
+            "--latency-dist", args.latency_dist,
+            "--latency-ms", str(args.latency_ms),
+            "--latency-sigma", str(args.latency_sigma),
+            "--event-latency-ms", str(args.event_latency_ms),
+            "--throttle-rate", str(args.throttle_rate),
+        ] + (["--fenced"] if args.fenced else []),
+    )
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    env = {
+        **os.environ,
+        "ANTHROPIC_API_KEY": "bench-stub-key",
+        "ANTHROPIC_BASE_URL": stub_url,
+        "API_BASE_URL": stub_url,
+        "PROMPTS_DIR": str(PROMPTS_DIR),
+        "OUTBOX_PATH": str(workdir / "outbox.sqlite3"),
+        "RESPONSE_CACHE_PATH": str(workdir / "cache.sqlite3"),
+    }
+    runner = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--port", str(args.runner_port), "--log-level", "warning",
+        ],
+        cwd=RUNNER_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL if args.quiet else None,
+    )
+    return [stub, runner]
+
+
+async def drive(args, runner_url: str, agents: list) -> list:
+    """Send `args.requests` runs with at most `args.concurrency` in flight."""
+    results = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(i)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=runner_url, limits=limits, timeout=300) as client:
+
+        async def worker():
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                agent = agents[i % len(agents)]
+                with_event = i % 2 == 0
+                body = {
+                    "agent_name": agent,
+                    "context": {
+                        "ticket_number": f"TCK-{i:06d}",
+                        "issue": "Kitchen faucet leaking under the sink",
+                        "priority": "routine",
+                        "history": [{"from": "tenant", "body": f"message {n}"} for n in range(5)],
+                    },
+                    "ticket_id": f"bench-{i}" if with_event else None,
+                    "use_cache": False,
+                }
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/run", json=body)
+                    elapsed = time.perf_counter() - started
+                    data = response.json() if response.status_code == 200 else {}
+                    results.append({
+                        "agent": agent,
+                        "ok": response.status_code == 200,
+                        "latency": elapsed,
+                        "validation_passed": data.get("validation_passed", False),
+                        "parse_error": bool(data.get("output", {}).get("parse_error")),
+                        "with_event": with_event,
+                        "run_id": data.get("run_id"),
+                        "completed_at": time.time(),
+                    })
+                except httpx.HTTPError as e:
+                    results.append({
+                        "agent": agent, "ok": False, "latency": time.perf_counter() - started,
+                        "error": str(e), "with_event": with_event,
+                    })
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return results
+
+
+async def collect_event_stats(stub_url: str, results: list, settle_seconds: float) -> dict:
+    """Wait for the outbox to drain, then measure event delivery lag."""
+    expected = sum(1 for r in results if r.get("with_event") and r.get("ok"))
+    async with httpx.AsyncClient() as client:
+        deadline = time.monotonic() + settle_seconds
+        stats = (await client.get(f"{stub_url}/stats")).json()
+        while stats["events"] < expected and time.monotonic() < deadline:
+            await asyncio.sleep(0.2)
+            stats = (await client.get(f"{stub_url}/stats")).json()
+    receipts = stats.pop("event_receipts")
+    lags = [
+        receipts[r["run_id"]] - r["completed_at"]
+        for r in results
+        if r.get("run_id") in receipts
+    ]
+    stats["events_expected"] = expected
+    stats["delivery_lag_p50_ms"] = round(percentile(lags, 50) * 1000, 1)
+    stats["delivery_lag_p99_ms"] = round(percentile(lags, 99) * 1000, 1)
+    return stats
+
+
+def summarize(results: list, wall_seconds: float, event_stats: dict) -> dict:
+    ok = [r for r in results if r["ok"]]
+    latencies = [r["latency"] for r in ok]
+    with_event = [r["latency"] for r in ok if r["with_event"]]
+    without_event = [r["latency"] for r in ok if not r["with_event"]]
+    per_agent = {}
+    for r in ok:
+        per_agent.setdefault(r["agent"], []).append(r["latency"])
+    return {
+        "requests": len(results),
+        "succeeded": len(ok),
+        "errors": len(results) - len(ok),
+        "wall_seconds": round(wall_seconds, 2),
+        "requests_per_second": round(len(ok) / wall_seconds, 1) if wall_seconds else 0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+            "mean": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0,
+        },
+        "validation_pass_rate": round(sum(r["validation_passed"] for r in ok) / len(ok), 4) if ok else 0,
+        "parse_error_rate": round(sum(r["parse_error"] for r in ok) / len(ok), 4) if ok else 0,
+        "event_emission": {
+            "p50_ms_with_event": round(percentile(with_event, 50) * 1000, 1),
+            "p50_ms_without_event": round(percentile(without_event, 50) * 1000, 1),
+            "overhead_p50_ms": round((percentile(with_event, 50) - percentile(without_event, 50)) * 1000, 1),
+            **event_stats,
+        },
+        "per_agent_p50_ms": {
+            agent: round(percentile(samples, 50) * 1000, 1)
+            for agent, samples in sorted(per_agent.items())
+        },
+    }
+
+
+def print_report(report: dict) -> None:
+    lat = report["latency_ms"]
+    ev = report["event_emission"]
+    print()
+    print(f"requests        {report['succeeded']}/{report['requests']} ok, {report['errors']} errors")
+    print(f"throughput      {report['requests_per_second']} req/s over {report['wall_seconds']}s")
+    print(f"latency         p50 {lat['p50']}ms  p95 {lat['p95']}ms  p99 {lat['p99']}ms  mean {lat['mean']}ms")
+    print(f"validation      {report['validation_pass_rate']:.2%} passed, {report['parse_error_rate']:.2%} parse errors")
+    print(f"event overhead  p50 {ev['overhead_p50_ms']}ms "
+          f"(with {ev['p50_ms_with_event']}ms / without {ev['p50_ms_without_event']}ms)")
+    print(f"event delivery  {ev['events']}/{ev['events_expected']} in {ev['event_posts']} posts, "
+          f"lag p50 {ev['delivery_lag_p50_ms']}ms p99 {ev['delivery_lag_p99_ms']}ms")
+    print("per agent p50   " + ", ".join(f"{a} {ms}ms" for a, ms in report["per_agent_p50_ms"].items()))
+
+
+async def main_async(args) -> dict:
+    agents = sorted(p.stem for p in (PROMPTS_DIR / "agents").glob("*.md"))
+    if args.agents:
+        agents = [a for a in agents if a in args.agents.split(",")]
+    with tempfile.TemporaryDirectory() as workdir:
+        processes = start_processes(args, Path(workdir))
+        try:
+            stub_url = f"http://127.0.0.1:{args.stub_port}"
+            runner_url = f"http://127.0.0.1:{args.runner_port}"
+            await wait_healthy(stub_url)
+            await wait_healthy(runner_url)
+
+            if args.warmup:
+                warm = argparse.Namespace(**{**vars(args), "requests": args.warmup})
+                await drive(warm, runner_url, agents)
+                async with httpx.AsyncClient() as client:
+                    await client.post(f"{stub_url}/stats/reset")
+
+            started = time.perf_counter()
+            results = await drive(args, runner_url, agents)
+            wall = time.perf_counter() - started
+            event_stats = await collect_event_stats(stub_url, results, args.settle_seconds)
+            return summarize(results, wall, event_stats)
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--agents", default="", help="Comma-separated subset of agents")
+    parser.add_argument("--latency-dist", default="lognormal",
+                        choices=["fixed", "uniform", "exponential", "lognormal"])
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--event-latency-ms", type=float, default=20.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--fenced", action="store_true")
+    parser.add_argument("--stub-port", type=int, default=8099)
+    parser.add_argument("--runner-port", type=int, default=8098)
+    parser.add_argument("--settle-seconds", type=float, default=15.0,
+                        help="How long to wait for queued events to be delivered")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--quiet", action="store_true", help="Silence runner output")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
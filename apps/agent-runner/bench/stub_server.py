@@ -0,0 +1,270 @@
+"""Stub LLM + API server for offline agent-runner benchmarks.
+
+Serves an Anthropic-compatible `POST /v1/messages` (plain and streaming)
+that returns a canned JSON output per agent after a configurable latency,
+plus fake `POST /events` and `POST /events/batch` endpoints so the runner's
+event emission can be measured without the real API.
+
+Canned outputs come from the "Output Format" JSON block in each
+`prompts/agents/*.md`; the agent is identified by its prompt's first line.
+System blocks marked with `cache_control` are reported as prompt-cache
+writes the first time they are seen and as cache reads afterwards.
+
+    python bench/stub_server.py --port 8099 --latency-ms 800 --latency-dist lognormal
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+DEFAULT_PROMPTS_DIR = Path(__file__).resolve().parents[3] / "prompts"
+OUTPUT_BLOCK_RE = re.compile(r"## Output Format\s*```json\s*([\s\S]*?)```")
+
+
+def load_canned_outputs(prompts_dir: Path) -> dict:
+    """Map each agent prompt's first line to (agent name, canned output text)."""
+    canned = {}
+    for prompt_file in sorted((prompts_dir / "agents").glob("*.md")):
+        text = prompt_file.read_text()
+        output = {}
+        match = OUTPUT_BLOCK_RE.search(text)
+        if match:
+            try:
+                output = json.loads(match.group(1))
+            except json.JSONDecodeError:
+                output = {}
+        output["decision_summary"] = output.get("decision_summary") or (
+            f"Stub decision for {prompt_file.stem}."
+        )
+        output.setdefault("next_actions", [])
+        output.setdefault("escalation_required", False)
+        output.setdefault("audit_events", [])
+        canned[text.splitlines()[0].strip()] = (prompt_file.stem, json.dumps(output, indent=2))
+    return canned
+
+
+class LatencyModel:
+    """Sample response latency in seconds from a named distribution."""
+
+    def __init__(self, dist: str, mean_ms: float, sigma: float):
+        self.dist = dist
+        self.mean = mean_ms / 1000
+        self.sigma = sigma
+
+    def sample(self) -> float:
+        if self.mean <= 0:
+            return 0.0
+        if self.dist == "fixed":
+            return self.mean
+        if self.dist == "uniform":
+            return random.uniform(self.mean * (1 - self.sigma), self.mean * (1 + self.sigma))
+        if self.dist == "exponential":
+            return random.expovariate(1 / self.mean)
+        # lognormal with the requested mean
+        mu = math.log(self.mean) - self.sigma ** 2 / 2
+        return random.lognormvariate(mu, self.sigma)
+
+
+def create_app(
+    prompts_dir: Path = DEFAULT_PROMPTS_DIR,
+    llm_latency: LatencyModel = LatencyModel("fixed", 0, 0),
+    event_latency: LatencyModel = LatencyModel("fixed", 0, 0),
+    throttle_rate: float = 0.0,
+    fenced: bool = False,
+) -> FastAPI:
+    app = FastAPI(title="Agent Runner Bench Stub")
+    canned = load_canned_outputs(prompts_dir)
+    stats = {
+        "messages": 0,
+        "throttled": 0,
+        "by_agent": {},
+        "event_posts": 0,
+        "events": 0,
+        "event_receipts": {},
+    }
+    cached_prefixes = set()
+
+    def prompt_usage(system, messages: list) -> dict:
+        """Token counts, treating everything up to the last cache breakpoint as cacheable."""
+        blocks = system if isinstance(system, list) else [{"type": "text", "text": system or ""}]
+        prefix, cacheable = "", 0
+        for block in blocks:
+            prefix += block.get("text", "")
+            if block.get("cache_control"):
+                cacheable = len(prefix) // 4
+        rest = len(prefix) // 4 - cacheable + len(json.dumps(messages)) // 4
+        usage = {"input_tokens": rest, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        if cacheable:
+            key = hash(prefix[:cacheable * 4])
+            field = "cache_read_input_tokens" if key in cached_prefixes else "cache_creation_input_tokens"
+            usage[field] = cacheable
+            cached_prefixes.add(key)
+        return usage
+
+    def canned_for(system) -> tuple:
+        if isinstance(system, list):
+            system = "".join(block.get("text", "") for block in system)
+        system = system or ""
+        # Policies may be placed before the agent instructions
+        for first_line, value in canned.items():
+            if first_line in system:
+                return value
+        return "unknown", json.dumps({
+            "decision_summary": "Stub decision.",
+            "next_actions": [],
+            "escalation_required": False,
+            "audit_events": [],
+        })
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        if throttle_rate and random.random() < throttle_rate:
+            stats["throttled"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": "1"},
+                content={"type": "error", "error": {"type": "rate_limit_error", "message": "stub throttle"}},
+            )
+
+        agent, text = canned_for(body.get("system"))
+        if fenced:
+            text = f"```json\n{text}\n```"
+        stats["messages"] += 1
+        stats["by_agent"][agent] = stats["by_agent"].get(agent, 0) + 1
+        usage = {**prompt_usage(body.get("system"), body.get("messages", [])), "output_tokens": len(text) // 4}
+        message_id = f"msg_{uuid.uuid4().hex[:24]}"
+        latency = llm_latency.sample()
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency)
+            return {
+                "id": message_id,
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model"),
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": usage,
+            }
+
+        async def stream():
+            def sse(event: str, data: dict) -> str:
+                return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+            yield sse("message_start", {
+                "type": "message_start",
+                "message": {
+                    "id": message_id, "type": "message", "role": "assistant",
+                    "model": body.get("model"), "content": [], "stop_reason": None,
+                    "stop_sequence": None,
+                    "usage": {**usage, "output_tokens": 0},
+                },
+            })
+            yield sse("content_block_start", {
+                "type": "content_block_start", "index": 0,
+                "content_block": {"type": "text", "text": ""},
+            })
+            chunks = [text[i:i + 16] for i in range(0, len(text), 16)] or [""]
+            for chunk in chunks:
+                await asyncio.sleep(latency / len(chunks))
+                yield sse("content_block_delta", {
+                    "type": "content_block_delta", "index": 0,
+                    "delta": {"type": "text_delta", "text": chunk},
+                })
+            yield sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+            yield sse("message_delta", {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": usage["output_tokens"]},
+            })
+            yield sse("message_stop", {"type": "message_stop"})
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    def record_events(events: list) -> None:
+        now = time.time()
+        stats["event_posts"] += 1
+        stats["events"] += len(events)
+        for event in events:
+            run_id = (event.get("payload") or {}).get("run_id")
+            if run_id:
+                stats["event_receipts"][run_id] = now
+
+    @app.post("/events")
+    async def events(request: Request):
+        await asyncio.sleep(event_latency.sample())
+        record_events([await request.json()])
+        return {"decision_summary": "stub"}
+
+    @app.post("/events/batch")
+    async def events_batch(request: Request):
+        await asyncio.sleep(event_latency.sample())
+        events = (await request.json()).get("events", [])
+        record_events(events)
+        return {
+            "processed": len(events),
+            "duplicates": 0,
+            "rejected": 0,
+            "failed": 0,
+            "results": [
+                {"index": i, "run_id": event.get("run_id"), "status": "processed",
+                 "result": {"decision_summary": "stub"}}
+                for i, event in enumerate(events)
+            ],
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        stats.update(messages=0, throttled=0, by_agent={}, event_posts=0, events=0, event_receipts={})
+        return stats
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy", "service": "bench-stub"}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--prompts-dir", type=Path, default=DEFAULT_PROMPTS_DIR)
+    parser.add_argument("--latency-dist", default="lognormal",
+                        choices=["fixed", "uniform", "exponential", "lognormal"])
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Mean LLM latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--event-latency-ms", type=float, default=20.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="Fraction of LLM calls answered with 429")
+    parser.add_argument("--fenced", action="store_true",
+                        help="Wrap outputs in ```json fences to exercise the fallback parser")
+    args = parser.parse_args()
+
+    app = create_app(
+        prompts_dir=args.prompts_dir,
+        llm_latency=LatencyModel(args.latency_dist, args.latency_ms, args.latency_sigma),
+        event_latency=LatencyModel("fixed", args.event_latency_ms, 0),
+        throttle_rate=args.throttle_rate,
+        fenced=args.fenced,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
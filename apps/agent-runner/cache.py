@@ -0,0 +1,210 @@
+"""Response cache - content-addressed storage of validated agent outputs."""
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+def cache_key(agent_name: str, content_hash: str, model: str, context: dict) -> str:
+    """Hash the agent, its prompt/policy/schema content, the model and the
+    canonicalized context into a stable cache key."""
+    canonical = json.dumps(
+        {
+            "agent": agent_name,
+            "content_hash": content_hash,
+            "model": model,
+            "context": context,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def parse_agent_ttls(spec: str) -> Dict[str, float]:
+    """Parse `agent=seconds,agent=seconds` into a dict."""
+    ttls = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, seconds = item.split("=", 1)
+        ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: dict, ttl: float) -> int:
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskBackend:
+    """SQLite-backed LRU so cached outputs survive a runner restart."""
+
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)"
+        )
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict, ttl: float) -> int:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, default=str), now + ttl, now),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                return overflow
+        return 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return count
+
+
+class ResponseCache:
+    """Opt-in cache of agent results with per-agent TTLs and hit/miss counters.
+
+    A TTL of 0 for an agent disables caching for that agent.
+    """
+
+    def __init__(self, backend, default_ttl: float, agent_ttls: Optional[Dict[str, float]] = None):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.agent_ttls = agent_ttls or {}
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+        self.evictions = 0
+
+    def ttl_for(self, agent_name: str) -> float:
+        return self.agent_ttls.get(agent_name, self.default_ttl)
+
+    async def _call(self, fn, *args):
+        if self.backend.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def get(self, agent_name: str, key: str) -> Optional[dict]:
+        value = await self._call(self.backend.get, key)
+        if value is None:
+            self.misses[agent_name] += 1
+        else:
+            self.hits[agent_name] += 1
+        return value
+
+    async def set(self, agent_name: str, key: str, value: dict) -> None:
+        ttl = self.ttl_for(agent_name)
+        if ttl <= 0:
+            return
+        self.evictions += await self._call(self.backend.set, key, value, ttl)
+
+    async def clear(self) -> None:
+        await self._call(self.backend.clear)
+
+    async def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": await self._call(self.backend.__len__),
+            "evictions": self.evictions,
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+        }
+
+
+def build_response_cache(
+    backend: str,
+    path: str,
+    max_entries: int,
+    default_ttl: float,
+    agent_ttls: str,
+) -> ResponseCache:
+    """Construct a ResponseCache from settings values."""
+    if backend == "disk":
+        store = DiskBackend(path, max_entries)
+    elif backend == "memory":
+        store = MemoryBackend(max_entries)
+    else:
+        raise ValueError(f"Unknown response cache backend: {backend}")
+    logger.info("Response cache enabled", backend=backend, max_entries=max_entries)
+    return ResponseCache(store, default_ttl, parse_agent_ttls(agent_ttls))
@@ -0,0 +1,169 @@
+"""Context encoder - compact, allowlisted and token-budgeted agent context."""
+from dataclasses import dataclass
+from typing import Iterable, Optional
+import json
+
+from scheduler import estimate_tokens
+
+# Arrays are trimmed from the front (oldest entries first) but keep at least this many items
+MIN_ARRAY_ITEMS = 2
+# Strings longer than this are clipped once arrays can no longer be trimmed
+MAX_STRING_CHARS = 2000
+
+
+@dataclass
+class EncodedContext:
+    context: dict
+    text: str
+    tokens: int
+    tokens_saved: int
+    truncated: bool
+
+
+def select_fields(context: dict, fields: Iterable[str]) -> dict:
+    """Keep only allowlisted fields. Dotted paths (`scope.scope_line_items`)
+    keep a single key of a nested object."""
+    spec: dict = {}
+    for path in fields:
+        node = spec
+        parts = path.split(".")
+        for part in parts[:-1]:
+            child = node.setdefault(part, {})
+            if child is True:
+                break
+            node = child
+        else:
+            node[parts[-1]] = True
+
+    def apply(value, node):
+        if node is True or not isinstance(value, dict):
+            return value
+        return {key: apply(value[key], child) for key, child in node.items() if key in value}
+
+    return apply(context, spec)
+
+
+def prune(value, exclude: frozenset):
+    """Drop nulls, empty strings/collections and excluded keys at any depth."""
+    if isinstance(value, dict):
+        pruned = {}
+        for key, item in value.items():
+            if key in exclude:
+                continue
+            item = prune(item, exclude)
+            if item is None or item == "" or item == [] or item == {}:
+                continue
+            pruned[key] = item
+        return pruned
+    if isinstance(value, list):
+        items = [prune(item, exclude) for item in value]
+        return [item for item in items if item is not None and item != "" and item != [] and item != {}]
+    return value
+
+
+def dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _largest_array(value, path=()):
+    """Return (serialized length, path) of the largest trimmable array."""
+    best = None
+    if isinstance(value, dict):
+        children = value.items()
+    elif isinstance(value, list):
+        if sum(1 for item in value if not _is_marker(item)) > MIN_ARRAY_ITEMS:
+            best = (len(dumps(value)), path)
+        children = enumerate(value)
+    else:
+        return None
+    for key, child in children:
+        found = _largest_array(child, path + (key,))
+        if found and (best is None or found[0] > best[0]):
+            best = found
+    return best
+
+
+def _longest_string(value, path=()):
+    best = None
+    if isinstance(value, str):
+        return (len(value), path) if len(value) > MAX_STRING_CHARS else None
+    if isinstance(value, dict):
+        children = value.items()
+    elif isinstance(value, list):
+        children = enumerate(value)
+    else:
+        return None
+    for key, child in children:
+        found = _longest_string(child, path + (key,))
+        if found and (best is None or found[0] > best[0]):
+            best = found
+    return best
+
+
+def _replace(value, path, new):
+    if not path:
+        return new
+    value[path[0]] = _replace(value[path[0]], path[1:], new)
+    return value
+
+
+def _get(value, path):
+    for key in path:
+        value = value[key]
+    return value
+
+
+def fit_budget(context: dict, max_tokens: int) -> bool:
+    """Trim oversized arrays (oldest items first), then long strings, until the
+    encoded context fits `max_tokens`. Mutates `context`; returns True if trimmed."""
+    truncated = False
+    while estimate_tokens(dumps(context)) > max_tokens:
+        found = _largest_array(context)
+        if found:
+            items = _get(context, found[1])
+            kept = [item for item in items if not _is_marker(item)]
+            keep = max(MIN_ARRAY_ITEMS, len(kept) // 2)
+            omitted = len(items) - keep - (1 if items and _is_marker(items[0]) else 0)
+            previously = items[0]["_omitted_items"] if items and _is_marker(items[0]) else 0
+            _replace(context, found[1], [{"_omitted_items": previously + omitted}] + kept[-keep:])
+            truncated = True
+            continue
+        found = _longest_string(context)
+        if found:
+            text = _get(context, found[1])
+            suffix = f"... [{len(text)} chars, truncated]"
+            _replace(context, found[1], text[:MAX_STRING_CHARS - len(suffix)] + suffix)
+            truncated = True
+            continue
+        break
+    return truncated
+
+
+def _is_marker(item) -> bool:
+    return isinstance(item, dict) and "_omitted_items" in item
+
+
+def encode_context(
+    context: dict,
+    fields: Optional[Iterable[str]] = None,
+    exclude: Iterable[str] = (),
+    max_tokens: int = 0,
+) -> EncodedContext:
+    """Encode agent context compactly: apply the allowlist, drop empty values
+    and excluded keys, fit the token budget (0 = unlimited), and estimate the
+    tokens saved against the previous pretty-printed encoding."""
+    baseline = estimate_tokens(json.dumps(context, indent=2, default=str))
+    selected = select_fields(context, fields) if fields else context
+    encoded = prune(selected, frozenset(exclude))
+    # Round-trip so budget trimming never mutates the caller's objects
+    encoded = json.loads(dumps(encoded))
+    truncated = fit_budget(encoded, max_tokens) if max_tokens > 0 else False
+    text = dumps(encoded)
+    tokens = estimate_tokens(text)
+    return EncodedContext(
+        context=encoded,
+        text=text,
+        tokens=tokens,
+        tokens_saved=max(0, baseline - tokens),
+        truncated=truncated,
+    )
@@ -1,16 +1,35 @@
 """Agent Runner Service - Loads prompts, calls Claude, validates output, emits events."""
+from collections import defaultdict
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic_settings import BaseSettings
-from typing import Optional
 from pathlib import Path
+from typing import Optional, Tuple
+import asyncio
 import json
+import re
+import time
+import uuid
 
 import anthropic
 import httpx
 import jsonschema
 import structlog
 
+from cache import build_response_cache, cache_key
+from context import EncodedContext, encode_context
+import metrics
+from outbox import EventOutbox
+from pipeline import run_pipeline
+from registry import AgentDefinition, PromptRegistry
+from scheduler import LLMScheduler, estimate_tokens, priority_from_context
+from streaming import IncrementalObjectParser
+from schemas import (
+    AgentBatchRequest, AgentRequest, AgentResponse, LLMUsage, PipelineRequest, PipelineResponse,
+)
+from usage import UsageLedger, UsagePrices, usage_from_response
+
 structlog.configure(
     processors=[
         structlog.processors.TimeStamper(fmt="iso"),
@@ -24,179 +43,611 @@ logger = structlog.get_logger()
 class Settings(BaseSettings):
     anthropic_api_key: str = ""
     api_base_url: str = "http://localhost:8000"
+    anthropic_model: str = "claude-sonnet-4-20250514"
+    anthropic_base_url: str = ""  # point at a stub model server for local testing
     prompts_dir: str = "../../prompts"
+    prompts_reload_interval_seconds: float = 2.0
+
+    # Context encoding budget per run, in estimated tokens (0 = unlimited);
+    # agents can override it in prompts/context/allowlists.json
+    context_max_tokens: int = 8000
+
+    # Prompt caching and usage accounting (prices in USD per million tokens)
+    prompt_caching_enabled: bool = True
+    llm_input_cost_per_mtok: float = 3.0
+    llm_output_cost_per_mtok: float = 15.0
+    usage_max_tickets: int = 10000
+
+    # Concurrency and connection pooling
+    llm_max_concurrency: int = 32
+    llm_timeout_seconds: float = 120.0
+    llm_max_retries: int = 0  # SDK-level retries; throttling is retried by the scheduler
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    event_timeout_seconds: float = 10.0
+
+    # Event outbox
+    outbox_path: str = "data/event_outbox.sqlite3"
+    outbox_batch_size: int = 100
+    outbox_flush_interval_seconds: float = 1.0
+
+    # LLM scheduler (0 = unlimited)
+    llm_requests_per_minute: int = 0
+    llm_tokens_per_minute: int = 0
+    llm_estimated_output_tokens: int = 1024
+    llm_throttle_max_retries: int = 4
+    llm_backoff_base_seconds: float = 1.0
+    llm_backoff_max_seconds: float = 60.0
+
+    # Batch execution
+    batch_max_size: int = 500
+    batch_max_concurrency: int = 16
+    batch_per_agent_concurrency: int = 8
+
+    # Response cache (opt-in)
+    response_cache_enabled: bool = False
+    response_cache_backend: str = "memory"  # memory | disk
+    response_cache_path: str = ".cache/agent_responses.sqlite3"
+    response_cache_max_entries: int = 1024
+    response_cache_ttl_seconds: float = 3600.0
+    response_cache_agent_ttls: str = ""  # e.g. "intake_triage=900,scope_drafting=3600"
 
     class Config:
         env_file = "../../.env"
 
 
 settings = Settings()
-app = FastAPI(title="Agent Runner", version="0.1.0")
 
-# Load prompts from files
 PROMPTS_DIR = Path(settings.prompts_dir)
-AGENTS_DIR = PROMPTS_DIR / "agents"
-SCHEMAS_DIR = PROMPTS_DIR / "schemas"
-POLICIES_DIR = PROMPTS_DIR / "policies"
+JSON_FENCE_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)```")
+USAGE_PRICES = UsagePrices(settings.llm_input_cost_per_mtok, settings.llm_output_cost_per_mtok)
 
 
-def load_prompt(agent_name: str) -> str:
-    """Load an agent's system prompt from the prompts directory."""
-    prompt_file = AGENTS_DIR / f"{agent_name}.md"
-    if not prompt_file.exists():
-        raise FileNotFoundError(f"Prompt file not found: {prompt_file}")
-    return prompt_file.read_text()
-
+def build_http_limits() -> httpx.Limits:
+    """Connection pool limits shared by the LLM and API clients."""
+    return httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+    )
 
-def load_schema(schema_name: str) -> dict:
-    """Load a JSON schema for output validation."""
-    schema_file = SCHEMAS_DIR / f"{schema_name}.json"
-    if not schema_file.exists():
-        return {}
-    return json.loads(schema_file.read_text())
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create one async LLM client and one pooled HTTP client per process,
+    and load the prompt registry."""
+    app.state.registry = PromptRegistry(PROMPTS_DIR, settings.prompts_reload_interval_seconds)
+    app.state.registry.load()
+    watcher = None
+    if settings.prompts_reload_interval_seconds > 0:
+        watcher = asyncio.create_task(app.state.registry.watch())
 
-def load_policies() -> str:
-    """Load global policies."""
-    policies_file = POLICIES_DIR / "global_policies.md"
-    if policies_file.exists():
-        return policies_file.read_text()
-    return ""
+    app.state.http_client = httpx.AsyncClient(
+        limits=build_http_limits(),
+        timeout=settings.event_timeout_seconds,
+    )
+    app.state.llm_client = None
+    if settings.anthropic_api_key:
+        app.state.llm_client = anthropic.AsyncAnthropic(
+            api_key=settings.anthropic_api_key,
+            base_url=settings.anthropic_base_url or None,
+            max_retries=settings.llm_max_retries,
+            timeout=settings.llm_timeout_seconds,
+            http_client=httpx.AsyncClient(
+                limits=build_http_limits(),
+                timeout=settings.llm_timeout_seconds,
+            ),
+        )
+    app.state.scheduler = LLMScheduler(
+        max_concurrency=settings.llm_max_concurrency,
+        requests_per_minute=settings.llm_requests_per_minute,
+        tokens_per_minute=settings.llm_tokens_per_minute,
+        max_retries=settings.llm_throttle_max_retries,
+        backoff_base=settings.llm_backoff_base_seconds,
+        backoff_max=settings.llm_backoff_max_seconds,
+    )
+    app.state.usage = UsageLedger(max_tickets=settings.usage_max_tickets)
+    app.state.batch_semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+    app.state.agent_semaphores = defaultdict(
+        lambda: asyncio.Semaphore(settings.batch_per_agent_concurrency)
+    )
+    app.state.response_cache = None
+    if settings.response_cache_enabled:
+        app.state.response_cache = build_response_cache(
+            backend=settings.response_cache_backend,
+            path=settings.response_cache_path,
+            max_entries=settings.response_cache_max_entries,
+            default_ttl=settings.response_cache_ttl_seconds,
+            agent_ttls=settings.response_cache_agent_ttls,
+        )
+    app.state.outbox = EventOutbox(
+        path=settings.outbox_path,
+        http_client=app.state.http_client,
+        events_url=f"{settings.api_base_url}/events/batch",
+        batch_size=settings.outbox_batch_size,
+        flush_interval=settings.outbox_flush_interval_seconds,
+    )
+    flusher = asyncio.create_task(app.state.outbox.run())
+    logger.info(
+        "Agent runner started",
+        llm_max_concurrency=settings.llm_max_concurrency,
+        http_max_connections=settings.http_max_connections,
+    )
 
+    yield
 
-class AgentRequest(BaseModel):
-    agent_name: str = Field(..., description="Name of the agent to invoke")
-    context: dict = Field(default_factory=dict, description="Context data for the agent")
-    ticket_id: Optional[str] = None
-    validate_output: bool = True
+    if watcher is not None:
+        watcher.cancel()
+    flusher.cancel()
+    try:
+        await asyncio.wait_for(app.state.outbox.flush_once(), timeout=settings.event_timeout_seconds)
+    except Exception as e:
+        logger.warning("Final outbox flush failed, events kept for next start", error=str(e))
+    app.state.outbox.close()
+    if app.state.llm_client is not None:
+        await app.state.llm_client.close()
+    await app.state.http_client.aclose()
 
 
-class AgentResponse(BaseModel):
-    agent_name: str
-    output: dict
-    validation_passed: bool
-    raw_response: str
+app = FastAPI(title="Agent Runner", version="0.1.0", lifespan=lifespan)
 
 
 @app.post("/run", response_model=AgentResponse)
 async def run_agent(request: AgentRequest):
     """Run an agent: load prompt, inject context, call Claude, validate, emit events."""
+    return await execute_agent(request)
+
+
+@app.post("/run/stream")
+async def run_agent_stream(request: AgentRequest):
+    """Run an agent and stream its output as server-sent events.
+
+    A `field` event is sent for each top-level output field as soon as its
+    value is complete, so callers can act on e.g. `escalation_required`
+    before long prose fields finish. A final `result` event carries the full
+    AgentResponse; an `error` event is sent if the LLM call fails mid-stream.
+    """
+    logger.info("Running agent (stream)", agent_name=request.agent_name, ticket_id=request.ticket_id)
+
+    agent = get_agent(request.agent_name)
+    encoded = encode_request_context(agent, request)
+    key, cached = await lookup_cached(agent, request, encoded)
+    client = require_llm_client() if cached is None else None
+
+    async def stream():
+        with metrics.track_run(request.agent_name) as run:
+            async for event in stream_run(run):
+                yield event
+
+    async def stream_run(run: metrics.RunTracker):
+        if cached is not None:
+            run.outcome = "cached"
+            for field, value in cached.output.items():
+                yield sse_event("field", {"key": field, "value": value})
+            response = await finish_run(request, cached, encoded, emit_event=True)
+            yield sse_event("result", response.model_dump())
+            return
+
+        user_message = build_user_message(encoded)
+        priority = priority_from_context(request.context, request.priority)
+        estimated = estimate_tokens(agent.system_prompt, user_message) + settings.llm_estimated_output_tokens
+        scheduler = app.state.scheduler
+        parser = IncrementalObjectParser()
+        attempt = 0
+        while True:
+            try:
+                async with scheduler.slot(priority, estimated) as slot:
+                    async with client.messages.stream(
+                        model=settings.anthropic_model,
+                        max_tokens=4096,
+                        system=agent.system_blocks(settings.prompt_caching_enabled),
+                        messages=[{"role": "user", "content": user_message}],
+                    ) as llm_stream:
+                        llm_started = time.perf_counter()
+                        output_tokens = 0
+                        async for event in llm_stream:
+                            if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                                for field, value in parser.feed(event.delta.text):
+                                    yield sse_event("field", {"key": field, "value": value})
+                            elif event.type == "message_delta":
+                                output_tokens = event.usage.output_tokens
+                        final = await llm_stream.get_final_message()
+                        # The SDK's final message does not accumulate message_delta usage
+                        final.usage.output_tokens = max(final.usage.output_tokens, output_tokens)
+                        slot.settle(final.usage.input_tokens + final.usage.output_tokens)
+                        metrics.LLM_SECONDS.labels(agent=request.agent_name).observe(
+                            time.perf_counter() - llm_started
+                        )
+                usage = record_usage(request, final.usage)
+                break
+            except Exception as e:
+                # Only retry if nothing has been streamed to the caller yet
+                delay = None if parser.text else scheduler.retry_delay(e, attempt)
+                if delay is None:
+                    logger.error("Claude API stream failed", agent=request.agent_name, error=str(e))
+                    run.outcome = "error"
+                    yield sse_event("error", {"status_code": 500, "detail": f"AI call failed: {str(e)}"})
+                    return
+                attempt += 1
+                await asyncio.sleep(delay)
+
+        response = await build_response(agent, request, parser.text, key, usage)
+        response = await finish_run(request, response, encoded, emit_event=True)
+        yield sse_event("result", response.model_dump())
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/run/batch")
+async def run_agent_batch(batch: AgentBatchRequest):
+    """Run many agents concurrently and stream each result as NDJSON when it completes.
+
+    Each line is `{"index": i, "ok": true, "response": {...}}` or
+    `{"index": i, "ok": false, "status_code": ..., "error": "..."}`, where
+    `index` is the position of the request in the batch.
+    """
+    if len(batch.requests) > settings.batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(batch.requests)} > {settings.batch_max_size}",
+        )
+    logger.info("Running agent batch", size=len(batch.requests))
+
+    async def run_one(index: int, request: AgentRequest) -> dict:
+        async with app.state.batch_semaphore, app.state.agent_semaphores[request.agent_name]:
+            try:
+                response = await execute_agent(request)
+            except HTTPException as e:
+                return {"index": index, "ok": False, "status_code": e.status_code, "error": e.detail}
+        return {"index": index, "ok": True, "response": response.model_dump()}
+
+    async def stream():
+        tasks = [
+            asyncio.create_task(run_one(i, request))
+            for i, request in enumerate(batch.requests)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                yield json.dumps(result, default=str) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.post("/run/pipeline", response_model=PipelineResponse)
+async def run_agent_pipeline(pipeline: PipelineRequest):
+    """Run a DAG of agent steps in-process, mapping step outputs into downstream
+    contexts, and emit all completion events in one batch at the end."""
+    logger.info("Running pipeline", pipeline=pipeline.name, steps=len(pipeline.steps))
+    try:
+        result = await run_pipeline(
+            pipeline, lambda request: execute_agent(request, emit_event=False)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if pipeline.ticket_id:
+        events = [
+            (
+                step.response.run_id,
+                completion_event(step.agent_name, pipeline.ticket_id, step.response),
+            )
+            for step in result.steps
+            if step.response is not None
+        ]
+        pipeline_run_id = uuid.uuid4().hex
+        events.append((pipeline_run_id, {
+            "event_type": f"pipeline_{pipeline.name}_completed",
+            "ticket_id": pipeline.ticket_id,
+            "run_id": pipeline_run_id,
+            "payload": {
+                "steps": {
+                    step.id: {
+                        "agent_name": step.agent_name,
+                        "status": step.status,
+                        "error": step.error,
+                        "duration_ms": round(step.duration_ms, 1),
+                    }
+                    for step in result.steps
+                },
+                "duration_ms": round(result.duration_ms, 1),
+                "run_id": pipeline_run_id,
+            },
+        }))
+        try:
+            await app.state.outbox.enqueue_many(events)
+        except Exception as e:
+            logger.error("Failed to queue pipeline events", pipeline=pipeline.name, error=str(e))
+
+    return result
+
+
+def completion_event(agent_name: str, ticket_id: str, response: AgentResponse) -> dict:
+    """The `agent_<name>_completed` event posted to the API after a run."""
+    return {
+        "event_type": f"agent_{agent_name}_completed",
+        "ticket_id": ticket_id,
+        "run_id": response.run_id,
+        "payload": {
+            "agent_output": response.output,
+            "validation_passed": response.validation_passed,
+            "cached": response.cached,
+            "run_id": response.run_id,
+            "usage": response.usage.model_dump() if response.usage else None,
+        },
+    }
+
+
+async def execute_agent(request: AgentRequest, emit_event: bool = True) -> AgentResponse:
+    """Run one agent end to end. Raises HTTPException on unknown agents or LLM failure."""
     logger.info("Running agent", agent_name=request.agent_name, ticket_id=request.ticket_id)
 
-    # Load the agent prompt
+    agent = get_agent(request.agent_name)
+    encoded = encode_request_context(agent, request)
+
+    with metrics.track_run(request.agent_name) as run:
+        # Serve identical re-runs from the response cache
+        key, cached = await lookup_cached(agent, request, encoded)
+        if cached is not None:
+            run.outcome = "cached"
+            return await finish_run(request, cached, encoded, emit_event)
+
+        raw_text, usage = await _call_llm(agent, request, build_user_message(encoded))
+        response = await build_response(agent, request, raw_text, key, usage)
+        return await finish_run(request, response, encoded, emit_event)
+
+
+def get_agent(agent_name: str) -> AgentDefinition:
+    """Look up the agent prompt (policies already appended)."""
     try:
-        system_prompt = load_prompt(request.agent_name)
-    except FileNotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+        return app.state.registry.get(agent_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Agent not found: {agent_name}")
+
+
+def encode_request_context(agent: AgentDefinition, request: AgentRequest) -> EncodedContext:
+    """Encode the request context with the agent's allowlist and token budget."""
+    return encode_context(
+        request.context,
+        fields=agent.context_fields,
+        exclude=agent.context_exclude,
+        max_tokens=agent.context_budget or settings.context_max_tokens,
+    )
+
 
-    # Load and append global policies
-    policies = load_policies()
-    if policies:
-        system_prompt += f"\n\n---\nGLOBAL POLICIES:\n{policies}"
+async def lookup_cached(agent: AgentDefinition, request: AgentRequest, encoded: EncodedContext):
+    """Return (cache key, cached AgentResponse or None). The key is None when
+    the run is not cacheable."""
+    cache = app.state.response_cache
+    if cache is None or not request.use_cache or cache.ttl_for(request.agent_name) <= 0:
+        return None, None
+    # Key on the encoded context so changes to fields the agent never sees still hit
+    key = cache_key(request.agent_name, agent.content_hash, settings.anthropic_model, encoded.context)
+    cached = await cache.get(request.agent_name, key)
+    if cached is None:
+        return key, None
+    logger.info("Agent response served from cache", agent_name=request.agent_name)
+    return key, AgentResponse(agent_name=request.agent_name, cached=True, **cached)
 
-    # Build the user message with context
-    user_message = f"""Process this request. Return valid JSON only.
+
+def build_user_message(encoded: EncodedContext) -> str:
+    """Build the user message with the encoded context."""
+    return f"""Process this request. Return valid JSON only.
 
 Context:
 ```json
-{json.dumps(request.context, indent=2, default=str)}
+{encoded.text}
 ```
 
 Respond with a JSON object containing your analysis and actions."""
 
-    # Call Claude
-    if not settings.anthropic_api_key:
-        raise HTTPException(
-            status_code=500,
-            detail="ANTHROPIC_API_KEY not configured. Set it in .env file.",
-        )
 
-    client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+def parse_output(raw_text: str) -> dict:
+    """Parse the model's JSON output, falling back to a fenced code block."""
+    try:
+        # Try to extract JSON from the response
+        return json.loads(raw_text)
+    except json.JSONDecodeError:
+        pass
+    # Try to find JSON in markdown code blocks
+    json_match = JSON_FENCE_RE.search(raw_text)
+    if json_match:
+        try:
+            return json.loads(json_match.group(1))
+        except json.JSONDecodeError:
+            pass
+    return {"raw_text": raw_text, "parse_error": True}
+
 
+def validate_agent_output(agent: AgentDefinition, request: AgentRequest, output: dict) -> bool:
+    """Validate output against the agent's compiled schema."""
+    if not request.validate_output or output.get("parse_error") or agent.validator is None:
+        return True
     try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4096,
-            system=system_prompt,
-            messages=[{"role": "user", "content": user_message}],
+        agent.validator.validate(output)
+    except jsonschema.ValidationError as e:
+        logger.warning(
+            "Output validation failed",
+            agent=request.agent_name,
+            error=str(e.message),
         )
-        raw_text = response.content[0].text
-    except Exception as e:
-        logger.error("Claude API call failed", agent=request.agent_name, error=str(e))
-        raise HTTPException(status_code=500, detail=f"AI call failed: {str(e)}")
+        return False
+    return True
+
+
+async def build_response(
+    agent: AgentDefinition,
+    request: AgentRequest,
+    raw_text: str,
+    key: Optional[str],
+    usage: Optional[LLMUsage] = None,
+) -> AgentResponse:
+    """Parse and validate raw model text, caching the result when it is clean."""
+    with metrics.PARSE_SECONDS.labels(agent=request.agent_name).time():
+        output = parse_output(raw_text)
+    if output.get("parse_error"):
+        metrics.PARSE_ERRORS.labels(agent=request.agent_name).inc()
+    with metrics.VALIDATION_SECONDS.labels(agent=request.agent_name).time():
+        validation_passed = validate_agent_output(agent, request, output)
+    if not validation_passed:
+        metrics.VALIDATION_FAILURES.labels(agent=request.agent_name).inc()
+    if key is not None and validation_passed and not output.get("parse_error"):
+        await app.state.response_cache.set(
+            request.agent_name,
+            key,
+            {
+                "output": output,
+                "validation_passed": validation_passed,
+                "raw_response": raw_text,
+            },
+        )
+    return AgentResponse(
+        agent_name=request.agent_name,
+        output=output,
+        validation_passed=validation_passed,
+        raw_response=raw_text,
+        usage=usage,
+    )
 
-    # Parse JSON output
-    try:
-        # Try to extract JSON from the response
-        output = json.loads(raw_text)
-    except json.JSONDecodeError:
-        # Try to find JSON in markdown code blocks
-        import re
-        json_match = re.search(r"```(?:json)?\s*([\s\S]*?)```", raw_text)
-        if json_match:
-            try:
-                output = json.loads(json_match.group(1))
-            except json.JSONDecodeError:
-                output = {"raw_text": raw_text, "parse_error": True}
-        else:
-            output = {"raw_text": raw_text, "parse_error": True}
-
-    # Validate output against schema
-    validation_passed = True
-    if request.validate_output and not output.get("parse_error"):
-        schema = load_schema(request.agent_name)
-        if schema:
-            try:
-                jsonschema.validate(output, schema)
-            except jsonschema.ValidationError as e:
-                logger.warning(
-                    "Output validation failed",
-                    agent=request.agent_name,
-                    error=str(e.message),
-                )
-                validation_passed = False
 
-    # Log audit event via API
-    if request.ticket_id:
+async def finish_run(
+    request: AgentRequest, response: AgentResponse, encoded: EncodedContext, emit_event: bool
+) -> AgentResponse:
+    """Assign a run id, record context token usage, queue the completion event and log the run."""
+    response.run_id = uuid.uuid4().hex
+    response.context_tokens = encoded.tokens
+    response.context_tokens_saved = encoded.tokens_saved
+    response.context_truncated = encoded.truncated
+
+    # Queue audit event for the API; the outbox delivers it in the background
+    if emit_event and request.ticket_id:
         try:
-            async with httpx.AsyncClient() as http_client:
-                await http_client.post(
-                    f"{settings.api_base_url}/events",
-                    json={
-                        "event_type": f"agent_{request.agent_name}_completed",
-                        "ticket_id": request.ticket_id,
-                        "payload": {
-                            "agent_output": output,
-                            "validation_passed": validation_passed,
-                        },
-                    },
-                    timeout=10,
+            with metrics.EMIT_SECONDS.labels(agent=request.agent_name).time():
+                await app.state.outbox.enqueue(
+                    response.run_id,
+                    completion_event(request.agent_name, request.ticket_id, response),
                 )
         except Exception as e:
-            logger.warning("Failed to emit event to API", error=str(e))
+            logger.error("Failed to queue completion event", run_id=response.run_id, error=str(e))
 
     logger.info(
         "Agent completed",
         agent_name=request.agent_name,
-        validation_passed=validation_passed,
+        validation_passed=response.validation_passed,
+        cached=response.cached,
+        context_tokens=encoded.tokens,
+        context_tokens_saved=encoded.tokens_saved,
+        cost_usd=response.usage.cost_usd if response.usage else 0.0,
     )
+    return response
 
-    return AgentResponse(
-        agent_name=request.agent_name,
-        output=output,
-        validation_passed=validation_passed,
-        raw_response=raw_text,
-    )
+
+def require_llm_client():
+    client = app.state.llm_client
+    if client is None:
+        raise HTTPException(
+            status_code=500,
+            detail="ANTHROPIC_API_KEY not configured. Set it in .env file.",
+        )
+    return client
+
+
+def record_usage(request: AgentRequest, raw_usage) -> LLMUsage:
+    """Price one call's token usage and add it to the per-agent/per-ticket ledger."""
+    usage = usage_from_response(raw_usage, USAGE_PRICES)
+    app.state.usage.record(request.agent_name, request.ticket_id, usage)
+    return usage
+
+
+async def _call_llm(
+    agent: AgentDefinition, request: AgentRequest, user_message: str
+) -> Tuple[str, LLMUsage]:
+    """Call Claude and return the raw response text and its token usage."""
+    client = require_llm_client()
+    estimated = estimate_tokens(agent.system_prompt, user_message) + settings.llm_estimated_output_tokens
+
+    async def call():
+        with metrics.LLM_SECONDS.labels(agent=request.agent_name).time():
+            return await client.messages.create(
+                model=settings.anthropic_model,
+                max_tokens=4096,
+                system=agent.system_blocks(settings.prompt_caching_enabled),
+                messages=[{"role": "user", "content": user_message}],
+            )
+
+    try:
+        response = await app.state.scheduler.run(
+            call,
+            priority=priority_from_context(request.context, request.priority),
+            estimated_tokens=estimated,
+            usage_tokens=lambda r: r.usage.input_tokens + r.usage.output_tokens,
+        )
+    except Exception as e:
+        logger.error("Claude API call failed", agent=request.agent_name, error=str(e))
+        raise HTTPException(status_code=500, detail=f"AI call failed: {str(e)}")
+    return response.content[0].text, record_usage(request, response.usage)
 
 
 @app.get("/agents")
 async def list_agents():
     """List all available agents."""
-    agents = []
-    if AGENTS_DIR.exists():
-        for f in AGENTS_DIR.glob("*.md"):
-            agents.append(f.stem)
-    return {"agents": sorted(agents)}
+    return {"agents": app.state.registry.agent_names()}
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Response cache hit/miss counters."""
+    cache = app.state.response_cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **(await cache.stats())}
+
+
+@app.get("/scheduler/stats")
+async def scheduler_stats():
+    """LLM scheduler queue depth, wait times and throttling counters."""
+    return app.state.scheduler.stats()
+
+
+@app.get("/usage")
+async def usage_stats():
+    """Input, output and prompt-cache token totals and cost, overall and per agent."""
+    return app.state.usage.stats()
+
+
+@app.get("/usage/tickets/{ticket_id}")
+async def ticket_usage(ticket_id: str):
+    """Token totals and cost for one recently active ticket."""
+    usage = app.state.usage.ticket(ticket_id)
+    if usage is None:
+        raise HTTPException(status_code=404, detail=f"No usage recorded for ticket: {ticket_id}")
+    return {"ticket_id": ticket_id, **usage}
+
+
+@app.get("/outbox/stats")
+async def outbox_stats():
+    """Pending and delivered completion events."""
+    return await app.state.outbox.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Per-agent latency histograms and run/parse/validation/cache counters
+    in Prometheus text format."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
 
 
 @app.get("/health")
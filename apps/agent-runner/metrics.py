@@ -0,0 +1,232 @@
+"""Metrics - in-process counters, gauges and histograms rendered in Prometheus text format."""
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import bisect
+import time
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds. Whole runs and LLM calls take seconds; parsing, validation and
+# queueing an event take well under a millisecond to a few milliseconds.
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, **labels: str):
+        """Return the child for one label combination, creating it on first use."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for key in sorted(self._children):
+            lines.extend(self._render_child(key, self._children[key]))
+        return lines
+
+    def _render_child(self, key: Tuple[str, ...], child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    type_name = "counter"
+    _new_child = _Value
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+    _new_child = _Value
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = SLOW_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def _render_child(self, key: Tuple[str, ...], child: _HistogramValue) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+        lines.append(f"{self.name}_bucket{labels} {child.count}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric of the process and renders them for `/metrics`."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = SLOW_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+RUN_SECONDS = REGISTRY.histogram(
+    "agent_run_duration_seconds", "End-to-end agent run latency.", ("agent",)
+)
+LLM_SECONDS = REGISTRY.histogram(
+    "agent_llm_duration_seconds", "LLM call latency per attempt, excluding scheduler queueing.", ("agent",)
+)
+PARSE_SECONDS = REGISTRY.histogram(
+    "agent_parse_duration_seconds", "Time to parse model output as JSON.", ("agent",), FAST_BUCKETS
+)
+VALIDATION_SECONDS = REGISTRY.histogram(
+    "agent_validation_duration_seconds", "Time to validate output against the agent schema.",
+    ("agent",), FAST_BUCKETS,
+)
+EMIT_SECONDS = REGISTRY.histogram(
+    "agent_event_emit_duration_seconds", "Time to queue the completion event in the outbox.",
+    ("agent",), FAST_BUCKETS,
+)
+RUNS = REGISTRY.counter(
+    "agent_runs_total", "Agent runs by outcome (ok, cached, error, cancelled).", ("agent", "outcome")
+)
+PARSE_ERRORS = REGISTRY.counter(
+    "agent_parse_errors_total", "Runs whose output could not be parsed as JSON.", ("agent",)
+)
+VALIDATION_FAILURES = REGISTRY.counter(
+    "agent_validation_failures_total", "Runs whose output failed schema validation.", ("agent",)
+)
+CACHE_HITS = REGISTRY.counter(
+    "agent_cache_hits_total", "Runs served from the response cache.", ("agent",)
+)
+IN_FLIGHT = REGISTRY.gauge("agent_runs_in_flight", "Agent runs currently executing.", ("agent",))
+
+
+class RunTracker:
+    outcome: Optional[str] = None
+
+
+@contextmanager
+def track_run(agent_name: str):
+    """Count an agent run in flight and record its latency and outcome.
+    Set `.outcome` on the yielded tracker to override the default `ok`."""
+    tracker = RunTracker()
+    IN_FLIGHT.labels(agent=agent_name).inc()
+    started = time.perf_counter()
+    try:
+        yield tracker
+    except (asyncio.CancelledError, GeneratorExit):
+        tracker.outcome = "cancelled"
+        raise
+    except Exception:
+        tracker.outcome = "error"
+        raise
+    finally:
+        IN_FLIGHT.labels(agent=agent_name).dec()
+        RUN_SECONDS.labels(agent=agent_name).observe(time.perf_counter() - started)
+        outcome = tracker.outcome or "ok"
+        RUNS.labels(agent=agent_name, outcome=outcome).inc()
+        if outcome == "cached":
+            CACHE_HITS.labels(agent=agent_name).inc()
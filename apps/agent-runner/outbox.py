@@ -0,0 +1,223 @@
+"""Event outbox - durable on-disk queue of API events with a background flusher."""
+from pathlib import Path
+from typing import List, Tuple
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+
+import httpx
+import structlog
+
+logger = structlog.get_logger()
+
+
+class EventOutbox:
+    """Agent runs append completion events here and return immediately; a
+    background task posts them to the API's `/events/batch` in batches.
+
+    Events are keyed by run id, so enqueueing the same run twice is a no-op,
+    and the API skips run ids it has already processed, so re-posting an
+    event after a lost response is harmless. The API answers per event:
+    accepted events (processed or duplicate) are deleted, rejected ones are
+    moved to a dead-letter table instead of blocking the queue, and failed
+    ones, like a failed post, are retried with exponential backoff. Pending
+    and dead-lettered events survive both API and runner restarts.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        http_client: httpx.AsyncClient,
+        events_url: str,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        backoff_base: float = 1.0,
+        backoff_max: float = 300.0,
+    ):
+        self.http_client = http_client
+        self.events_url = events_url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sent = 0
+        self.dead_lettered = 0
+        self.failed_attempts = 0
+        self._wakeup = asyncio.Event()
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " run_id TEXT PRIMARY KEY,"
+            " event TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt_at REAL NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_error TEXT)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_outbox_next_attempt ON outbox(next_attempt_at)"
+        )
+        # Events the API rejected as invalid; kept for inspection, never retried
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox_dead_letter ("
+            " run_id TEXT PRIMARY KEY,"
+            " event TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " dead_at REAL NOT NULL,"
+            " error TEXT)"
+        )
+
+    # -- storage (runs in a worker thread) --
+
+    def _insert(self, rows: List[Tuple[str, dict]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO outbox (run_id, event, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(run_id, json.dumps(event, default=str), now, now) for run_id, event in rows],
+            )
+
+    def _due(self) -> List[Tuple[str, str, int]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT run_id, event, attempts FROM outbox WHERE next_attempt_at <= ? "
+                "ORDER BY created_at LIMIT ?",
+                (time.time(), self.batch_size),
+            ).fetchall()
+
+    def _delete(self, run_ids: List[str]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM outbox WHERE run_id = ?", [(r,) for r in run_ids])
+
+    def _dead_letter(self, rejected: List[Tuple[str, str]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO outbox_dead_letter "
+                    "(run_id, event, attempts, created_at, dead_at, error) "
+                    "SELECT run_id, event, attempts + 1, created_at, ?, ? FROM outbox WHERE run_id = ?",
+                    [(now, error[:500], run_id) for run_id, error in rejected],
+                )
+                self._conn.executemany(
+                    "DELETE FROM outbox WHERE run_id = ?", [(run_id,) for run_id, _ in rejected]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _reschedule(self, rows: List[Tuple[str, str, int]], error: str) -> None:
+        self._reschedule_each([(row, error) for row in rows])
+
+    def _reschedule_each(self, failed: List[Tuple[Tuple[str, str, int], str]]) -> None:
+        now = time.time()
+        updates = []
+        for (run_id, _, attempts), error in failed:
+            delay = min(self.backoff_max, self.backoff_base * (2 ** attempts))
+            updates.append((now + delay * random.uniform(0.8, 1.2), error[:500], run_id))
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? "
+                "WHERE run_id = ?",
+                updates,
+            )
+
+    def _pending(self) -> Tuple[int, float, int]:
+        with self._lock:
+            pending, oldest = self._conn.execute("SELECT COUNT(*), MIN(created_at) FROM outbox").fetchone()
+            dead, = self._conn.execute("SELECT COUNT(*) FROM outbox_dead_letter").fetchone()
+            return pending, oldest, dead
+
+    # -- public API --
+
+    async def enqueue(self, run_id: str, event: dict) -> None:
+        """Durably store an event and wake the flusher."""
+        await self.enqueue_many([(run_id, event)])
+
+    async def enqueue_many(self, rows: List[Tuple[str, dict]]) -> None:
+        await asyncio.to_thread(self._insert, rows)
+        self._wakeup.set()
+
+    async def flush_once(self) -> int:
+        """Post one batch of due events. Returns the number of events settled
+        (accepted or dead-lettered); the flusher keeps going while it is a full batch."""
+        rows = await asyncio.to_thread(self._due)
+        if not rows:
+            return 0
+        events = [json.loads(event) for _, event, _ in rows]
+        try:
+            response = await self.http_client.post(self.events_url, json={"events": events})
+            response.raise_for_status()
+            results = response.json()["results"]
+        except Exception as e:
+            self.failed_attempts += 1
+            logger.warning("Outbox flush failed, will retry", count=len(rows), error=str(e))
+            await asyncio.to_thread(self._reschedule, rows, str(e))
+            return 0
+
+        outcomes = {result.get("index"): result for result in results if isinstance(result, dict)}
+        accepted, rejected, failed = [], [], []
+        for index, row in enumerate(rows):
+            outcome = outcomes.get(index) or {"status": "failed", "error": "No result for event"}
+            status = outcome.get("status")
+            if status in ("processed", "duplicate"):
+                accepted.append(row[0])
+            elif status == "rejected":
+                rejected.append((row[0], outcome.get("error") or "Rejected"))
+            else:
+                failed.append((row, outcome.get("error") or f"Event status {status!r}"))
+
+        if accepted:
+            await asyncio.to_thread(self._delete, accepted)
+            self.sent += len(accepted)
+        if rejected:
+            await asyncio.to_thread(self._dead_letter, rejected)
+            self.dead_lettered += len(rejected)
+            for run_id, error in rejected:
+                logger.error("Outbox event rejected by API, dead-lettered", run_id=run_id, error=error)
+        if failed:
+            self.failed_attempts += 1
+            logger.warning("Outbox events failed, will retry", count=len(failed), error=failed[0][1])
+            await asyncio.to_thread(self._reschedule_each, failed)
+        return len(accepted) + len(rejected)
+
+    async def run(self) -> None:
+        """Background flusher: drain due events, then sleep until woken or the interval passes."""
+        while True:
+            try:
+                while await self.flush_once() == self.batch_size:
+                    pass
+            except Exception as e:
+                logger.error("Outbox flusher error", error=str(e))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stats(self) -> dict:
+        pending, oldest, dead = await asyncio.to_thread(self._pending)
+        return {
+            "pending": pending,
+            "oldest_pending_age_seconds": round(time.time() - oldest, 1) if oldest else None,
+            "dead_letter": dead,
+            "sent": self.sent,
+            "dead_lettered": self.dead_lettered,
+            "failed_attempts": self.failed_attempts,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,153 @@
+"""Pipeline executor - runs a DAG of agent steps in-process."""
+from typing import Awaitable, Callable, Dict, List
+import asyncio
+import time
+
+from fastapi import HTTPException
+import structlog
+
+from schemas import (
+    AgentRequest, AgentResponse, PipelineRequest, PipelineResponse, PipelineStep,
+    PipelineStepResult,
+)
+
+logger = structlog.get_logger()
+
+INPUT_REF = "$input"
+
+
+def topological_order(steps: List[PipelineStep]) -> List[str]:
+    """Validate step ids and dependencies and return a topological order.
+
+    Raises ValueError on duplicate ids, unknown dependencies or cycles.
+    """
+    ids = [step.id for step in steps]
+    if len(ids) != len(set(ids)):
+        raise ValueError("Pipeline step ids must be unique")
+    if INPUT_REF in ids:
+        raise ValueError(f"'{INPUT_REF}' is reserved and cannot be used as a step id")
+
+    pending = {step.id: set(step.depends_on) for step in steps}
+    for step in steps:
+        unknown = pending[step.id] - set(ids)
+        if unknown:
+            raise ValueError(f"Step '{step.id}' depends on unknown steps: {sorted(unknown)}")
+        for source in step.inputs.values():
+            ref = source.split(".", 1)[0]
+            if ref != INPUT_REF and ref not in step.depends_on:
+                raise ValueError(f"Step '{step.id}' reads '{source}' but does not depend on '{ref}'")
+
+    order = []
+    ready = [step_id for step_id, deps in pending.items() if not deps]
+    while ready:
+        step_id = ready.pop()
+        order.append(step_id)
+        for other, deps in pending.items():
+            if step_id in deps:
+                deps.discard(step_id)
+                if not deps and other not in order and other not in ready:
+                    ready.append(other)
+    if len(order) != len(steps):
+        raise ValueError("Pipeline contains a dependency cycle")
+    return order
+
+
+def resolve_path(sources: dict, path: str):
+    """Resolve a dotted path such as `scope.output.line_items` against step results."""
+    value = sources
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            raise KeyError(path)
+    return value
+
+
+def build_step_context(step: PipelineStep, pipeline: PipelineRequest, sources: dict) -> dict:
+    """Static step context plus mapped inputs; the pipeline input when neither is given."""
+    if not step.context and not step.inputs:
+        return dict(pipeline.context)
+    context = dict(step.context)
+    for key, source in step.inputs.items():
+        context[key] = resolve_path(sources, source)
+    return context
+
+
+async def run_pipeline(
+    pipeline: PipelineRequest,
+    execute: Callable[[AgentRequest], Awaitable[AgentResponse]],
+) -> PipelineResponse:
+    """Run every step as soon as its dependencies finish.
+
+    Independent steps run concurrently. A step whose dependency failed is
+    skipped. `execute` is expected not to emit events; the caller emits
+    one batch for the whole pipeline.
+    """
+    topological_order(pipeline.steps)
+    steps = {step.id: step for step in pipeline.steps}
+    done: Dict[str, asyncio.Future] = {
+        step_id: asyncio.get_running_loop().create_future() for step_id in steps
+    }
+    results: Dict[str, PipelineStepResult] = {}
+    sources = {INPUT_REF: pipeline.context}
+    started = time.perf_counter()
+
+    async def run_step(step: PipelineStep) -> None:
+        for dep in step.depends_on:
+            await done[dep]
+        step_started = time.perf_counter()
+        result = PipelineStepResult(
+            id=step.id,
+            agent_name=step.agent_name,
+            status="skipped",
+            started_ms=(step_started - started) * 1000,
+        )
+        failed = [dep for dep in step.depends_on if results[dep].status != "completed"]
+        try:
+            if failed:
+                result.error = f"Skipped because dependencies did not complete: {failed}"
+                return
+            try:
+                context = build_step_context(step, pipeline, sources)
+            except KeyError as e:
+                result.status = "failed"
+                result.error = f"Input path not found: {e.args[0]}"
+                return
+            try:
+                response = await execute(
+                    AgentRequest(
+                        agent_name=step.agent_name,
+                        context=context,
+                        ticket_id=pipeline.ticket_id,
+                        validate_output=step.validate_output,
+                        use_cache=step.use_cache,
+                    )
+                )
+            except HTTPException as e:
+                result.status = "failed"
+                result.error = str(e.detail)
+                return
+            result.status = "completed"
+            result.response = response
+            sources[step.id] = response.model_dump()
+        finally:
+            result.duration_ms = (time.perf_counter() - step_started) * 1000
+            results[step.id] = result
+            done[step.id].set_result(None)
+
+    await asyncio.gather(*(run_step(step) for step in pipeline.steps))
+
+    response = PipelineResponse(
+        name=pipeline.name,
+        steps=[results[step.id] for step in pipeline.steps],
+        duration_ms=(time.perf_counter() - started) * 1000,
+    )
+    logger.info(
+        "Pipeline completed",
+        pipeline=pipeline.name,
+        steps={r.id: f"{r.status} {r.duration_ms:.0f}ms" for r in response.steps},
+        duration_ms=round(response.duration_ms),
+    )
+    return response
@@ -0,0 +1,182 @@
+"""Prompt registry - agent prompts, global policies and compiled output validators held in memory."""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+
+import jsonschema
+import structlog
+
+logger = structlog.get_logger()
+
+POLICIES_FILE = "global_policies.md"
+POLICIES_HEADER = "GLOBAL POLICIES:\n"
+POLICIES_SEPARATOR = "\n\n---\n"
+ALLOWLISTS_FILE = "allowlists.json"
+
+
+@dataclass(frozen=True)
+class AgentDefinition:
+    """Everything the request path needs to run one agent."""
+
+    name: str
+    prompt: str
+    policies: str
+    # The system prompt as sent: one text per block, policies first
+    system_texts: Tuple[str, ...]
+    schema: Optional[dict]
+    content_hash: str
+    validator: Optional[jsonschema.protocols.Validator]
+    # Context encoding: allowlisted field paths (None = all), keys dropped at
+    # any depth, and a token budget (0 = use the runner default)
+    context_fields: Optional[Tuple[str, ...]] = None
+    context_exclude: Tuple[str, ...] = ()
+    context_budget: int = 0
+
+    def system_blocks(self, prompt_caching: bool = True) -> List[dict]:
+        """The system prompt as content blocks: the shared policies first, so
+        every agent reuses one cached prefix, then the agent instructions.
+        Each block ends a prompt-cache breakpoint when caching is on."""
+        blocks = []
+        for text in self.system_texts:
+            block = {"type": "text", "text": text}
+            if prompt_caching:
+                block["cache_control"] = {"type": "ephemeral"}
+            blocks.append(block)
+        return blocks
+
+    @property
+    def system_prompt(self) -> str:
+        """The system blocks' text concatenated, for token estimates."""
+        return "".join(self.system_texts)
+
+
+class PromptRegistry:
+    """Loads `prompts/agents`, `prompts/policies`, `prompts/schemas` and the
+    context allowlists in `prompts/context` once and
+    reloads them when a file is added, removed or modified.
+
+    Each reload builds a fresh snapshot and swaps it in atomically, so readers
+    never see a half-loaded set of prompts. A reload that fails (for example a
+    schema file saved mid-edit) keeps the previous snapshot.
+    """
+
+    def __init__(self, prompts_dir: Path, poll_interval: float = 2.0):
+        self.prompts_dir = Path(prompts_dir)
+        self.agents_dir = self.prompts_dir / "agents"
+        self.schemas_dir = self.prompts_dir / "schemas"
+        self.policies_dir = self.prompts_dir / "policies"
+        self.context_dir = self.prompts_dir / "context"
+        self.poll_interval = poll_interval
+        self._agents: Dict[str, AgentDefinition] = {}
+        self._fingerprint: Dict[str, Tuple[int, int]] = {}
+
+    def get(self, agent_name: str) -> AgentDefinition:
+        """Return the loaded definition for an agent, or raise KeyError."""
+        return self._agents[agent_name]
+
+    def agent_names(self) -> List[str]:
+        return sorted(self._agents)
+
+    def fingerprint(self) -> Dict[str, Tuple[int, int]]:
+        """Map every prompt/schema/policy/allowlist file to its (mtime_ns, size)."""
+        files = {}
+        for directory, pattern in (
+            (self.agents_dir, "*.md"),
+            (self.schemas_dir, "*.json"),
+            (self.policies_dir, "*.md"),
+            (self.context_dir, "*.json"),
+        ):
+            if not directory.exists():
+                continue
+            for path in directory.glob(pattern):
+                stat = path.stat()
+                files[str(path)] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def load(self) -> None:
+        """Read every file from disk and swap in a new snapshot."""
+        fingerprint = self.fingerprint()
+
+        policies = ""
+        policies_file = self.policies_dir / POLICIES_FILE
+        if policies_file.exists():
+            policies = policies_file.read_text()
+
+        schemas = {}
+        if self.schemas_dir.exists():
+            for schema_file in self.schemas_dir.glob("*.json"):
+                schemas[schema_file.stem] = json.loads(schema_file.read_text())
+
+        allowlists = {}
+        allowlists_file = self.context_dir / ALLOWLISTS_FILE
+        if allowlists_file.exists():
+            allowlists = json.loads(allowlists_file.read_text())
+        context_exclude = tuple(allowlists.get("exclude_keys", []))
+
+        agents = {}
+        if self.agents_dir.exists():
+            for prompt_file in self.agents_dir.glob("*.md"):
+                name = prompt_file.stem
+                prompt = prompt_file.read_text()
+                if policies:
+                    system_texts = (f"{POLICIES_HEADER}{policies}{POLICIES_SEPARATOR}", prompt)
+                else:
+                    system_texts = (prompt,)
+
+                schema = schemas.get(name)
+                validator = None
+                if schema:
+                    validator_cls = jsonschema.validators.validator_for(schema)
+                    validator_cls.check_schema(schema)
+                    validator = validator_cls(schema)
+
+                context_spec = allowlists.get("agents", {}).get(name, {})
+                context_fields = context_spec.get("fields")
+
+                content_hash = hashlib.sha256(
+                    (
+                        "".join(system_texts)
+                        + json.dumps(schema, sort_keys=True)
+                        + json.dumps([context_spec, context_exclude], sort_keys=True)
+                    ).encode()
+                ).hexdigest()
+
+                agents[name] = AgentDefinition(
+                    name=name,
+                    prompt=prompt,
+                    policies=policies,
+                    system_texts=system_texts,
+                    schema=schema,
+                    content_hash=content_hash,
+                    validator=validator,
+                    context_fields=tuple(context_fields) if context_fields is not None else None,
+                    context_exclude=context_exclude,
+                    context_budget=int(context_spec.get("max_tokens", 0)),
+                )
+
+        self._agents = agents
+        self._fingerprint = fingerprint
+        logger.info("Prompt registry loaded", agents=len(agents), schemas=len(schemas))
+
+    def reload_if_changed(self) -> bool:
+        """Reload when the on-disk fingerprint differs. Returns True on reload."""
+        if self.fingerprint() == self._fingerprint:
+            return False
+        try:
+            self.load()
+        except (OSError, ValueError, jsonschema.SchemaError) as e:
+            logger.error("Prompt registry reload failed, keeping previous version", error=str(e))
+            return False
+        return True
+
+    async def watch(self) -> None:
+        """Poll file mtimes in the background and reload on change."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await asyncio.to_thread(self.reload_if_changed)
+            except OSError as e:
+                logger.warning("Prompt registry poll failed", error=str(e))
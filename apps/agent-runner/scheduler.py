@@ -0,0 +1,279 @@
+"""LLM call scheduler - priority admission, rate/token budgets and throttle backoff."""
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+import anthropic
+import structlog
+
+logger = structlog.get_logger()
+
+PRIORITY_RANK = {"emergency": 0, "urgent": 1, "routine": 2}
+DEFAULT_PRIORITY = "routine"
+
+# Provider responses that mean "slow down" rather than "this request is bad"
+THROTTLE_STATUS_CODES = {429, 503, 529}
+
+
+def priority_from_context(context: dict, explicit: Optional[str] = None) -> str:
+    """Pick the ticket priority from the request, falling back to routine."""
+    candidates = [explicit, context.get("priority")]
+    ticket = context.get("ticket")
+    if isinstance(ticket, dict):
+        candidates.append(ticket.get("priority"))
+    for candidate in candidates:
+        if isinstance(candidate, str) and candidate.lower() in PRIORITY_RANK:
+            return candidate.lower()
+    return DEFAULT_PRIORITY
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return sum(len(text) for text in texts) // 4 + 1
+
+
+class TokenBucket:
+    """Classic token bucket. A capacity of 0 means unlimited."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """Take tokens; may go negative when a request used more than estimated."""
+        if not self.unlimited:
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+@dataclass
+class Slot:
+    """An admitted LLM call. Call `settle` with the real token usage."""
+
+    scheduler: "LLMScheduler"
+    priority: str
+    estimated_tokens: int
+    wait_seconds: float = 0.0
+
+    def settle(self, actual_tokens: int) -> None:
+        self.scheduler._tokens.consume(actual_tokens - self.estimated_tokens)
+
+
+@dataclass(order=True)
+class _Waiter:
+    rank: int
+    seq: int
+    priority: str = field(compare=False)
+    tokens: int = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class LLMScheduler:
+    """Admit LLM calls in priority order (emergency > urgent > routine, FIFO
+    within a priority) subject to a concurrency cap and requests/tokens per
+    minute budgets. Throttle responses (429/503/529) pause all admissions for
+    the provider's retry-after or an exponential backoff, then retry.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.admitted = defaultdict(int)
+        self.throttled = 0
+        self.retries = 0
+        self._waits = defaultdict(lambda: deque(maxlen=1000))
+
+    @asynccontextmanager
+    async def slot(self, priority: str, estimated_tokens: int):
+        """Wait for admission, yield a Slot, release it on exit."""
+        slot = await self._acquire(priority, estimated_tokens)
+        try:
+            yield slot
+        finally:
+            self._in_flight -= 1
+            self._dispatch()
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable],
+        priority: str,
+        estimated_tokens: int,
+        usage_tokens: Callable[[object], int] = lambda result: 0,
+    ):
+        """Run `call` under a slot, retrying throttle and connection errors."""
+        attempt = 0
+        while True:
+            async with self.slot(priority, estimated_tokens) as slot:
+                try:
+                    result = await call()
+                except Exception as e:
+                    delay = self.retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                else:
+                    actual = usage_tokens(result)
+                    if actual:
+                        slot.settle(actual)
+                    return result
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying `error`, or None if it should not be retried.
+
+        Throttle responses also pause admission for every queued call.
+        """
+        if attempt >= self.max_retries:
+            return None
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay *= random.uniform(0.8, 1.2)
+        if isinstance(error, anthropic.APIStatusError):
+            if error.status_code not in THROTTLE_STATUS_CODES:
+                return None
+            retry_after = error.response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            self.throttled += 1
+            self.pause(delay)
+            logger.warning(
+                "LLM provider throttled, backing off",
+                status_code=error.status_code,
+                delay=round(delay, 2),
+                attempt=attempt + 1,
+            )
+            return delay
+        if isinstance(error, (anthropic.APIConnectionError, anthropic.APITimeoutError)):
+            return delay
+        return None
+
+    def pause(self, seconds: float) -> None:
+        """Stop admitting new calls for `seconds`."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def _acquire(self, priority: str, estimated_tokens: int) -> Slot:
+        waiter = _Waiter(
+            rank=PRIORITY_RANK.get(priority, PRIORITY_RANK[DEFAULT_PRIORITY]),
+            seq=next(self._seq),
+            priority=priority,
+            tokens=estimated_tokens,
+            enqueued_at=time.monotonic(),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._heap, waiter)
+        self._dispatch()
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as we were cancelled: give the slot back
+                self._in_flight -= 1
+                self._dispatch()
+            raise
+
+    def _dispatch(self) -> None:
+        """Admit waiters from the head of the queue while capacity allows."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.monotonic()
+        while self._heap:
+            waiter = self._heap[0]
+            if waiter.future.done():
+                heapq.heappop(self._heap)
+                continue
+            if self._in_flight >= self.max_concurrency:
+                return
+            delay = max(
+                self._paused_until - now,
+                self._requests.time_until(1, now),
+                self._tokens.time_until(waiter.tokens, now),
+            )
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._heap)
+            self._requests.consume(1)
+            self._tokens.consume(waiter.tokens)
+            self._in_flight += 1
+            wait = now - waiter.enqueued_at
+            self.admitted[waiter.priority] += 1
+            self._waits[waiter.priority].append(wait)
+            waiter.future.set_result(
+                Slot(self, waiter.priority, waiter.tokens, wait_seconds=wait)
+            )
+
+    def stats(self) -> dict:
+        """Queue depth, in-flight calls and wait-time percentiles per priority."""
+        depth = defaultdict(int)
+        for waiter in self._heap:
+            if not waiter.future.done():
+                depth[waiter.priority] += 1
+        waits = {}
+        for priority, samples in self._waits.items():
+            ordered = sorted(samples)
+            waits[priority] = {
+                "samples": len(ordered),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+                "p95_ms": round(ordered[int(len(ordered) * 0.95)] * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": dict(depth),
+            "admitted": dict(self.admitted),
+            "wait_time": waits,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "request_budget": None if self._requests.unlimited else round(self._requests.tokens, 1),
+            "token_budget": None if self._tokens.unlimited else round(self._tokens.tokens, 1),
+        }
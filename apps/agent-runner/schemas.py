@@ -0,0 +1,75 @@
+"""Request and response models for the agent runner."""
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+
+class AgentRequest(BaseModel):
+    agent_name: str = Field(..., description="Name of the agent to invoke")
+    context: dict = Field(default_factory=dict, description="Context data for the agent")
+    ticket_id: Optional[str] = None
+    validate_output: bool = True
+    use_cache: bool = Field(True, description="Allow serving this run from the response cache")
+    priority: Optional[str] = Field(
+        None, description="emergency, urgent or routine; defaults to the ticket priority in context"
+    )
+
+
+class LLMUsage(BaseModel):
+    input_tokens: int = 0  # uncached input
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cost_usd: float = 0.0
+
+
+class AgentResponse(BaseModel):
+    agent_name: str
+    output: dict
+    validation_passed: bool
+    raw_response: str
+    cached: bool = False
+    run_id: Optional[str] = None
+    context_tokens: int = 0  # estimated tokens of encoded context sent to the model
+    context_tokens_saved: int = 0  # versus the full pretty-printed context
+    context_truncated: bool = False
+    usage: Optional[LLMUsage] = None  # None when served from cache
+
+
+class AgentBatchRequest(BaseModel):
+    requests: List[AgentRequest] = Field(..., description="Agent runs to execute concurrently")
+
+
+class PipelineStep(BaseModel):
+    id: str = Field(..., description="Unique step id, used to reference this step's result")
+    agent_name: str
+    depends_on: List[str] = Field(default_factory=list)
+    context: dict = Field(default_factory=dict, description="Static context for this step")
+    inputs: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Context key -> source path, e.g. '$input.ticket' or 'scope.output'",
+    )
+    validate_output: bool = True
+    use_cache: bool = True
+
+
+class PipelineRequest(BaseModel):
+    name: str = "pipeline"
+    steps: List[PipelineStep]
+    context: dict = Field(default_factory=dict, description="Pipeline input, addressable as $input")
+    ticket_id: Optional[str] = None
+
+
+class PipelineStepResult(BaseModel):
+    id: str
+    agent_name: str
+    status: str  # completed, failed, skipped
+    response: Optional[AgentResponse] = None
+    error: Optional[str] = None
+    started_ms: float = 0.0
+    duration_ms: float = 0.0
+
+
+class PipelineResponse(BaseModel):
+    name: str
+    steps: List[PipelineStepResult]
+    duration_ms: float
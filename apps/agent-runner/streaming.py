@@ -0,0 +1,66 @@
+"""Incremental JSON parsing for streamed agent output."""
+from typing import List, Tuple
+import json
+
+
+class IncrementalObjectParser:
+    """Parse a JSON object as it streams in and report each top-level member
+    as soon as its value is complete.
+
+    Text before the opening brace (such as a ```json fence) is ignored. Only
+    the top level is tracked, so nested objects and arrays are reported
+    whole once they close. The parser never raises; a member that fails to
+    parse is skipped, and the full response is still parsed at the end.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = -1
+
+    def feed(self, chunk: str) -> List[Tuple[str, object]]:
+        """Consume a chunk of text and return newly completed (key, value) pairs."""
+        self.text += chunk
+        completed = []
+        text = self.text
+        while self._pos < len(text) and not self.done:
+            char = text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._member_start = self._pos + 1
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_member(self._pos, completed)
+                    self.done = True
+            elif char == "," and self._depth == 1:
+                self._complete_member(self._pos, completed)
+                self._member_start = self._pos + 1
+            self._pos += 1
+        return completed
+
+    def _complete_member(self, end: int, completed: list) -> None:
+        member = self.text[self._member_start:end].strip()
+        if not member:
+            return
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            return
+        completed.extend(parsed.items())
@@ -0,0 +1,101 @@
+"""Usage ledger - input, output and prompt-cache token counts and cost per agent and per ticket."""
+from collections import OrderedDict, defaultdict
+from typing import Dict, Optional
+
+from schemas import LLMUsage
+
+TOKEN_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+)
+
+
+class UsagePrices:
+    """USD per million tokens. Cache writes and reads are billed as multiples
+    of the base input price."""
+
+    def __init__(
+        self,
+        input_per_mtok: float,
+        output_per_mtok: float,
+        cache_write_multiplier: float = 1.25,
+        cache_read_multiplier: float = 0.1,
+    ):
+        self.input_per_mtok = input_per_mtok
+        self.output_per_mtok = output_per_mtok
+        self.cache_write_multiplier = cache_write_multiplier
+        self.cache_read_multiplier = cache_read_multiplier
+
+    def cost(self, usage: LLMUsage) -> float:
+        return (
+            usage.input_tokens * self.input_per_mtok
+            + usage.cache_creation_input_tokens * self.input_per_mtok * self.cache_write_multiplier
+            + usage.cache_read_input_tokens * self.input_per_mtok * self.cache_read_multiplier
+            + usage.output_tokens * self.output_per_mtok
+        ) / 1_000_000
+
+
+def usage_from_response(raw_usage, prices: UsagePrices) -> LLMUsage:
+    """Build an LLMUsage from the SDK's `message.usage`. Cache fields are
+    absent when prompt caching is off, so missing values count as zero."""
+    usage = LLMUsage(**{field: getattr(raw_usage, field, 0) or 0 for field in TOKEN_FIELDS})
+    usage.cost_usd = round(prices.cost(usage), 6)
+    return usage
+
+
+def _empty_totals() -> dict:
+    return {"calls": 0, **{field: 0 for field in TOKEN_FIELDS}, "cost_usd": 0.0}
+
+
+def _add(totals: dict, usage: LLMUsage) -> None:
+    totals["calls"] += 1
+    for field in TOKEN_FIELDS:
+        totals[field] += getattr(usage, field)
+    totals["cost_usd"] += usage.cost_usd
+
+
+def _rounded(totals: dict) -> dict:
+    cacheable = totals["input_tokens"] + totals["cache_read_input_tokens"] + totals["cache_creation_input_tokens"]
+    return {
+        **totals,
+        "cost_usd": round(totals["cost_usd"], 6),
+        "cache_hit_ratio": round(totals["cache_read_input_tokens"] / cacheable, 4) if cacheable else 0.0,
+    }
+
+
+class UsageLedger:
+    """In-process aggregate of LLM usage since start.
+
+    Per-ticket totals are kept for the most recently active `max_tickets`
+    tickets; the durable per-ticket record is the `usage` field of each
+    completion event stored by the API.
+    """
+
+    def __init__(self, max_tickets: int = 10000):
+        self.max_tickets = max_tickets
+        self._total = _empty_totals()
+        self._by_agent: Dict[str, dict] = defaultdict(_empty_totals)
+        self._by_ticket: "OrderedDict[str, dict]" = OrderedDict()
+
+    def record(self, agent_name: str, ticket_id: Optional[str], usage: LLMUsage) -> None:
+        _add(self._total, usage)
+        _add(self._by_agent[agent_name], usage)
+        if ticket_id:
+            totals = self._by_ticket.pop(ticket_id, None) or _empty_totals()
+            _add(totals, usage)
+            self._by_ticket[ticket_id] = totals
+            while len(self._by_ticket) > self.max_tickets:
+                self._by_ticket.popitem(last=False)
+
+    def ticket(self, ticket_id: str) -> Optional[dict]:
+        totals = self._by_ticket.get(ticket_id)
+        return _rounded(totals) if totals else None
+
+    def stats(self) -> dict:
+        return {
+            "total": _rounded(self._total),
+            "by_agent": {agent: _rounded(totals) for agent, totals in sorted(self._by_agent.items())},
+            "tickets_tracked": len(self._by_ticket),
+        }
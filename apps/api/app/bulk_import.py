@@ -0,0 +1,64 @@
+"""Bulk import CLI - loads a client's maintenance history from a CSV / NDJSON export.
+
+    cd apps/api
+    python -m app.bulk_import --client-id <uuid> --kind tickets tickets.csv
+    python -m app.bulk_import --client-id <uuid> --kind messages messages.ndjson
+    python -m app.bulk_import --client-id <uuid> --kind invoices invoices.csv
+
+    # Resume an interrupted job from its last checkpoint
+    python -m app.bulk_import --job <uuid> tickets.csv
+
+Import tickets first: messages and invoices reference them by legacy id.
+"""
+from pathlib import Path
+from uuid import UUID
+import argparse
+import asyncio
+import sys
+
+from app.services.bulk_import import FORMATS, KINDS, connect, rejections, run_import
+
+
+def print_progress(event: dict) -> None:
+    if event["phase"] == "staging":
+        print(f"  staged {event['rows_staged']} rows", flush=True)
+    else:
+        print(f"  load: {event['step']}", flush=True)
+
+
+async def main(args: argparse.Namespace) -> int:
+    conn = await connect()
+    try:
+        print(f"Importing {args.path}")
+        job = await run_import(
+            conn,
+            args.path,
+            client_id=args.client_id,
+            kind=args.kind,
+            fmt=args.format,
+            job_id=args.job,
+            progress=print_progress,
+        )
+        print(
+            f"Job {job['id']} {job['status']}: {job['rows_imported']} imported, "
+            f"{job['rows_skipped']} skipped, {job['rows_rejected']} rejected"
+        )
+        for row in await rejections(conn, job, limit=args.show_rejections):
+            print(f"  line {row['line_no']} ({row['legacy_id']}): {row['error']}")
+    finally:
+        await conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--client-id", type=UUID)
+    parser.add_argument("--kind", choices=KINDS)
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--job", type=UUID, help="resume this import job")
+    parser.add_argument("--show-rejections", type=int, default=20)
+    args = parser.parse_args()
+    if args.job is None and (args.client_id is None or args.kind is None):
+        parser.error("--client-id and --kind are required for a new import")
+    sys.exit(asyncio.run(main(args)))
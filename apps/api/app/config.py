@@ -17,6 +17,36 @@ class Settings(BaseSettings):
     twilio_auth_token: str = ""
     twilio_phone_number: str = ""
 
+    # Intake queue: webhooks persist the payload and ack immediately, workers
+    # run intake and send the reply as an outbound message
+    intake_async_mode: bool = False
+    intake_workers: int = 8
+    intake_poll_interval_seconds: float = 1.0
+    intake_max_attempts: int = 5
+    intake_retry_backoff_seconds: float = 5.0
+    intake_visibility_timeout_seconds: float = 300.0
+
+    # Contact resolution cache (intake lookups by phone / email)
+    contact_cache_ttl_seconds: float = 300.0
+    contact_cache_miss_ttl_seconds: float = 30.0
+    contact_cache_max_entries: int = 50000
+
+    # Conversation threading: messages from a contact with an open ticket
+    # active within this many hours join that ticket (0 disables)
+    conversation_window_hours: float = 72.0
+
+    # Single-ticket read cache for GET /tickets/{id} (0 disables); bounds how
+    # long another process's ticket change can go unseen
+    ticket_cache_ttl_seconds: float = 30.0
+    ticket_cache_max_entries: int = 5000
+
+    # GET /tickets/stream (SSE): events kept per process for Last-Event-ID
+    # resumption, per-subscriber queue before a slow client is dropped
+    ticket_stream_buffer_size: int = 2000
+    ticket_stream_queue_size: int = 256
+    ticket_stream_max_subscribers: int = 5000
+    ticket_stream_heartbeat_seconds: float = 15.0
+
     # AI
     anthropic_api_key: str = ""
 
@@ -1,10 +1,15 @@
 """Agentic Property Management - API Service."""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import structlog
 
-from app.routers import webhooks, tickets, events
+from app.routers import webhooks, tickets, events, imports, stats
 from app.config import settings
+from app.database import async_session
+from app.services.emergency import detectors as emergency_detectors
+from app.services.intake_queue import IntakeWorkerPool
+from app.services.ticket_stream import hub as ticket_hub
 
 structlog.configure(
     processors=[
@@ -14,10 +19,46 @@ structlog.configure(
     ],
 )
 
+logger = structlog.get_logger()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load per-client emergency keywords, start the ticket change listener
+    and, when webhooks run in async mode, the intake worker pool."""
+    try:
+        async with async_session() as db:
+            await emergency_detectors.reload(db)
+    except Exception as e:
+        # Global keywords still apply; client keywords load on their next change
+        logger.error("Failed to load client emergency keywords", error=str(e))
+
+    await ticket_hub.start()
+
+    app.state.intake_workers = None
+    if settings.intake_async_mode:
+        app.state.intake_workers = IntakeWorkerPool(
+            async_session,
+            concurrency=settings.intake_workers,
+            poll_interval=settings.intake_poll_interval_seconds,
+            max_attempts=settings.intake_max_attempts,
+            retry_backoff=settings.intake_retry_backoff_seconds,
+            visibility_timeout=settings.intake_visibility_timeout_seconds,
+        )
+        app.state.intake_workers.start()
+
+    yield
+
+    if app.state.intake_workers is not None:
+        await app.state.intake_workers.stop()
+    await ticket_hub.stop()
+
+
 app = FastAPI(
     title="Agentic Property Management API",
     description="AI-driven property maintenance workflow automation",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -32,6 +73,8 @@ app.add_middleware(
 app.include_router(webhooks.router)
 app.include_router(tickets.router)
 app.include_router(events.router)
+app.include_router(imports.router)
+app.include_router(stats.router)
 
 
 @app.get("/")
@@ -1,9 +1,11 @@
 from app.models.core import (
     Client, Property, Unit, Contact, Vendor, VendorScore,
     Ticket, WorkOrder, Quote, Appointment, Invoice, Message, AuditEvent,
+    IntakeQueueItem, ProcessedEvent, ImportJob, TicketStatusCount, TicketHourlyCount,
 )
 
 __all__ = [
     "Client", "Property", "Unit", "Contact", "Vendor", "VendorScore",
     "Ticket", "WorkOrder", "Quote", "Appointment", "Invoice", "Message", "AuditEvent",
+    "IntakeQueueItem", "ProcessedEvent", "ImportJob", "TicketStatusCount", "TicketHourlyCount",
 ]
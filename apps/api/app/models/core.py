@@ -2,10 +2,10 @@ import uuid
 from datetime import datetime, date
 from typing import Optional, List
 from sqlalchemy import (
-    String, Text, Boolean, Integer, Numeric, Date, DateTime, ForeignKey, ARRAY, JSON,
+    String, Text, Boolean, Integer, BigInteger, Numeric, Date, DateTime, ForeignKey, ARRAY, JSON, Computed,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
 from app.database import Base
 
 
@@ -22,6 +22,8 @@ class Client(Base):
     preferred_contact_method: Mapped[str] = mapped_column(String(20), default="email")
     reporting_cadence: Mapped[str] = mapped_column(String(20), default="weekly")
     timezone: Mapped[str] = mapped_column(String(50), default="America/New_York")
+    # Extra emergency phrases on top of EMERGENCY_KEYWORDS (migration 005)
+    emergency_keywords: Mapped[Optional[list]] = mapped_column(ARRAY(Text))
     active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -50,6 +52,14 @@ class Property(Base):
     active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    search_address: Mapped[Optional[str]] = mapped_column(
+        Text,
+        Computed(
+            "coalesce(name, '') || ' ' || coalesce(address_line1, '') || ' ' || "
+            "coalesce(address_line2, '') || ' ' || coalesce(city, '')"
+        ),
+        deferred=True,
+    )
 
     client: Mapped["Client"] = relationship(back_populates="properties")
     units: Mapped[List["Unit"]] = relationship(back_populates="property")
@@ -84,6 +94,9 @@ class Contact(Base):
     last_name: Mapped[str] = mapped_column(String(100))
     email: Mapped[Optional[str]] = mapped_column(String(255))
     phone: Mapped[Optional[str]] = mapped_column(String(50))
+    # Canonical forms maintained by the database (migration 004)
+    phone_e164: Mapped[Optional[str]] = mapped_column(String(20), Computed("normalize_phone_e164(phone)"))
+    email_normalized: Mapped[Optional[str]] = mapped_column(String(255), Computed("normalize_email(email)"))
     role: Mapped[str] = mapped_column(String(50))
     preferred_contact_method: Mapped[str] = mapped_column(String(20), default="sms")
     notification_enabled: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -154,6 +167,16 @@ class Ticket(Base):
     closed_reason: Mapped[Optional[str]] = mapped_column(String(50))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Deferred: only search reads it, and it is the widest column on the row
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english'::regconfig, coalesce(summary, '')), 'A') || "
+            "setweight(to_tsvector('english'::regconfig, coalesce(trade, '')), 'A') || "
+            "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')"
+        ),
+        deferred=True,
+    )
 
     client: Mapped["Client"] = relationship(back_populates="tickets")
     work_orders: Mapped[List["WorkOrder"]] = relationship(back_populates="ticket")
@@ -272,6 +295,11 @@ class Message(Base):
     agent_name: Mapped[Optional[str]] = mapped_column(String(50))
     status: Mapped[str] = mapped_column(String(20), default="sent")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('english'::regconfig, coalesce(subject, '') || ' ' || coalesce(body, ''))"),
+        deferred=True,
+    )
 
     ticket: Mapped[Optional["Ticket"]] = relationship(back_populates="messages")
 
@@ -290,3 +318,70 @@ class AuditEvent(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
     ticket: Mapped[Optional["Ticket"]] = relationship(back_populates="audit_events")
+
+
+class IntakeQueueItem(Base):
+    __tablename__ = "intake_queue"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    channel: Mapped[str] = mapped_column(String(20))
+    external_id: Mapped[Optional[str]] = mapped_column(String(255))
+    payload: Mapped[dict] = mapped_column(JSONB)
+    status: Mapped[str] = mapped_column(String(20), default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    processed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    result: Mapped[Optional[dict]] = mapped_column(JSONB)
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class ProcessedEvent(Base):
+    __tablename__ = "processed_events"
+
+    run_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(100))
+    ticket_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True))
+    result: Mapped[Optional[dict]] = mapped_column(JSONB)
+    processed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    client_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("clients.id"))
+    kind: Mapped[str] = mapped_column(String(20))
+    format: Mapped[str] = mapped_column(String(10))
+    source_name: Mapped[Optional[str]] = mapped_column(String(255))
+    status: Mapped[str] = mapped_column(String(20), default="staging")
+    rows_staged: Mapped[int] = mapped_column(Integer, default=0)
+    rows_imported: Mapped[int] = mapped_column(Integer, default=0)
+    rows_skipped: Mapped[int] = mapped_column(Integer, default=0)
+    rows_rejected: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+# Dashboard counters, maintained by triggers on tickets (migration 012);
+# read-only from the application
+class TicketStatusCount(Base):
+    __tablename__ = "ticket_status_counts"
+
+    client_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    status: Mapped[str] = mapped_column(String(30), primary_key=True)
+    priority: Mapped[str] = mapped_column(String(20), primary_key=True)
+    tickets: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class TicketHourlyCount(Base):
+    __tablename__ = "ticket_hourly_counts"
+
+    client_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    priority: Mapped[str] = mapped_column(String(20), primary_key=True)
+    created: Mapped[int] = mapped_column(Integer, default=0)
+    closed: Mapped[int] = mapped_column(Integer, default=0)
@@ -3,8 +3,10 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.schemas.tickets import EventIngest, QuoteCreate, AppointmentCreate, InvoiceCreate
-from app.services.orchestrator import handle_event
+from app.schemas.tickets import (
+    EventIngest, EventBatchIngest, EventBatchResponse, QuoteCreate, AppointmentCreate, InvoiceCreate,
+)
+from app.services.event_ingest import ingest_event_once, ingest_events
 from app.models import Quote, Appointment, Invoice
 
 import structlog
@@ -15,12 +17,27 @@ router = APIRouter(tags=["events"])
 
 @router.post("/events")
 async def ingest_event(payload: EventIngest, db: AsyncSession = Depends(get_db)):
-    """Ingest a generic event and route it through the orchestrator."""
+    """Ingest a generic event and route it through the orchestrator. An
+    event whose `run_id` was already processed returns the original result."""
     logger.info("Event received", event_type=payload.event_type, ticket_id=payload.ticket_id)
-    result = await handle_event(db, payload)
+    _, result = await ingest_event_once(db, payload)
     return result
 
 
+@router.post("/events/batch", response_model=EventBatchResponse)
+async def ingest_event_batch(payload: EventBatchIngest, db: AsyncSession = Depends(get_db)):
+    """Ingest several events in one request, processed in order, each in its
+    own transaction.
+
+    Every event gets a result: `processed`, `duplicate` (its `run_id` was
+    already processed, e.g. a retried batch; not applied again), `rejected`
+    (invalid; retrying won't help) or `failed` (transient; retry it). One
+    bad event does not fail the others.
+    """
+    logger.info("Event batch received", count=len(payload.events))
+    return await ingest_events(db, payload.events)
+
+
 @router.post("/quotes", tags=["quotes"])
 async def create_quote(payload: QuoteCreate, db: AsyncSession = Depends(get_db)):
     """Record a vendor quote."""
@@ -0,0 +1,92 @@
+"""Bulk historical import endpoints (see app/services/bulk_import.py)."""
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
+import tempfile
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app.services.bulk_import import FORMATS, KINDS, connect, get_job, load, rejections, run_import
+
+import structlog
+
+logger = structlog.get_logger()
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+
+@router.post("")
+async def create_import(
+    request: Request,
+    client_id: UUID,
+    kind: str,
+    format: str = "csv",
+    source_name: Optional[str] = None,
+    job_id: Optional[UUID] = None,
+):
+    """Import a CSV / NDJSON export sent as the raw request body, e.g.
+    `curl --data-binary @tickets.csv "/imports?client_id=...&kind=tickets"`.
+
+    Pass `job_id` with the same file to resume an interrupted upload.
+    """
+    if kind not in KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown import kind: {kind}. Valid kinds: {list(KINDS)}")
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown import format: {format}. Valid formats: {list(FORMATS)}")
+
+    # Spool the upload to disk; staging reads it back in COPY-sized batches
+    with tempfile.NamedTemporaryFile(suffix=f".{format}") as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.flush()
+        logger.info("Import upload received", client_id=str(client_id), kind=kind, bytes=upload.tell())
+
+        conn = await connect()
+        try:
+            job = await run_import(
+                conn,
+                Path(upload.name),
+                client_id=client_id,
+                kind=kind,
+                fmt=format,
+                source_name=source_name or f"{kind} upload",
+                job_id=job_id,
+            )
+            return {**job, "rejections": await rejections(conn, job)}
+        except LookupError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        finally:
+            await conn.close()
+
+
+@router.get("/{job_id}")
+async def get_import(job_id: UUID):
+    """Import progress and counts, with up to 100 rejected rows and their reasons."""
+    conn = await connect()
+    try:
+        job = await get_job(conn, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Import job not found")
+        return {**job, "rejections": await rejections(conn, job)}
+    finally:
+        await conn.close()
+
+
+@router.post("/{job_id}/resume")
+async def resume_import(job_id: UUID):
+    """Retry the load step of a staged or failed job."""
+    conn = await connect()
+    try:
+        job = await get_job(conn, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Import job not found")
+        if job["status"] == "completed":
+            return {**job, "rejections": await rejections(conn, job)}
+        if job["status"] == "staging":
+            raise HTTPException(
+                status_code=409,
+                detail="Job is still staging; upload the same file again with job_id to resume it",
+            )
+        job = await load(conn, job)
+        return {**job, "rejections": await rejections(conn, job)}
+    finally:
+        await conn.close()
@@ -0,0 +1,30 @@
+"""Operational dashboard stats."""
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.services.stats import dashboard_stats
+
+import structlog
+
+logger = structlog.get_logger()
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("")
+async def get_stats(
+    client_id: Optional[UUID] = None,
+    hours: int = Query(default=24, ge=1, le=24 * 90, description="Length of the created/closed series"),
+    bucket: str = Query(default="hour", pattern="^(hour|day)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Open tickets by status and priority (overall and per client),
+    emergencies in the last 24 hours, and a created/closed series.
+
+    Served from counters kept current by database triggers, so the cost of
+    a refresh does not grow with the number of tickets.
+    """
+    return await dashboard_stats(db, client_id=client_id, hours=hours, bucket=bucket)
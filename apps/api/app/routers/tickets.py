@@ -1,14 +1,28 @@
 """Ticket CRUD and lifecycle endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import Optional, List
+from sqlalchemy import select, func, tuple_
+from typing import Optional, List, Union
 from uuid import UUID
+import asyncio
+import json
 
-from app.database import get_db
+from app.database import get_db, async_session
 from app.models import Ticket, AuditEvent
-from app.schemas.tickets import TicketCreate, TicketUpdate, TicketResponse
+from app.schemas.tickets import (
+    TicketCreate, TicketUpdate, TicketResponse, TicketPage, TicketSearchHit,
+    TicketBulkUpdate, TicketBulkResponse,
+)
+from app.services.bulk_update import bulk_update_tickets
 from app.services.orchestrator import transition_ticket
+from app.services.pagination import decode_cursor, encode_cursor
+from app.services.search import search_tickets
+from app.services.ticket_cache import make_etag, not_modified, ticket_cache
+from app.services.ticket_stream import hub as ticket_hub
+from app.config import settings
 
 import structlog
 
@@ -51,36 +65,205 @@ async def create_ticket(payload: TicketCreate, db: AsyncSession = Depends(get_db
     return ticket
 
 
-@router.get("", response_model=List[TicketResponse])
+@router.get("", response_model=Union[List[TicketResponse], TicketPage])
 async def list_tickets(
+    request: Request,
+    response: Response,
     client_id: Optional[UUID] = None,
     status: Optional[str] = None,
     priority: Optional[str] = None,
-    limit: int = Query(default=50, le=200),
-    offset: int = 0,
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Keyset cursor from a previous page's next_cursor; pass it "
+                    "empty to start. Returns {items, next_cursor} instead of a list.",
+    ),
     db: AsyncSession = Depends(get_db),
 ):
-    """List tickets with optional filters."""
-    query = select(Ticket).order_by(Ticket.created_at.desc())
+    """List tickets with optional filters, newest first.
+
+    The next page's cursor is returned in the `X-Next-Cursor` header (absent
+    on the last page). Cursor pages cost the same at any depth; `offset`
+    still works but scans every skipped row.
+
+    The ETag covers the page as fetched (ids and `updated_at` of its rows,
+    plus the row that decides whether there is a next page), so a poll with
+    `If-None-Match` gets a 304 without serializing anything while the page
+    is unchanged; it costs the same page query as a full response.
+    """
+    filters = []
     if client_id:
-        query = query.where(Ticket.client_id == client_id)
+        filters.append(Ticket.client_id == client_id)
     if status:
-        query = query.where(Ticket.status == status)
+        filters.append(Ticket.status == status)
     if priority:
-        query = query.where(Ticket.priority == priority)
-    query = query.limit(limit).offset(offset)
+        filters.append(Ticket.priority == priority)
+
+    query = select(Ticket).where(*filters).order_by(Ticket.created_at.desc(), Ticket.id.desc())
+    if cursor:
+        if offset:
+            raise HTTPException(status_code=400, detail="Use either offset or cursor, not both")
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(tuple_(Ticket.created_at, Ticket.id) < after)
+    query = query.limit(limit + 1).offset(offset)
     result = await db.execute(query)
-    return result.scalars().all()
+    tickets = result.scalars().all()
+
+    etag = make_etag(
+        "tickets",
+        request.url.query,
+        *(f"{t.id}@{t.updated_at.isoformat() if t.updated_at else ''}" for t in tickets),
+    )
+    if not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    next_cursor = None
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        next_cursor = encode_cursor(tickets[-1].created_at, tickets[-1].id)
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    if cursor is not None:
+        return TicketPage(items=tickets, next_cursor=next_cursor)
+    return tickets
+
+
+@router.post("/bulk", response_model=TicketBulkResponse)
+async def bulk_update(payload: TicketBulkUpdate, db: AsyncSession = Depends(get_db)):
+    """Apply one status change and/or field update to many tickets in a
+    single transaction, with a result per ticket.
+
+    `all_or_nothing` (default): if any ticket is missing or can't make the
+    transition, nothing is applied and the response is a 409 carrying the
+    per-ticket results. `best_effort`: valid tickets are updated, the rest
+    are reported as failed.
+    """
+    changes = payload.changes.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
+
+    result = await bulk_update_tickets(
+        db,
+        payload.ticket_ids,
+        changes,
+        mode=payload.mode,
+        actor_type="api",
+        detail=payload.detail or "",
+    )
+    if not result["applied"]:
+        raise HTTPException(status_code=409, detail=jsonable_encoder(result))
+    await db.commit()
+    return result
+
+
+@router.get("/search", response_model=List[TicketSearchHit])
+async def search(
+    q: str = Query(min_length=2, max_length=200, description="Words, \"phrases\", -exclusions, a ticket number or an address"),
+    client_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+):
+    """Ranked search over ticket text, messages, ticket numbers and property
+    addresses. Snippets are HTML-escaped with matches wrapped in `<mark>`."""
+    q = q.strip()
+    if len(q) < 2:
+        # Whitespace passes min_length, and a blank ticket-number pattern matches every ticket
+        raise HTTPException(status_code=400, detail="Search query must be at least 2 non-blank characters")
+    return await search_tickets(db, q, client_id=client_id, status=status, priority=priority, limit=limit)
+
+
+# Client reconnect delay sent to EventSource, in milliseconds
+STREAM_RETRY_MS = 3000
+
+
+@router.get("/stream")
+async def stream_ticket_changes(
+    request: Request,
+    client_id: Optional[UUID] = None,
+    status: Optional[List[str]] = Query(default=None, description="Repeatable status filter"),
+    priority: Optional[List[str]] = Query(default=None, description="Repeatable priority filter"),
+    last_event_id: Optional[str] = Query(
+        default=None,
+        description="Resume after this event id; EventSource sends the Last-Event-ID header itself",
+    ),
+):
+    """Server-sent events for ticket changes and new audit events.
+
+    Events are `ticket` (insert/update; carries old and new status and
+    priority) and `audit` (a new timeline event). A status/priority filter
+    matches on either the old or the new value. On reconnect, events missed
+    since Last-Event-ID are replayed; if that is no longer possible a
+    `reset` event tells the client to refetch `GET /tickets`. Clients that
+    fall too far behind are disconnected and resume the same way.
+    """
+    await ticket_hub.start()
+    if ticket_hub.at_capacity:
+        raise HTTPException(status_code=503, detail="Too many stream subscribers")
+    subscriber, backlog = ticket_hub.subscribe(
+        client_id=client_id,
+        statuses=status,
+        priorities=priority,
+        last_event_id=request.headers.get("last-event-id") or last_event_id,
+    )
+
+    async def events():
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            for event in backlog:
+                yield event.frame
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=settings.ticket_stream_heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if subscriber.overflowed:
+                    logger.warning("Ticket stream subscriber too slow, disconnecting", client_id=str(client_id))
+                    return
+                yield event.frame
+        finally:
+            ticket_hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stream/stats")
+async def ticket_stream_stats():
+    """Listener state, connected subscribers and slow-client disconnects."""
+    return ticket_hub.stats()
 
 
 @router.get("/{ticket_id}", response_model=TicketResponse)
-async def get_ticket(ticket_id: UUID, db: AsyncSession = Depends(get_db)):
-    """Get a single ticket by ID."""
-    result = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
-    ticket = result.scalar_one_or_none()
-    if not ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-    return ticket
+async def get_ticket(ticket_id: UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    """Get a single ticket by ID.
+
+    Served from the per-process ticket cache when possible; the ETag is
+    derived from `updated_at`, and a matching `If-None-Match` on a cached
+    ticket gets a 304 without touching the database.
+    """
+    cached = ticket_cache.get(ticket_id)
+    if cached is None:
+        result = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
+        ticket = result.scalar_one_or_none()
+        if not ticket:
+            raise HTTPException(status_code=404, detail="Ticket not found")
+        cached = ticket_cache.put(ticket)
+    if not_modified(request, cached.etag):
+        return Response(status_code=304, headers={"ETag": cached.etag})
+    return JSONResponse(cached.body, headers={"ETag": cached.etag})
 
 
 @router.patch("/{ticket_id}", response_model=TicketResponse)
@@ -108,24 +291,84 @@ async def update_ticket(
     return ticket
 
 
+# Rows fetched per round trip when streaming a timeline
+TIMELINE_STREAM_BATCH = 500
+
+
+def timeline_entry(e: AuditEvent) -> dict:
+    return {
+        "id": str(e.id),
+        "event_type": e.event_type,
+        "agent_name": e.agent_name,
+        "actor_type": e.actor_type,
+        "detail": e.detail,
+        "metadata": e.metadata,
+        "created_at": e.created_at.isoformat(),
+    }
+
+
 @router.get("/{ticket_id}/timeline")
-async def get_ticket_timeline(ticket_id: UUID, db: AsyncSession = Depends(get_db)):
-    """Get the full audit trail / event timeline for a ticket."""
-    result = await db.execute(
+async def get_ticket_timeline(
+    ticket_id: UUID,
+    request: Request,
+    since: Optional[datetime] = Query(default=None, description="Only events at or after this time"),
+    after_id: Optional[UUID] = Query(default=None, description="Only events after this event id"),
+    event_type: Optional[List[str]] = Query(default=None, description="Repeatable event type filter"),
+    stream: bool = Query(default=False, description="Stream NDJSON, one event per line"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the full audit trail / event timeline for a ticket, oldest first.
+
+    To tail a ticket, pass the id of the last event received as `after_id`.
+    With `stream=true` events are read through a server-side cursor and
+    written as NDJSON as they arrive, so memory use does not grow with the
+    length of the ticket's history.
+
+    The ETag is derived from the ticket's latest event id and the query, so a
+    poll with `If-None-Match` gets a 304 from a single index lookup until a
+    new event is recorded.
+    """
+    latest_id = (await db.execute(
+        select(AuditEvent.id)
+        .where(AuditEvent.ticket_id == ticket_id)
+        .order_by(AuditEvent.created_at.desc(), AuditEvent.id.desc())
+        .limit(1)
+    )).scalar_one_or_none()
+    etag = make_etag("timeline", ticket_id, latest_id, request.url.query)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    query = (
         select(AuditEvent)
         .where(AuditEvent.ticket_id == ticket_id)
-        .order_by(AuditEvent.created_at.asc())
+        .order_by(AuditEvent.created_at.asc(), AuditEvent.id.asc())
     )
-    events = result.scalars().all()
-    return [
-        {
-            "id": str(e.id),
-            "event_type": e.event_type,
-            "agent_name": e.agent_name,
-            "actor_type": e.actor_type,
-            "detail": e.detail,
-            "metadata": e.metadata,
-            "created_at": e.created_at.isoformat(),
-        }
-        for e in events
-    ]
+    if since:
+        query = query.where(AuditEvent.created_at >= since)
+    if event_type:
+        query = query.where(AuditEvent.event_type.in_(event_type))
+    if after_id:
+        anchor = (await db.execute(
+            select(AuditEvent.created_at).where(
+                AuditEvent.id == after_id, AuditEvent.ticket_id == ticket_id
+            )
+        )).scalar_one_or_none()
+        if anchor is None:
+            raise HTTPException(status_code=404, detail="after_id event not found on this ticket")
+        query = query.where(tuple_(AuditEvent.created_at, AuditEvent.id) > tuple_(anchor, after_id))
+
+    if not stream:
+        result = await db.execute(query)
+        return JSONResponse(
+            [timeline_entry(e) for e in result.scalars().all()],
+            headers={"ETag": etag},
+        )
+
+    async def lines():
+        # Own session: the request's session is closed once the endpoint returns
+        async with async_session() as session:
+            result = await session.stream(query.execution_options(yield_per=TIMELINE_STREAM_BATCH))
+            async for event in result.scalars():
+                yield json.dumps(timeline_entry(event), default=str) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"ETag": etag})
@@ -8,6 +8,10 @@ from app.database import get_db
 from app.config import settings
 from app.schemas.webhooks import TwilioInboundSMS, EmailInbound, WebFormSubmission
 from app.services.intake import process_sms_intake, process_email_intake, process_form_intake
+from app.services.contacts import resolver as contact_resolver
+from app.services.emergency import detectors as emergency_detectors
+from app.services.idempotency import idempotency_stats, record_duplicate
+from app.services.intake_queue import enqueue_intake, queue_stats
 from app.services.audit import log_event
 
 import structlog
@@ -15,6 +19,8 @@ import structlog
 logger = structlog.get_logger()
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 
+EMPTY_TWIML = '<?xml version="1.0" encoding="UTF-8"?><Response></Response>'
+
 
 @router.post("/twilio/inbound", response_class=PlainTextResponse)
 async def twilio_inbound_sms(request: Request, db: AsyncSession = Depends(get_db)):
@@ -34,18 +40,46 @@ async def twilio_inbound_sms(request: Request, db: AsyncSession = Depends(get_db
     sms = TwilioInboundSMS(**data)
     logger.info("Inbound SMS received", from_number=sms.From, body_preview=sms.Body[:100])
 
+    if settings.intake_async_mode:
+        # Persist and ack now; an intake worker processes it and texts the reply
+        queued = await enqueue_intake(db, "sms", sms.MessageSid, data)
+        await db.commit()
+        if queued:
+            workers = getattr(request.app.state, "intake_workers", None)
+            if workers is not None:
+                workers.notify()
+        else:
+            record_duplicate("sms", "queue")
+            logger.info("Duplicate SMS delivery ignored", message_sid=sms.MessageSid)
+        return EMPTY_TWIML
+
     result = await process_sms_intake(db, sms)
 
     # Return TwiML response
     return f'<?xml version="1.0" encoding="UTF-8"?><Response><Message>{result["reply"]}</Message></Response>'
 
 
+def _intake_response(result: dict) -> dict:
+    """Webhook response for an intake result. `retriage` tells n8n whether to
+    run triage: for a new ticket, for a follow-up only when it materially
+    changed the ticket, and never for a duplicate delivery."""
+    duplicate = result.get("duplicate", False)
+    threaded = result.get("threaded", False)
+    return {
+        "status": "received",
+        "ticket_id": result.get("ticket_id"),
+        "threaded": threaded,
+        "duplicate": duplicate,
+        "retriage": False if duplicate else result.get("retriage", not threaded),
+    }
+
+
 @router.post("/email/inbound")
 async def email_inbound(payload: EmailInbound, db: AsyncSession = Depends(get_db)):
     """Receive inbound email (from SendGrid Inbound Parse or similar)."""
     logger.info("Inbound email received", from_email=payload.from_email, subject=payload.subject)
     result = await process_email_intake(db, payload)
-    return {"status": "received", "ticket_id": result.get("ticket_id")}
+    return _intake_response(result)
 
 
 @router.post("/form/inbound")
@@ -53,4 +87,19 @@ async def form_inbound(payload: WebFormSubmission, db: AsyncSession = Depends(ge
     """Receive web form submission from portal or landing page."""
     logger.info("Form submission received", name=payload.name, issue=payload.issue_description[:100])
     result = await process_form_intake(db, payload)
-    return {"status": "received", "ticket_id": result.get("ticket_id")}
+    return _intake_response(result)
+
+
+@router.get("/stats")
+async def webhook_stats(request: Request, db: AsyncSession = Depends(get_db)):
+    """Intake queue depth, oldest pending item, processing lag, suppressed
+    duplicate deliveries and contact cache hit rate."""
+    workers = getattr(request.app.state, "intake_workers", None)
+    return {
+        "async_mode": settings.intake_async_mode,
+        "idempotency": idempotency_stats(),
+        "contact_cache": contact_resolver.stats(),
+        "emergency_detector": emergency_detectors.stats(),
+        "queue": await queue_stats(db),
+        "workers": workers.worker_stats() if workers is not None else None,
+    }
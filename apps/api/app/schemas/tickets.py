@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Literal, Optional, List
 from uuid import UUID
 from datetime import datetime
 
@@ -54,6 +54,43 @@ class TicketResponse(BaseModel):
         from_attributes = True
 
 
+class TicketPage(BaseModel):
+    items: List[TicketResponse]
+    next_cursor: Optional[str] = None
+
+
+class TicketBulkUpdate(BaseModel):
+    ticket_ids: List[UUID] = Field(min_length=1, max_length=500)
+    changes: TicketUpdate  # same fields as PATCH /tickets/{id}, applied to every ticket
+    mode: Literal["all_or_nothing", "best_effort"] = "all_or_nothing"
+    detail: Optional[str] = None  # audit detail for the status changes
+
+
+class TicketBulkResult(BaseModel):
+    ticket_id: UUID
+    ok: bool
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TicketBulkResponse(BaseModel):
+    mode: str
+    applied: bool
+    succeeded: int
+    failed: int
+    results: List[TicketBulkResult]
+
+
+class TicketSearchHit(BaseModel):
+    ticket: TicketResponse
+    property_name: str
+    property_address: str
+    score: float
+    matched: List[str]  # text, message, number, property
+    snippet: Optional[str] = None  # HTML-escaped, matches in <mark>
+    message_snippet: Optional[str] = None
+
+
 class QuoteCreate(BaseModel):
     ticket_id: UUID
     vendor_id: UUID
@@ -98,6 +135,32 @@ class EventIngest(BaseModel):
         description="One of: inbound_message, quote_received, owner_approved, "
                     "appointment_completed, invoice_received, timer_fired"
     )
-    ticket_id: Optional[str] = None
+    ticket_id: Optional[UUID] = None
     payload: dict = Field(default_factory=dict)
     policies: Optional[dict] = None
+    run_id: Optional[str] = Field(
+        default=None,
+        max_length=64,
+        description="Agent run id; an event whose run id was already processed is not processed again",
+    )
+
+
+class EventBatchIngest(BaseModel):
+    # Validated one by one, so a malformed event is rejected on its own
+    events: List[dict]
+
+
+class EventBatchResult(BaseModel):
+    index: int
+    run_id: Optional[str] = None
+    status: Literal["processed", "duplicate", "rejected", "failed"]
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class EventBatchResponse(BaseModel):
+    processed: int
+    duplicates: int
+    rejected: int
+    failed: int
+    results: List[EventBatchResult]
@@ -32,6 +32,9 @@ class EmailInbound(BaseModel):
     body_html: Optional[str] = None
     attachments: Optional[List[str]] = None
     message_id: Optional[str] = None
+    # Threading headers; `references` is the raw space-separated header
+    in_reply_to: Optional[str] = None
+    references: Optional[str] = None
 
 
 class WebFormSubmission(BaseModel):
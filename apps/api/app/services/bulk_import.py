@@ -0,0 +1,582 @@
+"""Bulk import - loads a client's maintenance history from CSV / NDJSON exports.
+
+Rows are COPYed into text-typed staging tables (migration 007) in batches,
+each batch committed together with the job's `rows_staged` checkpoint, so an
+interrupted upload resumes after the last staged row. The load step then
+validates, resolves properties, units, contacts, tickets and vendors with
+set-based joins, inserts the rows and writes their audit trail in a single
+transaction; a failed load leaves the staged rows in place to be retried.
+"""
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+from uuid import UUID
+import csv
+import json
+
+import asyncpg
+
+from app.config import settings
+from app.services.orchestrator import VALID_TRANSITIONS
+
+import structlog
+
+logger = structlog.get_logger()
+
+STAGING_COLUMNS = {
+    "tickets": (
+        "legacy_id", "property", "unit_number", "requester_phone", "requester_email",
+        "status", "priority", "trade", "summary", "description",
+        "created_at", "closed_at", "closed_reason",
+    ),
+    "messages": (
+        "legacy_id", "legacy_ticket_id", "direction", "channel", "from_address",
+        "to_address", "subject", "body", "external_id", "created_at",
+    ),
+    "invoices": (
+        "legacy_id", "legacy_ticket_id", "vendor", "invoice_number", "amount",
+        "status", "due_date", "paid_at", "created_at",
+    ),
+}
+KINDS = tuple(STAGING_COLUMNS)
+FORMATS = ("csv", "ndjson")
+
+COPY_BATCH_ROWS = 5000
+
+TICKET_STATUSES = list(VALID_TRANSITIONS)
+PRIORITIES = ["emergency", "urgent", "routine"]
+MESSAGE_DIRECTIONS = ["inbound", "outbound"]
+INVOICE_STATUSES = ["pending", "approved", "paid", "disputed", "overdue"]
+
+Progress = Callable[[dict], None]
+
+
+async def connect() -> asyncpg.Connection:
+    """A dedicated asyncpg connection; COPY is not available through the ORM session."""
+    return await asyncpg.connect(settings.database_url.replace("postgresql+asyncpg://", "postgresql://"))
+
+
+def detect_format(path: Path) -> str:
+    return "ndjson" if path.suffix.lower() in (".ndjson", ".jsonl") else "csv"
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    value = str(value).strip()
+    return value or None
+
+
+def read_records(path: Path, fmt: str, columns: Tuple[str, ...]) -> Iterator[Tuple[int, tuple, Optional[str]]]:
+    """Yield `(row_no, values, error)` per source row, numbered from 1.
+
+    Headers / keys are matched case-insensitively; unknown ones are ignored
+    and missing ones are NULL. A row that cannot be parsed is yielded with
+    empty values and an error, so it is reported rather than aborting the job.
+    """
+    empty = (None,) * len(columns)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+            for row_no, row in enumerate(reader, 1):
+                yield row_no, tuple(_text(row.get(c)) for c in columns), None
+            return
+
+        row_no = 0
+        for line in f:
+            if not line.strip():
+                continue
+            row_no += 1
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_no, empty, f"invalid JSON: {e.msg}"
+                continue
+            if not isinstance(row, dict):
+                yield row_no, empty, "invalid JSON: expected an object"
+                continue
+            row = {str(k).strip().lower(): v for k, v in row.items()}
+            yield row_no, tuple(_text(row.get(c)) for c in columns), None
+
+
+def _count(status: str) -> int:
+    """Row count from an asyncpg command status such as 'INSERT 0 42'."""
+    return int(status.rsplit(" ", 1)[-1])
+
+
+async def create_job(
+    conn: asyncpg.Connection,
+    client_id: UUID,
+    kind: str,
+    fmt: str,
+    source_name: Optional[str] = None,
+) -> dict:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown import kind: {kind}. Valid kinds: {list(KINDS)}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import format: {fmt}. Valid formats: {list(FORMATS)}")
+    try:
+        row = await conn.fetchrow(
+            "INSERT INTO import_jobs (client_id, kind, format, source_name) VALUES ($1, $2, $3, $4) RETURNING *",
+            client_id, kind, fmt, source_name,
+        )
+    except asyncpg.ForeignKeyViolationError:
+        raise LookupError(f"Client not found: {client_id}")
+    return dict(row)
+
+
+async def get_job(conn: asyncpg.Connection, job_id: UUID) -> Optional[dict]:
+    row = await conn.fetchrow("SELECT * FROM import_jobs WHERE id = $1", job_id)
+    return dict(row) if row else None
+
+
+async def rejections(conn: asyncpg.Connection, job: dict, limit: int = 100) -> List[dict]:
+    rows = await conn.fetch(
+        f"SELECT line_no, legacy_id, error FROM import_staging_{job['kind']} "
+        "WHERE job_id = $1 AND error IS NOT NULL ORDER BY line_no LIMIT $2",
+        job["id"], limit,
+    )
+    return [dict(r) for r in rows]
+
+
+async def stage(conn: asyncpg.Connection, job: dict, path: Path, progress: Optional[Progress] = None) -> dict:
+    """COPY the source file into the job's staging table, resuming after
+    `rows_staged` if an earlier attempt was interrupted."""
+    columns = STAGING_COLUMNS[job["kind"]]
+    table = f"import_staging_{job['kind']}"
+    staged = job["rows_staged"]
+    batch: list = []
+
+    async def flush() -> None:
+        async with conn.transaction():
+            await conn.copy_records_to_table(
+                table, records=batch, columns=("job_id", "line_no") + columns + ("error",)
+            )
+            await conn.execute(
+                "UPDATE import_jobs SET rows_staged = $2, updated_at = NOW() WHERE id = $1",
+                job["id"], staged,
+            )
+        batch.clear()
+        if progress:
+            progress({"phase": "staging", "rows_staged": staged})
+
+    for row_no, values, error in read_records(path, job["format"], columns):
+        if row_no <= job["rows_staged"]:
+            continue
+        batch.append((job["id"], row_no) + values + (error,))
+        staged = row_no
+        if len(batch) >= COPY_BATCH_ROWS:
+            await flush()
+    if batch:
+        await flush()
+
+    await conn.execute("UPDATE import_jobs SET status = 'staged', updated_at = NOW() WHERE id = $1", job["id"])
+    return await get_job(conn, job["id"])
+
+
+# Contacts are matched on the canonical columns from migration 004; inactive
+# contacts are included since history often names tenants who have moved out
+RESOLVE_CONTACT_SQL = """
+    UPDATE {table} s SET contact_id = c.id
+    FROM contacts c
+    WHERE s.job_id = $1 AND s.error IS NULL AND s.contact_id IS NULL
+      AND c.client_id = $2 AND c.{column} = {normalize}({source})
+"""
+
+# Source fields identifying a message / invoice row that has no legacy_id
+# (mutable ones such as an invoice's status or paid_at are left out, so a
+# later export of the same history still matches)
+IMPORT_KEY_COLUMNS = {
+    "messages": (
+        "legacy_ticket_id", "direction", "channel", "from_address", "to_address",
+        "subject", "body", "external_id", "created_at",
+    ),
+    "invoices": ("legacy_ticket_id", "vendor", "invoice_number", "amount", "due_date", "created_at"),
+}
+
+
+async def _skip_imported(conn: asyncpg.Connection, job: dict, map_table: str) -> int:
+    """Key the job's staged rows (migration 014), reject repeats within the
+    file and drop rows an earlier job already imported, as `_load_tickets`
+    does with import_ticket_map. Returns the number of rows dropped."""
+    job_id, client_id = job["id"], job["client_id"]
+    table = f"import_staging_{job['kind']}"
+    fingerprint = " || chr(31) || ".join(f"coalesce({c}, '')" for c in IMPORT_KEY_COLUMNS[job["kind"]])
+
+    await conn.execute(f"""
+        UPDATE {table} SET import_key = coalesce('id:' || legacy_id, 'row:' || md5({fingerprint}))
+        WHERE job_id = $1 AND error IS NULL
+    """, job_id)
+    await conn.execute(f"""
+        UPDATE {table} s SET error = CASE
+            WHEN s.legacy_id IS NULL THEN 'duplicate row in file' ELSE 'duplicate legacy_id in file'
+        END
+        FROM (
+            SELECT line_no, ROW_NUMBER() OVER (PARTITION BY import_key ORDER BY line_no) AS copy
+            FROM {table}
+            WHERE job_id = $1 AND error IS NULL
+        ) d
+        WHERE s.job_id = $1 AND s.line_no = d.line_no AND d.copy > 1
+    """, job_id)
+    return _count(await conn.execute(f"""
+        DELETE FROM {table} s
+        USING {map_table} m
+        WHERE s.job_id = $1 AND s.error IS NULL AND m.client_id = $2 AND m.import_key = s.import_key
+    """, job_id, client_id))
+
+
+async def _load_tickets(conn: asyncpg.Connection, job: dict, step: Callable[[str], None]) -> Tuple[int, int]:
+    job_id, client_id = job["id"], job["client_id"]
+
+    await conn.execute("""
+        UPDATE import_staging_tickets s SET error = 'duplicate legacy_id in file'
+        FROM (
+            SELECT line_no, ROW_NUMBER() OVER (PARTITION BY legacy_id ORDER BY line_no) AS copy
+            FROM import_staging_tickets
+            WHERE job_id = $1 AND error IS NULL AND legacy_id IS NOT NULL
+        ) d
+        WHERE s.job_id = $1 AND s.line_no = d.line_no AND d.copy > 1
+    """, job_id)
+    skipped = _count(await conn.execute("""
+        DELETE FROM import_staging_tickets s
+        USING import_ticket_map m
+        WHERE s.job_id = $1 AND s.error IS NULL AND m.client_id = $2 AND m.legacy_id = s.legacy_id
+    """, job_id, client_id))
+    await conn.execute("""
+        UPDATE import_staging_tickets SET error = CASE
+            WHEN legacy_id IS NULL THEN 'missing legacy_id'
+            WHEN summary IS NULL AND description IS NULL THEN 'missing summary'
+            WHEN property IS NULL THEN 'missing property'
+            WHEN created_at IS NOT NULL AND import_try_timestamptz(created_at) IS NULL THEN 'invalid created_at'
+            WHEN closed_at IS NOT NULL AND import_try_timestamptz(closed_at) IS NULL THEN 'invalid closed_at'
+            WHEN status IS NOT NULL AND lower(status) <> ALL($2::text[]) THEN 'unknown status'
+            WHEN priority IS NOT NULL AND lower(priority) <> ALL($3::text[]) THEN 'unknown priority'
+        END
+        WHERE job_id = $1 AND error IS NULL
+    """, job_id, TICKET_STATUSES, PRIORITIES)
+    step("validated")
+
+    await conn.execute("""
+        UPDATE import_staging_tickets s SET property_id = p.id
+        FROM properties p
+        WHERE s.job_id = $1 AND s.error IS NULL AND p.client_id = $2
+          AND lower(btrim(s.property)) IN (lower(p.name), lower(p.address_line1))
+    """, job_id, client_id)
+    await conn.execute("""
+        UPDATE import_staging_tickets s SET unit_id = u.id
+        FROM units u
+        WHERE s.job_id = $1 AND s.error IS NULL AND s.unit_number IS NOT NULL
+          AND u.property_id = s.property_id AND lower(u.unit_number) = lower(btrim(s.unit_number))
+    """, job_id)
+    await conn.execute("""
+        UPDATE import_staging_tickets SET error = CASE
+            WHEN property_id IS NULL THEN 'unknown property'
+            WHEN unit_number IS NOT NULL AND unit_id IS NULL THEN 'unknown unit'
+        END
+        WHERE job_id = $1 AND error IS NULL
+    """, job_id)
+    for column, normalize, source in (
+        ("phone_e164", "normalize_phone_e164", "requester_phone"),
+        ("email_normalized", "normalize_email", "requester_email"),
+    ):
+        await conn.execute(RESOLVE_CONTACT_SQL.format(
+            table="import_staging_tickets", column=column, normalize=normalize, source=f"s.{source}",
+        ), job_id, client_id)
+    step("resolved")
+
+    await conn.execute(
+        "UPDATE import_staging_tickets SET ticket_id = uuid_generate_v4() WHERE job_id = $1 AND error IS NULL",
+        job_id,
+    )
+    # Ticket numbers come straight from the sequence, so the per-row
+    # set_ticket_number trigger has nothing to do
+    imported = _count(await conn.execute("""
+        INSERT INTO tickets (
+            id, ticket_number, client_id, property_id, unit_id, requester_contact_id,
+            status, priority, trade, summary, description, source,
+            closed_at, closed_reason, created_at, updated_at
+        )
+        SELECT
+            s.ticket_id,
+            'TCK-' || LPAD(nextval('ticket_number_seq')::TEXT, 6, '0'),
+            $2::UUID, s.property_id, s.unit_id, s.contact_id,
+            coalesce(lower(s.status), CASE WHEN s.closed_at IS NOT NULL THEN 'closed' ELSE 'new' END),
+            coalesce(lower(s.priority), 'routine'),
+            left(lower(s.trade), 50),
+            coalesce(s.summary, left(s.description, 500)),
+            s.description,
+            'import',
+            import_try_timestamptz(s.closed_at),
+            left(s.closed_reason, 50),
+            coalesce(import_try_timestamptz(s.created_at), NOW()),
+            coalesce(import_try_timestamptz(s.closed_at), import_try_timestamptz(s.created_at), NOW())
+        FROM import_staging_tickets s
+        WHERE s.job_id = $1 AND s.error IS NULL
+        ORDER BY s.line_no
+    """, job_id, client_id))
+    await conn.execute("""
+        INSERT INTO import_ticket_map (client_id, legacy_id, ticket_id, job_id)
+        SELECT $2::UUID, legacy_id, ticket_id, job_id
+        FROM import_staging_tickets
+        WHERE job_id = $1 AND error IS NULL
+    """, job_id, client_id)
+    await conn.execute("""
+        INSERT INTO audit_events (ticket_id, event_type, agent_name, actor_type, actor_id, detail, metadata, created_at)
+        SELECT
+            s.ticket_id, 'ticket_imported', 'bulk_import', 'system', $1::UUID::TEXT,
+            'Imported from ' || coalesce($2::TEXT, 'legacy system') || ' (legacy id ' || s.legacy_id || ')',
+            jsonb_build_object('job_id', $1::UUID::TEXT, 'legacy_id', s.legacy_id, 'line_no', s.line_no),
+            coalesce(import_try_timestamptz(s.created_at), NOW())
+        FROM import_staging_tickets s
+        WHERE s.job_id = $1 AND s.error IS NULL
+    """, job_id, job["source_name"])
+    step("inserted")
+    return imported, skipped
+
+
+async def _load_messages(conn: asyncpg.Connection, job: dict, step: Callable[[str], None]) -> Tuple[int, int]:
+    job_id, client_id = job["id"], job["client_id"]
+
+    skipped = await _skip_imported(conn, job, "import_message_map")
+    await conn.execute("""
+        UPDATE import_staging_messages SET error = CASE
+            WHEN body IS NULL THEN 'missing body'
+            WHEN channel IS NULL THEN 'missing channel'
+            WHEN direction IS NOT NULL AND lower(direction) <> ALL($2::text[]) THEN 'unknown direction'
+            WHEN created_at IS NOT NULL AND import_try_timestamptz(created_at) IS NULL THEN 'invalid created_at'
+        END
+        WHERE job_id = $1 AND error IS NULL
+    """, job_id, MESSAGE_DIRECTIONS)
+    step("validated")
+
+    await conn.execute("""
+        UPDATE import_staging_messages s SET ticket_id = m.ticket_id
+        FROM import_ticket_map m
+        WHERE s.job_id = $1 AND s.error IS NULL AND m.client_id = $2 AND m.legacy_id = s.legacy_ticket_id
+    """, job_id, client_id)
+    await conn.execute("""
+        UPDATE import_staging_messages SET error = 'unknown legacy_ticket_id'
+        WHERE job_id = $1 AND error IS NULL AND legacy_ticket_id IS NOT NULL AND ticket_id IS NULL
+    """, job_id)
+    # The contact is the sender of inbound messages and the recipient of outbound ones
+    party = "CASE WHEN lower(coalesce(s.direction, 'inbound')) = 'inbound' THEN s.from_address ELSE s.to_address END"
+    for column, normalize in (("phone_e164", "normalize_phone_e164"), ("email_normalized", "normalize_email")):
+        await conn.execute(RESOLVE_CONTACT_SQL.format(
+            table="import_staging_messages", column=column, normalize=normalize, source=party,
+        ), job_id, client_id)
+    step("resolved")
+
+    await conn.execute(
+        "UPDATE import_staging_messages SET message_id = uuid_generate_v4() WHERE job_id = $1 AND error IS NULL",
+        job_id,
+    )
+    # Rows already imported were dropped above; provider ids also skip messages
+    # that arrived live (unique index from migration 003). One audit row per
+    # ticket summarizes the batch
+    row = await conn.fetchrow("""
+        WITH inserted AS (
+            INSERT INTO messages (
+                id, ticket_id, contact_id, direction, channel, from_address, to_address,
+                subject, body, external_id, agent_name, status, created_at
+            )
+            SELECT
+                s.message_id, s.ticket_id, s.contact_id,
+                coalesce(lower(s.direction), 'inbound'),
+                left(lower(s.channel), 20),
+                left(s.from_address, 255), left(s.to_address, 255), left(s.subject, 500),
+                s.body, left(s.external_id, 255), 'bulk_import',
+                CASE WHEN coalesce(lower(s.direction), 'inbound') = 'inbound' THEN 'received' ELSE 'sent' END,
+                coalesce(import_try_timestamptz(s.created_at), NOW())
+            FROM import_staging_messages s
+            WHERE s.job_id = $1 AND s.error IS NULL
+            ORDER BY s.line_no
+            ON CONFLICT DO NOTHING
+            RETURNING id, ticket_id
+        ),
+        mapped AS (
+            INSERT INTO import_message_map (client_id, import_key, message_id, job_id)
+            SELECT $3::UUID, s.import_key, i.id, $1::UUID
+            FROM inserted i
+            JOIN import_staging_messages s ON s.job_id = $1 AND s.message_id = i.id
+        ),
+        audited AS (
+            INSERT INTO audit_events (ticket_id, event_type, agent_name, actor_type, actor_id, detail, metadata)
+            SELECT
+                ticket_id, 'messages_imported', 'bulk_import', 'system', $1::UUID::TEXT,
+                count(*) || ' message(s) imported from ' || coalesce($2::TEXT, 'legacy system'),
+                jsonb_build_object('job_id', $1::UUID::TEXT, 'messages', count(*))
+            FROM inserted
+            WHERE ticket_id IS NOT NULL
+            GROUP BY ticket_id
+        )
+        SELECT
+            (SELECT count(*) FROM inserted) AS imported,
+            (SELECT count(*) FROM import_staging_messages WHERE job_id = $1 AND error IS NULL) AS eligible
+    """, job_id, job["source_name"], client_id)
+    step("inserted")
+    return row["imported"], skipped + row["eligible"] - row["imported"]
+
+
+async def _load_invoices(conn: asyncpg.Connection, job: dict, step: Callable[[str], None]) -> Tuple[int, int]:
+    job_id, client_id = job["id"], job["client_id"]
+
+    skipped = await _skip_imported(conn, job, "import_invoice_map")
+    await conn.execute("""
+        UPDATE import_staging_invoices SET error = CASE
+            WHEN legacy_ticket_id IS NULL THEN 'missing legacy_ticket_id'
+            WHEN vendor IS NULL THEN 'missing vendor'
+            WHEN import_try_numeric(amount) IS NULL THEN 'invalid amount'
+            WHEN status IS NOT NULL AND lower(status) <> ALL($2::text[]) THEN 'unknown status'
+            WHEN due_date IS NOT NULL AND import_try_timestamptz(due_date) IS NULL THEN 'invalid due_date'
+            WHEN paid_at IS NOT NULL AND import_try_timestamptz(paid_at) IS NULL THEN 'invalid paid_at'
+            WHEN created_at IS NOT NULL AND import_try_timestamptz(created_at) IS NULL THEN 'invalid created_at'
+        END
+        WHERE job_id = $1 AND error IS NULL
+    """, job_id, INVOICE_STATUSES)
+    step("validated")
+
+    await conn.execute("""
+        UPDATE import_staging_invoices s SET ticket_id = m.ticket_id
+        FROM import_ticket_map m
+        WHERE s.job_id = $1 AND s.error IS NULL AND m.client_id = $2 AND m.legacy_id = s.legacy_ticket_id
+    """, job_id, client_id)
+    await conn.execute("""
+        UPDATE import_staging_invoices s SET vendor_id = v.id
+        FROM vendors v
+        WHERE s.job_id = $1 AND s.error IS NULL AND lower(v.company_name) = lower(btrim(s.vendor))
+    """, job_id)
+    await conn.execute("""
+        UPDATE import_staging_invoices SET error = CASE
+            WHEN ticket_id IS NULL THEN 'unknown legacy_ticket_id'
+            WHEN vendor_id IS NULL THEN 'unknown vendor'
+        END
+        WHERE job_id = $1 AND error IS NULL
+    """, job_id)
+    step("resolved")
+
+    await conn.execute(
+        "UPDATE import_staging_invoices SET invoice_id = uuid_generate_v4() WHERE job_id = $1 AND error IS NULL",
+        job_id,
+    )
+    row = await conn.fetchrow("""
+        WITH inserted AS (
+            INSERT INTO invoices (
+                id, ticket_id, vendor_id, client_id, invoice_number, amount, status,
+                due_date, paid_at, created_at, updated_at
+            )
+            SELECT
+                s.invoice_id, s.ticket_id, s.vendor_id, $2::UUID, left(s.invoice_number, 50),
+                import_try_numeric(s.amount),
+                coalesce(lower(s.status), CASE WHEN s.paid_at IS NOT NULL THEN 'paid' ELSE 'pending' END),
+                import_try_timestamptz(s.due_date)::DATE,
+                import_try_timestamptz(s.paid_at),
+                coalesce(import_try_timestamptz(s.created_at), NOW()),
+                coalesce(import_try_timestamptz(s.paid_at), import_try_timestamptz(s.created_at), NOW())
+            FROM import_staging_invoices s
+            WHERE s.job_id = $1 AND s.error IS NULL
+            ORDER BY s.line_no
+            RETURNING id, ticket_id, amount
+        ),
+        mapped AS (
+            INSERT INTO import_invoice_map (client_id, import_key, invoice_id, job_id)
+            SELECT $2::UUID, s.import_key, i.id, $1::UUID
+            FROM inserted i
+            JOIN import_staging_invoices s ON s.job_id = $1 AND s.invoice_id = i.id
+        ),
+        audited AS (
+            INSERT INTO audit_events (ticket_id, event_type, agent_name, actor_type, actor_id, detail, metadata)
+            SELECT
+                ticket_id, 'invoices_imported', 'bulk_import', 'system', $1::UUID::TEXT,
+                count(*) || ' invoice(s) totalling $' || sum(amount) || ' imported from ' || coalesce($3::TEXT, 'legacy system'),
+                jsonb_build_object('job_id', $1::UUID::TEXT, 'invoices', count(*), 'total_amount', sum(amount))
+            FROM inserted
+            GROUP BY ticket_id
+        )
+        SELECT count(*) AS imported FROM inserted
+    """, job_id, client_id, job["source_name"])
+    step("inserted")
+    return row["imported"], skipped
+
+
+LOADERS = {
+    "tickets": _load_tickets,
+    "messages": _load_messages,
+    "invoices": _load_invoices,
+}
+
+
+async def load(conn: asyncpg.Connection, job: dict, progress: Optional[Progress] = None) -> dict:
+    """Resolve and insert a staged job in one transaction. Loaded staging rows
+    are removed; rejected rows stay for review (see `rejections`)."""
+    job_id = job["id"]
+    table = f"import_staging_{job['kind']}"
+    await conn.execute(
+        "UPDATE import_jobs SET status = 'loading', error = NULL, updated_at = NOW() WHERE id = $1", job_id
+    )
+
+    def step(name: str) -> None:
+        logger.info("Import step finished", job_id=str(job_id), kind=job["kind"], step=name)
+        if progress:
+            progress({"phase": "loading", "step": name})
+
+    try:
+        async with conn.transaction():
+            # Imported history is not live activity; keep it off /tickets/stream
+            await conn.execute("SET LOCAL app.suppress_ticket_notify = 'on'")
+            imported, skipped = await LOADERS[job["kind"]](conn, job, step)
+            rejected = await conn.fetchval(
+                f"SELECT count(*) FROM {table} WHERE job_id = $1 AND error IS NOT NULL", job_id
+            )
+            await conn.execute(f"DELETE FROM {table} WHERE job_id = $1 AND error IS NULL", job_id)
+            await conn.execute("""
+                UPDATE import_jobs
+                SET status = 'completed', rows_imported = $2, rows_skipped = $3, rows_rejected = $4,
+                    updated_at = NOW(), completed_at = NOW()
+                WHERE id = $1
+            """, job_id, imported, skipped, rejected)
+    except Exception as e:
+        await conn.execute(
+            "UPDATE import_jobs SET status = 'failed', error = $2, updated_at = NOW() WHERE id = $1",
+            job_id, str(e)[:2000],
+        )
+        logger.error("Import load failed", job_id=str(job_id), error=str(e))
+        raise
+
+    job = await get_job(conn, job_id)
+    logger.info(
+        "Import completed",
+        job_id=str(job_id),
+        kind=job["kind"],
+        imported=job["rows_imported"],
+        skipped=job["rows_skipped"],
+        rejected=job["rows_rejected"],
+    )
+    return job
+
+
+async def run_import(
+    conn: asyncpg.Connection,
+    path: Path,
+    client_id: Optional[UUID] = None,
+    kind: Optional[str] = None,
+    fmt: Optional[str] = None,
+    source_name: Optional[str] = None,
+    job_id: Optional[UUID] = None,
+    progress: Optional[Progress] = None,
+) -> dict:
+    """Stage and load `path` as a new job, or resume job `job_id` from its
+    last checkpoint (the same file must be supplied while it is staging)."""
+    if job_id is not None:
+        job = await get_job(conn, job_id)
+        if job is None:
+            raise LookupError(f"Import job not found: {job_id}")
+    else:
+        job = await create_job(conn, client_id, kind, fmt or detect_format(path), source_name or path.name)
+
+    if job["status"] == "completed":
+        return job
+    if job["status"] == "staging":
+        job = await stage(conn, job, path, progress)
+    return await load(conn, job, progress)
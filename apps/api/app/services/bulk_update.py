@@ -0,0 +1,105 @@
+"""Bulk ticket updates - one status change and/or field update applied to many tickets."""
+from typing import Dict, Iterable, List
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Ticket, AuditEvent
+from app.services.orchestrator import apply_transition, validate_transition
+
+import structlog
+
+logger = structlog.get_logger()
+
+BULK_MODES = ("all_or_nothing", "best_effort")
+
+
+async def bulk_update_tickets(
+    db: AsyncSession,
+    ticket_ids: Iterable[UUID],
+    changes: dict,
+    mode: str = "all_or_nothing",
+    actor_type: str = "api",
+    actor_id: str = "",
+    detail: str = "",
+) -> dict:
+    """Apply `changes` (TicketUpdate fields; `status` goes through the
+    orchestrator's transition rules) to every ticket in `ticket_ids`.
+
+    The tickets are loaded and locked in one query and every transition is
+    validated in memory before any ticket is touched. In `all_or_nothing`
+    mode one invalid ticket leaves the whole batch unapplied; in
+    `best_effort` the valid ones are applied. Audit events for the applied
+    transitions are written with a single multi-row insert. The caller
+    commits.
+    """
+    if mode not in BULK_MODES:
+        raise ValueError(f"Unknown mode {mode!r}; expected one of {BULK_MODES}")
+    ids = list(dict.fromkeys(ticket_ids))
+    changes = dict(changes)
+    new_status = changes.pop("status", None)
+
+    # Locked in id order, so concurrent bulk updates can't deadlock each other
+    rows = await db.execute(
+        select(Ticket).where(Ticket.id.in_(ids)).order_by(Ticket.id).with_for_update()
+    )
+    tickets: Dict[UUID, Ticket] = {t.id: t for t in rows.scalars().all()}
+
+    errors: Dict[UUID, str] = {}
+    for ticket_id in ids:
+        ticket = tickets.get(ticket_id)
+        if ticket is None:
+            errors[ticket_id] = "Ticket not found"
+        elif new_status is not None:
+            try:
+                validate_transition(ticket.status, new_status)
+            except ValueError as e:
+                errors[ticket_id] = str(e)
+
+    applied = not errors or mode == "best_effort"
+    results: List[dict] = []
+    audits: List[dict] = []
+    for ticket_id in ids:
+        if ticket_id in errors:
+            results.append({"ticket_id": ticket_id, "ok": False, "error": errors[ticket_id]})
+            continue
+        ticket = tickets[ticket_id]
+        if not applied:
+            results.append({
+                "ticket_id": ticket_id,
+                "ok": False,
+                "status": ticket.status,
+                "error": "Not applied: other tickets in the batch failed",
+            })
+            continue
+        if new_status is not None:
+            audits.append(apply_transition(
+                ticket, new_status, actor_type=actor_type, actor_id=actor_id, detail=detail
+            ))
+        for field, value in changes.items():
+            setattr(ticket, field, value)
+        results.append({"ticket_id": ticket_id, "ok": True, "status": ticket.status})
+
+    if audits:
+        # Ticket updates first, so audit triggers see the new status
+        await db.flush()
+        await db.execute(insert(AuditEvent.__table__).values(audits))
+
+    succeeded = sum(1 for r in results if r["ok"])
+    logger.info(
+        "Bulk ticket update",
+        mode=mode,
+        requested=len(ids),
+        succeeded=succeeded,
+        failed=len(errors),
+        status=new_status,
+        fields=sorted(changes),
+    )
+    return {
+        "mode": mode,
+        "applied": applied,
+        "succeeded": succeeded,
+        "failed": len(ids) - succeeded,
+        "results": results,
+    }
@@ -0,0 +1,207 @@
+"""Contact resolver - canonical phone/email matching with an in-process TTL cache."""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+import re
+import time
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Contact
+
+import structlog
+
+logger = structlog.get_logger()
+
+NON_DIGITS_RE = re.compile(r"\D")
+
+
+def normalize_phone(raw: Optional[str]) -> Optional[str]:
+    """E.164 form of a phone number, or None if it can't be determined.
+
+    Numbers without a `+` are assumed to be NANP. Mirrors the
+    `normalize_phone_e164` SQL function (migration 004).
+    """
+    digits = NON_DIGITS_RE.sub("", raw or "")
+    if not digits:
+        return None
+    if raw.strip().startswith("+"):
+        pass
+    elif digits.startswith("011"):
+        digits = digits[3:]
+    elif len(digits) == 10:
+        digits = "1" + digits
+    elif not (len(digits) == 11 and digits.startswith("1")):
+        return None
+    if not 8 <= len(digits) <= 15:
+        return None
+    return "+" + digits
+
+
+def normalize_email(raw: Optional[str]) -> Optional[str]:
+    """Trimmed, lowercased email. Mirrors the `normalize_email` SQL function."""
+    return (raw or "").strip().lower() or None
+
+
+@dataclass(frozen=True)
+class ResolvedContact:
+    """The contact fields intake needs, detached from any session."""
+
+    id: UUID
+    client_id: Optional[UUID]
+    property_id: Optional[UUID]
+    unit_id: Optional[UUID]
+    first_name: str
+    last_name: str
+    email: Optional[str]
+    phone: Optional[str]
+    role: str
+    preferred_contact_method: str
+
+    @classmethod
+    def from_model(cls, contact: Contact) -> "ResolvedContact":
+        return cls(
+            id=contact.id,
+            client_id=contact.client_id,
+            property_id=contact.property_id,
+            unit_id=contact.unit_id,
+            first_name=contact.first_name,
+            last_name=contact.last_name,
+            email=contact.email,
+            phone=contact.phone,
+            role=contact.role,
+            preferred_contact_method=contact.preferred_contact_method,
+        )
+
+
+# Several contacts may share a number (e.g. a tenant listed on two units);
+# prefer ones linked to a property, then the most recently updated
+CONTACT_PREFERENCE = (Contact.property_id.is_(None), Contact.updated_at.desc())
+
+_MISSING = object()
+
+
+class ContactResolver:
+    """Resolves inbound phone numbers and emails to active contacts.
+
+    Results, including misses, are cached per canonical key in an LRU with a
+    TTL; misses expire sooner so a newly added contact is found quickly by
+    other API processes. Contact changes flushed by this process invalidate
+    their keys immediately (see `_invalidate_flushed_contacts`).
+    """
+
+    def __init__(self, ttl: float = 300.0, miss_ttl: float = 30.0, max_entries: int = 50000):
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Optional[ResolvedContact]]]" = OrderedDict()
+
+    def _get(self, key: Tuple[str, str]):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, contact = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return contact
+
+    def _put(self, key: Tuple[str, str], contact: Optional[ResolvedContact]) -> None:
+        ttl = self.ttl if contact is not None else self.miss_ttl
+        self._entries[key] = (time.monotonic() + ttl, contact)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, kind: str, value: Optional[str]) -> None:
+        if value:
+            self._entries.pop((kind, value), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def by_phone(self, db: AsyncSession, phone: str) -> Optional[ResolvedContact]:
+        return (await self.resolve_many(db, phones=[phone]))["phone"].get(phone)
+
+    async def by_email(self, db: AsyncSession, email: str) -> Optional[ResolvedContact]:
+        return (await self.resolve_many(db, emails=[email]))["email"].get(email)
+
+    async def resolve_many(
+        self,
+        db: AsyncSession,
+        phones: Iterable[str] = (),
+        emails: Iterable[str] = (),
+    ) -> Dict[str, Dict[str, Optional[ResolvedContact]]]:
+        """Resolve many raw phones/emails with at most one query per kind.
+
+        Returns `{"phone": {raw: contact|None}, "email": {raw: contact|None}}`.
+        """
+        results = {"phone": {}, "email": {}}
+        for kind, raws, normalize, column in (
+            ("phone", phones, normalize_phone, Contact.phone_e164),
+            ("email", emails, normalize_email, Contact.email_normalized),
+        ):
+            wanted: Dict[str, list] = {}
+            for raw in raws:
+                key = normalize(raw)
+                if key is None:
+                    results[kind][raw] = None
+                    continue
+                cached = self._get((kind, key))
+                if cached is _MISSING:
+                    wanted.setdefault(key, []).append(raw)
+                else:
+                    self.hits += 1
+                    results[kind][raw] = cached
+            if not wanted:
+                continue
+
+            self.misses += len(wanted)
+            rows = (await db.execute(
+                select(Contact)
+                .where(column.in_(list(wanted)), Contact.active == True)
+                .order_by(*CONTACT_PREFERENCE)
+            )).scalars()
+            found: Dict[str, ResolvedContact] = {}
+            for contact in rows:
+                found.setdefault(getattr(contact, column.key), ResolvedContact.from_model(contact))
+            for key, raw_values in wanted.items():
+                contact = found.get(key)
+                self._put((kind, key), contact)
+                for raw in raw_values:
+                    results[kind][raw] = contact
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / (self.hits + self.misses), 4) if self.hits + self.misses else 0.0,
+        }
+
+
+resolver = ContactResolver(
+    ttl=settings.contact_cache_ttl_seconds,
+    miss_ttl=settings.contact_cache_miss_ttl_seconds,
+    max_entries=settings.contact_cache_max_entries,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_contacts(session: Session, flush_context) -> None:
+    """Drop cache entries for every old and new phone/email of a flushed contact."""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, Contact):
+            continue
+        state = inspect(obj)
+        for attr, kind, normalize in (("phone", "phone", normalize_phone), ("email", "email", normalize_email)):
+            for value in state.attrs[attr].history.sum():
+                resolver.invalidate(kind, normalize(value))
@@ -0,0 +1,157 @@
+"""Conversation threading - attaches follow-up messages to a contact's open ticket."""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Ticket, Message, AuditEvent
+from app.config import settings
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Statuses in which the intake triage agent's output is still being acted on;
+# new evidence (e.g. the first photos) is worth a re-run here but not later
+TRIAGE_STATUSES = ("new", "qualifying")
+
+PRIORITY_RANK = {"low": 0, "routine": 1, "urgent": 2, "emergency": 3}
+
+
+@dataclass
+class ThreadUpdate:
+    """What appending a follow-up message changed on its ticket."""
+
+    ticket: Ticket
+    material_changes: List[str] = field(default_factory=list)
+
+    @property
+    def retriage(self) -> bool:
+        return bool(self.material_changes)
+
+
+def email_thread_ids(in_reply_to: Optional[str], references: Optional[str]) -> List[str]:
+    """Message-IDs an email replies to, most specific first, in both the bare
+    and `<angle-bracketed>` forms providers store them in."""
+    raw = ([in_reply_to] if in_reply_to else []) + list(reversed((references or "").split()))
+    ids = []
+    for value in raw:
+        bare = value.strip().strip("<>")
+        if bare:
+            ids.extend((bare, f"<{bare}>"))
+    return list(dict.fromkeys(ids))
+
+
+async def find_open_ticket(
+    db: AsyncSession,
+    contact_id: UUID,
+    thread_ids: Iterable[str] = (),
+) -> Optional[Ticket]:
+    """The open ticket a new message from this contact belongs to.
+
+    An email whose In-Reply-To/References point at a message on an open
+    ticket joins that ticket. Otherwise the message joins the contact's most
+    recently active open ticket if it was active within
+    `conversation_window_hours` (served by `idx_tickets_open_by_requester`).
+    """
+    thread_ids = list(thread_ids)
+    if thread_ids:
+        ticket = (await db.execute(
+            select(Ticket)
+            .join(Message, Message.ticket_id == Ticket.id)
+            .where(
+                Message.channel == "email",
+                Message.external_id.in_(thread_ids),
+                Ticket.status != "closed",
+            )
+            .order_by(Message.created_at.desc())
+            .limit(1)
+        )).scalar_one_or_none()
+        if ticket is not None:
+            return ticket
+
+    if settings.conversation_window_hours <= 0:
+        return None
+    since = datetime.utcnow() - timedelta(hours=settings.conversation_window_hours)
+    return (await db.execute(
+        select(Ticket)
+        .where(
+            Ticket.requester_contact_id == contact_id,
+            Ticket.status != "closed",
+            Ticket.updated_at >= since,
+        )
+        .order_by(Ticket.updated_at.desc())
+        .limit(1)
+    )).scalar_one_or_none()
+
+
+async def append_message(
+    db: AsyncSession,
+    ticket: Ticket,
+    message: Message,
+    priority: str = "routine",
+    media_urls: Optional[List[str]] = None,
+) -> ThreadUpdate:
+    """Attach an inbound message (and its media) to `ticket`.
+
+    Triage is only worth re-running on a material change: the follow-up
+    raises the priority (e.g. an emergency keyword), or it brings the first
+    photos while the ticket is still being triaged. Other follow-ups ("it's
+    getting worse", "thanks") are recorded on the ticket's timeline only.
+    """
+    update = ThreadUpdate(ticket)
+    message.ticket_id = ticket.id
+
+    if PRIORITY_RANK.get(priority, 1) > PRIORITY_RANK.get(ticket.priority, 1):
+        update.material_changes.append(f"priority {ticket.priority} -> {priority}")
+        ticket.priority = priority
+
+    existing = list(ticket.photo_urls or [])
+    new_media = [url for url in media_urls or [] if url not in existing]
+    if new_media:
+        if not existing and ticket.status in TRIAGE_STATUSES:
+            update.material_changes.append("first photos")
+        ticket.photo_urls = existing + new_media
+
+    ticket.updated_at = datetime.utcnow()
+
+    detail = f"Follow-up {message.channel} message added to ticket"
+    if update.material_changes:
+        detail += f" (re-triage: {', '.join(update.material_changes)})"
+    db.add(AuditEvent(
+        ticket_id=ticket.id,
+        event_type="message_threaded",
+        agent_name="intake",
+        actor_type="tenant",
+        actor_id=str(message.contact_id) if message.contact_id else None,
+        detail=detail,
+    ))
+
+    logger.info(
+        "Message threaded onto open ticket",
+        ticket_id=str(ticket.id),
+        channel=message.channel,
+        new_media=len(new_media),
+        retriage=update.retriage,
+    )
+    return update
+
+
+async def is_follow_up(db: AsyncSession, message: Message) -> bool:
+    """Whether an inbound message was threaded onto an existing ticket rather
+    than opening it (an earlier inbound message on the same ticket exists)."""
+    if message.ticket_id is None:
+        return False
+    earlier = (await db.execute(
+        select(Message.id)
+        .where(
+            Message.ticket_id == message.ticket_id,
+            Message.direction == "inbound",
+            Message.created_at < message.created_at,
+        )
+        .limit(1)
+    )).scalar_one_or_none()
+    return earlier is not None
@@ -0,0 +1,221 @@
+"""Emergency detector - compiled multi-phrase matching over inbound message text."""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+import re
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Client
+
+import structlog
+
+logger = structlog.get_logger()
+
+# A match is negated only when a determiner-style cue sits directly before
+# it ("no smoke", "not a fire", "without any gas"). Anything looser ("I can't
+# stop the flooding") is read as the emergency it usually is: when in doubt,
+# escalate.
+NEGATION_RE = re.compile(r"(?<!\w)(?:no|not|without)(?:\s+(?:a|an|any))?\s+$")
+NEGATION_LOOKBEHIND = 16
+WORD_CHAR = re.compile(r"\w").match
+
+# A leading (?<!\w) is evaluated at every position of the text: for a
+# handful of phrases it doubles the scan, but from about this many it pays
+# for itself by cutting off mid-word descents into the trie
+LOOKBEHIND_MIN_KEYWORDS = 16
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Lowercase with single spaces; the key a matched phrase is reported under."""
+    return " ".join(keyword.lower().replace("\u2019", "'").split())
+
+
+def _fold(text: str) -> str:
+    """Lowercase `text` without changing its length (a few characters, e.g.
+    'İ', lowercase to two code points; those are left as they are)."""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+    # Typographic apostrophes (phone keyboards), as in normalize_keyword
+    return lowered.replace("\u2019", "'")
+
+
+@dataclass(frozen=True)
+class EmergencyMatch:
+    term: str
+    start: int
+    end: int
+    negated: bool = False
+
+
+@dataclass(frozen=True)
+class EmergencyResult:
+    matches: Tuple[EmergencyMatch, ...] = ()
+
+    @property
+    def is_emergency(self) -> bool:
+        return any(not m.negated for m in self.matches)
+
+    @property
+    def terms(self) -> List[str]:
+        """Distinct non-negated terms, in order of first occurrence."""
+        return list(dict.fromkeys(m.term for m in self.matches if not m.negated))
+
+
+NO_MATCHES = EmergencyResult()
+
+
+class EmergencyDetector:
+    """Multi-phrase matcher over a fixed set of emergency phrases.
+
+    The phrases are inserted into a trie (shared prefixes stored once), and
+    the trie is compiled into a single regular expression, so a scan is one
+    pass of the C regex engine over the text however many phrases are
+    loaded, instead of one substring search per phrase. A match only counts
+    on word boundaries ("fire" does not match "fireplace"), the longest
+    phrase wins at each position ("gas leak" over "gas"), and a match is
+    flagged `negated` only when "no", "not" or "without" (optionally
+    followed by "a", "an" or "any") immediately precedes it.
+
+    Below LOOKBEHIND_MIN_KEYWORDS phrases the left word boundary is checked
+    on each candidate instead of in the pattern.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(
+            k for k in (normalize_keyword(kw) for kw in keywords) if k
+        ))
+        trie: dict = {}
+        for keyword in self.keywords:
+            node = trie
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[""] = True
+        pattern = _trie_pattern(trie) + r"(?!\w)"
+        if len(self.keywords) >= LOOKBEHIND_MIN_KEYWORDS:
+            pattern = r"(?<!\w)" + pattern
+        self._regex = re.compile(pattern) if self.keywords else None
+
+    def scan(self, text: Optional[str]) -> EmergencyResult:
+        if not text or self._regex is None:
+            return NO_MATCHES
+        folded = _fold(text)
+        matches = []
+        search = self._regex.search
+        m = search(folded)
+        while m is not None:
+            start = m.start()
+            if start and WORD_CHAR(folded, start - 1):
+                # Mid-word ("bonfire"); a phrase may still begin at the next character
+                m = search(folded, start + 1)
+                continue
+            matches.append(EmergencyMatch(normalize_keyword(m.group()), start, m.end(), _negated(folded, start)))
+            m = search(folded, m.end())
+        return EmergencyResult(tuple(matches)) if matches else NO_MATCHES
+
+    def classify_many(self, texts: Sequence[Optional[str]]) -> List[EmergencyResult]:
+        """Scan many texts (backfills, re-triage); repeated texts are scanned once."""
+        seen: Dict[Optional[str], EmergencyResult] = {}
+        results = []
+        for text in texts:
+            result = seen.get(text)
+            if result is None:
+                result = seen[text] = self.scan(text)
+            results.append(result)
+        return results
+
+
+def _trie_pattern(node: dict) -> str:
+    """Regex for the phrases below a trie node; a space matches any run of whitespace."""
+    alternatives = [
+        (r"\s+" if ch == " " else re.escape(ch)) + _trie_pattern(child)
+        for ch, child in sorted(node.items()) if ch
+    ]
+    if not alternatives:
+        return ""
+    body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    if "" in node:
+        return "(?:" + body + ")?"
+    return body
+
+
+def _negated(folded: str, start: int) -> bool:
+    """Whether a negation cue directly precedes the match at `start`."""
+    return NEGATION_RE.search(folded, max(0, start - NEGATION_LOOKBEHIND), start) is not None
+
+
+class EmergencyDetectors:
+    """The global detector plus one per client with extra keywords.
+
+    Client keywords (`clients.emergency_keywords`, migration 005) extend the
+    global list from settings. Detectors are rebuilt by `reload`, and a
+    client's detector is rebuilt when a change to its keywords is flushed.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.default = EmergencyDetector(keywords)
+        self._clients: Dict[UUID, EmergencyDetector] = {}
+
+    def for_client(self, client_id: Optional[UUID]) -> EmergencyDetector:
+        if client_id is None:
+            return self.default
+        return self._clients.get(client_id, self.default)
+
+    def set_client_keywords(self, client_id: UUID, keywords: Optional[Iterable[str]]) -> None:
+        keywords = tuple(keywords or ())
+        if keywords:
+            self._clients[client_id] = EmergencyDetector(self.default.keywords + keywords)
+        else:
+            self._clients.pop(client_id, None)
+
+    async def reload(self, db: AsyncSession, keywords: Optional[Iterable[str]] = None) -> None:
+        """Rebuild every detector from `keywords` (default: the current global
+        list) and the client keyword sets in the database."""
+        default = EmergencyDetector(self.default.keywords if keywords is None else keywords)
+        rows = (await db.execute(
+            select(Client.id, Client.emergency_keywords).where(
+                Client.emergency_keywords.isnot(None), Client.active == True
+            )
+        )).all()
+        client_keywords = {client_id: tuple(kws) for client_id, kws in rows if kws}
+        self.default = default
+        self._clients = {
+            client_id: EmergencyDetector(default.keywords + kws)
+            for client_id, kws in client_keywords.items()
+        }
+        logger.info("Emergency detectors loaded", keywords=len(default.keywords), clients=len(self._clients))
+
+    def stats(self) -> dict:
+        return {
+            "keywords": len(self.default.keywords),
+            "clients_with_keywords": len(self._clients),
+        }
+
+
+detectors = EmergencyDetectors(settings.emergency_keyword_list)
+
+
+def detect(text: Optional[str], client_id: Optional[UUID] = None) -> EmergencyResult:
+    return detectors.for_client(client_id).scan(text)
+
+
+def classify_many(texts: Sequence[Optional[str]], client_id: Optional[UUID] = None) -> List[EmergencyResult]:
+    return detectors.for_client(client_id).classify_many(texts)
+
+
+@event.listens_for(Session, "after_flush")
+def _reload_flushed_client_keywords(session: Session, flush_context) -> None:
+    """Rebuild the detector of any client whose emergency keywords changed."""
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Client):
+            continue
+        attrs = inspect(obj).attrs
+        if attrs.emergency_keywords.history.has_changes() or attrs.active.history.has_changes():
+            detectors.set_client_keywords(obj.id, obj.emergency_keywords if obj.active else None)
+    for obj in session.deleted:
+        if isinstance(obj, Client):
+            detectors.set_client_keywords(obj.id, None)
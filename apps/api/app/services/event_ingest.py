@@ -0,0 +1,91 @@
+"""Event ingestion - run-id deduplication and per-event outcomes for event batches."""
+from typing import List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ProcessedEvent
+from app.schemas.tickets import EventIngest
+from app.services.orchestrator import handle_event
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Failures that will recur however often the event is retried: invalid
+# events (pydantic's ValidationError is a ValueError), invalid transitions,
+# values or references the database refuses
+PERMANENT_ERRORS = (ValueError, DataError, IntegrityError)
+
+
+async def ingest_event_once(db: AsyncSession, event: EventIngest) -> Tuple[str, dict]:
+    """Process `event` unless its run id was already processed.
+
+    Returns ("processed", result), or ("duplicate", the original result).
+    The run id is claimed in the same transaction as the event's own writes,
+    so an event that fails leaves it unclaimed and is processed on retry; a
+    concurrent delivery of the same run id waits on the claim and then sees
+    a duplicate. Events without a run id are always processed.
+    """
+    if event.run_id:
+        claimed = await db.execute(
+            insert(ProcessedEvent)
+            .values(run_id=event.run_id, event_type=event.event_type, ticket_id=event.ticket_id)
+            .on_conflict_do_nothing(index_elements=["run_id"])
+            .returning(ProcessedEvent.run_id)
+        )
+        if claimed.scalar_one_or_none() is None:
+            await db.rollback()
+            original = await db.get(ProcessedEvent, event.run_id)
+            logger.info("Duplicate event suppressed", run_id=event.run_id, event_type=event.event_type)
+            return "duplicate", (original.result if original else None) or {}
+
+    # handle_event commits itself when the event touches a ticket; the result
+    # is stored right after, for replays
+    result = await handle_event(db, event)
+    if event.run_id:
+        await db.execute(
+            update(ProcessedEvent).where(ProcessedEvent.run_id == event.run_id).values(result=result)
+        )
+    await db.commit()
+    return "processed", result
+
+
+async def ingest_events(db: AsyncSession, events: List[dict]) -> dict:
+    """Ingest `events` in order, each in its own transaction, with one result
+    per event so the sender can tell what to drop and what to retry:
+
+      processed   applied now
+      duplicate   its run id was already processed; `result` is the original
+      rejected    invalid, and will be on every retry
+      failed      transient error (e.g. database unavailable); retry it
+    """
+    results = []
+    counts = {"processed": 0, "duplicate": 0, "rejected": 0, "failed": 0}
+    for index, raw in enumerate(events):
+        run_id: Optional[str] = raw.get("run_id") if isinstance(raw, dict) else None
+        entry = {"index": index, "run_id": run_id}
+        try:
+            event = EventIngest.model_validate(raw)
+            entry["status"], entry["result"] = await ingest_event_once(db, event)
+        except PERMANENT_ERRORS as e:
+            await db.rollback()
+            entry.update(status="rejected", error=str(e)[:500])
+            logger.warning("Event rejected", index=index, run_id=run_id, error=str(e)[:200])
+        except Exception as e:
+            await db.rollback()
+            entry.update(status="failed", error=str(e)[:500])
+            logger.error("Event failed", index=index, run_id=run_id, error=str(e)[:200])
+        counts[entry["status"]] += 1
+        results.append(entry)
+
+    logger.info("Event batch ingested", count=len(events), **counts)
+    return {
+        "processed": counts["processed"],
+        "duplicates": counts["duplicate"],
+        "rejected": counts["rejected"],
+        "failed": counts["failed"],
+        "results": results,
+    }
@@ -0,0 +1,97 @@
+"""Idempotent ingestion - one result per provider message id, replays answered from the original."""
+from collections import OrderedDict, defaultdict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Message
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Results of recently ingested messages; a replay that hits here skips the database
+RESULT_CACHE_SIZE = 10000
+
+_results: "OrderedDict[Tuple[str, str], dict]" = OrderedDict()
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+
+def _remember(channel: str, external_id: str, result: dict) -> None:
+    _results[(channel, external_id)] = result
+    _results.move_to_end((channel, external_id))
+    while len(_results) > RESULT_CACHE_SIZE:
+        _results.popitem(last=False)
+
+
+def record_duplicate(channel: str, source: str) -> None:
+    """Count a suppressed duplicate delivery. `source` says where it was caught."""
+    _stats[channel]["duplicates_suppressed"] += 1
+    _stats[channel][f"caught_by_{source}"] += 1
+
+
+async def find_inbound_message(db: AsyncSession, channel: str, external_id: str) -> Optional[Message]:
+    result = await db.execute(
+        select(Message).where(
+            Message.channel == channel,
+            Message.external_id == external_id,
+            Message.direction == "inbound",
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def ingest_once(
+    db: AsyncSession,
+    channel: str,
+    external_id: Optional[str],
+    process: Callable[[], Awaitable[dict]],
+    replay: Callable[[Message], Awaitable[dict]],
+) -> dict:
+    """Run `process` unless this (channel, external_id) was already ingested.
+
+    Checks the in-process result cache, then the messages table; a concurrent
+    delivery that slips past both is stopped by the unique index, in which
+    case the transaction is rolled back and the winner's result is replayed.
+    A replayed result has `duplicate: true` and `retriage: false`.
+    """
+    if not external_id:
+        return await process()
+
+    cached = _results.get((channel, external_id))
+    if cached is not None:
+        record_duplicate(channel, "cache")
+        logger.info("Duplicate delivery suppressed", channel=channel, external_id=external_id, source="cache")
+        # The original already triggered triage; the replay must not again
+        return {**cached, "retriage": False, "duplicate": True}
+
+    original = await find_inbound_message(db, channel, external_id)
+    if original is None:
+        try:
+            result = await process()
+        except IntegrityError:
+            await db.rollback()
+            original = await find_inbound_message(db, channel, external_id)
+            if original is None:
+                raise
+            record_duplicate(channel, "constraint")
+        else:
+            _remember(channel, external_id, result)
+            return result
+    else:
+        record_duplicate(channel, "database")
+
+    logger.info("Duplicate delivery suppressed", channel=channel, external_id=external_id)
+    result = await replay(original)
+    _remember(channel, external_id, result)
+    return result
+
+
+def idempotency_stats() -> dict:
+    return {
+        "cached_results": len(_results),
+        "by_channel": {channel: dict(counts) for channel, counts in _stats.items()},
+        "duplicates_suppressed": sum(counts["duplicates_suppressed"] for counts in _stats.values()),
+    }
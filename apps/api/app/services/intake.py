@@ -1,9 +1,11 @@
 """Intake service - processes inbound messages from all channels."""
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.models import Contact, Ticket, Message, AuditEvent
 from app.schemas.webhooks import TwilioInboundSMS, EmailInbound, WebFormSubmission
+from app.services.contacts import ResolvedContact, resolver as contact_resolver
+from app.services.conversation import append_message, email_thread_ids, find_open_ticket, is_follow_up
+from app.services.idempotency import ingest_once
 from app.services.orchestrator import is_emergency
 
 import structlog
@@ -11,26 +13,74 @@ import structlog
 logger = structlog.get_logger()
 
 
-async def find_contact_by_phone(db: AsyncSession, phone: str) -> Contact | None:
-    """Look up a contact by phone number."""
-    # Normalize phone: strip spaces, ensure +1 prefix
-    normalized = phone.strip().replace(" ", "").replace("-", "")
-    result = await db.execute(
-        select(Contact).where(Contact.phone == normalized, Contact.active == True)
-    )
-    return result.scalar_one_or_none()
+async def find_contact_by_phone(db: AsyncSession, phone: str) -> ResolvedContact | None:
+    """Look up an active contact by phone number (any format, matched as E.164)."""
+    return await contact_resolver.by_phone(db, phone)
+
+
+async def find_contact_by_email(db: AsyncSession, email: str) -> ResolvedContact | None:
+    """Look up an active contact by email (case-insensitive)."""
+    return await contact_resolver.by_email(db, email)
 
 
-async def find_contact_by_email(db: AsyncSession, email: str) -> Contact | None:
-    """Look up a contact by email."""
-    result = await db.execute(
-        select(Contact).where(Contact.email == email.lower().strip(), Contact.active == True)
+def sms_reply(
+    contact: Contact | ResolvedContact | None,
+    ticket: Ticket | None,
+    emergency: bool,
+    threaded: bool = False,
+) -> str:
+    """The SMS sent back to the sender of an inbound message."""
+    if ticket is None:
+        return (
+            "Thanks for reaching out! We received your message. "
+            "To create a maintenance request, please reply with your full name "
+            "and property address, and we'll get started."
+        )
+    if threaded and not emergency:
+        return (
+            f"Thanks! We added your message to ticket {ticket.ticket_number}. "
+            f"We'll get back to you shortly."
+        )
+    if emergency:
+        return (
+            f"We received your EMERGENCY maintenance request and are treating it as urgent. "
+            f"Your ticket number is {ticket.ticket_number}. "
+            f"We are notifying your property manager immediately."
+        )
+    return (
+        f"Thanks {contact.first_name}! We received your maintenance request. "
+        f"Your ticket number is {ticket.ticket_number}. "
+        f"Can you send a photo of the issue? We'll get back to you shortly."
     )
-    return result.scalar_one_or_none()
 
 
 async def process_sms_intake(db: AsyncSession, sms: TwilioInboundSMS) -> dict:
-    """Process an inbound SMS and create/update a ticket."""
+    """Process an inbound SMS and create/update a ticket. A provider retry of
+    the same MessageSid returns the original result."""
+    return await ingest_once(
+        db,
+        "sms",
+        sms.MessageSid,
+        process=lambda: _create_sms_ticket(db, sms),
+        replay=lambda message: _replay_sms(db, message),
+    )
+
+
+async def _replay_sms(db: AsyncSession, message: Message) -> dict:
+    ticket = await db.get(Ticket, message.ticket_id) if message.ticket_id else None
+    contact = await db.get(Contact, message.contact_id) if message.contact_id else None
+    emergency = is_emergency(message.body, ticket.client_id if ticket else None)
+    threaded = await is_follow_up(db, message)
+    return {
+        "ticket_id": str(ticket.id) if ticket else None,
+        "threaded": threaded,
+        "retriage": False,
+        "duplicate": True,
+        "reply": sms_reply(contact, ticket, emergency, threaded),
+    }
+
+
+async def _create_sms_ticket(db: AsyncSession, sms: TwilioInboundSMS) -> dict:
     contact = await find_contact_by_phone(db, sms.From)
 
     # Log the inbound message
@@ -47,7 +97,23 @@ async def process_sms_intake(db: AsyncSession, sms: TwilioInboundSMS) -> dict:
     )
     db.add(message)
 
-    emergency = is_emergency(sms.Body)
+    emergency = is_emergency(sms.Body, contact.client_id if contact else None)
+
+    open_ticket = await find_open_ticket(db, contact.id) if contact else None
+    if open_ticket is not None:
+        # Follow-up to a ticket still in progress ("here's a photo")
+        update = await append_message(
+            db, open_ticket, message,
+            priority="emergency" if emergency else "routine",
+            media_urls=sms.media_urls,
+        )
+        await db.commit()
+        return {
+            "ticket_id": str(open_ticket.id),
+            "threaded": True,
+            "retriage": update.retriage,
+            "reply": sms_reply(contact, open_ticket, emergency, threaded=True),
+        }
 
     if contact and contact.property_id and contact.client_id:
         # Known contact - create ticket directly
@@ -79,33 +145,42 @@ async def process_sms_intake(db: AsyncSession, sms: TwilioInboundSMS) -> dict:
         db.add(audit)
         await db.commit()
 
-        if emergency:
-            reply = (
-                f"We received your EMERGENCY maintenance request and are treating it as urgent. "
-                f"Your ticket number is {ticket.ticket_number}. "
-                f"We are notifying your property manager immediately."
-            )
-        else:
-            reply = (
-                f"Thanks {contact.first_name}! We received your maintenance request. "
-                f"Your ticket number is {ticket.ticket_number}. "
-                f"Can you send a photo of the issue? We'll get back to you shortly."
-            )
-
-        return {"ticket_id": str(ticket.id), "reply": reply}
+        return {"ticket_id": str(ticket.id), "reply": sms_reply(contact, ticket, emergency)}
     else:
         # Unknown contact
         await db.commit()
-        reply = (
-            "Thanks for reaching out! We received your message. "
-            "To create a maintenance request, please reply with your full name "
-            "and property address, and we'll get started."
-        )
-        return {"ticket_id": None, "reply": reply}
+        return {"ticket_id": None, "reply": sms_reply(None, None, emergency)}
 
 
 async def process_email_intake(db: AsyncSession, email: EmailInbound) -> dict:
-    """Process inbound email and create a ticket."""
+    """Process inbound email and create a ticket. A provider retry of the same
+    Message-ID returns the original result."""
+    return await ingest_once(
+        db,
+        "email",
+        email.message_id,
+        process=lambda: _create_email_ticket(db, email),
+        replay=lambda message: _replay_email(db, message),
+    )
+
+
+async def _replay_email(db: AsyncSession, message: Message) -> dict:
+    if message.ticket_id:
+        return {
+            "ticket_id": str(message.ticket_id),
+            "threaded": await is_follow_up(db, message),
+            "retriage": False,
+            "duplicate": True,
+        }
+    return {
+        "ticket_id": None,
+        "retriage": False,
+        "duplicate": True,
+        "note": "Unknown sender, needs manual triage",
+    }
+
+
+async def _create_email_ticket(db: AsyncSession, email: EmailInbound) -> dict:
     contact = await find_contact_by_email(db, email.from_email)
 
     message = Message(
@@ -121,9 +196,24 @@ async def process_email_intake(db: AsyncSession, email: EmailInbound) -> dict:
     )
     db.add(message)
 
+    open_ticket = None
+    if contact:
+        open_ticket = await find_open_ticket(
+            db, contact.id, email_thread_ids(email.in_reply_to, email.references)
+        )
+    if open_ticket is not None:
+        emergency = is_emergency(f"{email.subject} {email.body_plain}", contact.client_id)
+        update = await append_message(
+            db, open_ticket, message,
+            priority="emergency" if emergency else "routine",
+            media_urls=email.attachments,
+        )
+        await db.commit()
+        return {"ticket_id": str(open_ticket.id), "threaded": True, "retriage": update.retriage}
+
     if contact and contact.property_id and contact.client_id:
         full_text = f"{email.subject} {email.body_plain}"
-        emergency = is_emergency(full_text)
+        emergency = is_emergency(full_text, contact.client_id)
 
         ticket = Ticket(
             ticket_number="",
@@ -176,8 +266,19 @@ async def process_form_intake(db: AsyncSession, form: WebFormSubmission) -> dict
     )
     db.add(message)
 
+    open_ticket = await find_open_ticket(db, contact.id) if contact else None
+    if open_ticket is not None:
+        emergency = is_emergency(form.issue_description, contact.client_id)
+        update = await append_message(
+            db, open_ticket, message,
+            priority="emergency" if emergency else (form.urgency or "routine"),
+            media_urls=form.photo_urls,
+        )
+        await db.commit()
+        return {"ticket_id": str(open_ticket.id), "threaded": True, "retriage": update.retriage}
+
     if contact and contact.property_id and contact.client_id:
-        emergency = is_emergency(form.issue_description)
+        emergency = is_emergency(form.issue_description, contact.client_id)
         priority = "emergency" if emergency else (form.urgency or "routine")
 
         ticket = Ticket(
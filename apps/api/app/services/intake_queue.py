@@ -0,0 +1,233 @@
+"""Intake queue - durable buffer between fast-ack webhooks and intake processing."""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import asyncio
+import uuid
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import IntakeQueueItem, Message
+from app.schemas.webhooks import TwilioInboundSMS
+from app.services.intake import process_sms_intake
+from app.services.sms import send_sms
+from app.config import settings
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+async def enqueue_intake(db: AsyncSession, channel: str, external_id: Optional[str], payload: dict) -> bool:
+    """Persist a raw inbound payload. Returns False if this provider message
+    id was already queued (e.g. a Twilio retry)."""
+    stmt = (
+        insert(IntakeQueueItem)
+        .values(channel=channel, external_id=external_id, payload=payload)
+        .on_conflict_do_nothing(
+            index_elements=["channel", "external_id"],
+            index_where=IntakeQueueItem.external_id.isnot(None),
+        )
+        .returning(IntakeQueueItem.id)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none() is not None
+
+
+async def process_sms_item(db: AsyncSession, item: IntakeQueueItem) -> dict:
+    """Run SMS intake for a queued message and text the reply back.
+
+    The intake result is saved on the item before the reply is sent, so a
+    retry after a failed send does not create a second ticket.
+    """
+    sms = TwilioInboundSMS(**item.payload)
+    result = item.result
+    if result is None:
+        result = await process_sms_intake(db, sms)
+        item.result = result
+        await db.commit()
+
+    sid = await send_sms(sms.From, result["reply"])
+    ticket_id = result.get("ticket_id")
+    db.add(Message(
+        ticket_id=uuid.UUID(ticket_id) if ticket_id else None,
+        direction="outbound",
+        channel="sms",
+        from_address=settings.twilio_phone_number,
+        to_address=sms.From,
+        body=result["reply"],
+        external_id=sid,
+        agent_name="intake",
+        status="sent" if sid else "failed",
+    ))
+    return result
+
+
+PROCESSORS = {
+    "sms": process_sms_item,
+}
+
+
+class IntakeWorkerPool:
+    """A fixed number of async workers draining `intake_queue`.
+
+    Workers claim one item at a time with `FOR UPDATE SKIP LOCKED`, so any
+    number of API processes can share the queue. Failed items are retried
+    with linear backoff up to `max_attempts`; items left `processing` by a
+    crashed worker are reclaimed after `visibility_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        concurrency: int = 8,
+        poll_interval: float = 1.0,
+        max_attempts: int = 5,
+        retry_backoff: float = 5.0,
+        visibility_timeout: float = 300.0,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.visibility_timeout = visibility_timeout
+        self.in_flight = 0
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self._wakeup = asyncio.Event()
+        self._tasks: list = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.concurrency)]
+        logger.info("Intake workers started", workers=self.concurrency)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers after an enqueue in this process."""
+        self._wakeup.set()
+
+    async def claim(self) -> Optional[IntakeQueueItem]:
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=self.visibility_timeout)
+        async with self.session_factory() as db:
+            item = (await db.execute(
+                select(IntakeQueueItem)
+                .where(or_(
+                    and_(IntakeQueueItem.status == "pending", IntakeQueueItem.available_at <= now),
+                    and_(IntakeQueueItem.status == "processing", IntakeQueueItem.locked_at < stale),
+                ))
+                .order_by(IntakeQueueItem.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )).scalar_one_or_none()
+            if item is None:
+                return None
+            item.status = "processing"
+            item.locked_at = now
+            item.attempts += 1
+            await db.commit()
+            return item
+
+    async def process(self, item: IntakeQueueItem) -> None:
+        processor = PROCESSORS.get(item.channel)
+        item_id, attempts = item.id, item.attempts
+        async with self.session_factory() as db:
+            try:
+                if processor is None:
+                    raise ValueError(f"No intake processor for channel: {item.channel}")
+                item = await db.merge(item)
+                await processor(db, item)
+                item.status = "done"
+                item.processed_at = datetime.now(timezone.utc)
+                item.last_error = None
+                await db.commit()
+                self.processed += 1
+            except Exception as e:
+                await db.rollback()
+                await self._record_failure(item_id, attempts, str(e))
+
+    async def _record_failure(self, item_id, attempts: int, error: str) -> None:
+        give_up = attempts >= self.max_attempts
+        values = {"last_error": error[:2000], "locked_at": None}
+        if give_up:
+            values["status"] = "failed"
+            self.failed += 1
+        else:
+            values["status"] = "pending"
+            values["available_at"] = datetime.now(timezone.utc) + timedelta(
+                seconds=self.retry_backoff * attempts
+            )
+            self.retried += 1
+        logger.error("Intake item failed", item_id=str(item_id), attempts=attempts, give_up=give_up, error=error)
+        async with self.session_factory() as db:
+            await db.execute(update(IntakeQueueItem).where(IntakeQueueItem.id == item_id).values(**values))
+            await db.commit()
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            try:
+                item = await self.claim()
+            except Exception as e:
+                logger.error("Intake claim failed", worker=n, error=str(e))
+                item = None
+            if item is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self.in_flight += 1
+            try:
+                await self.process(item)
+            finally:
+                self.in_flight -= 1
+
+    def worker_stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+async def queue_stats(db: AsyncSession, lag_window_minutes: int = 15) -> dict:
+    """Queue depth by status, age of the oldest pending item, and processing
+    lag (enqueue to done) over the recent window."""
+    counts = dict((await db.execute(
+        select(IntakeQueueItem.status, func.count()).group_by(IntakeQueueItem.status)
+    )).all())
+    oldest_pending = (await db.execute(
+        select(func.min(IntakeQueueItem.created_at)).where(IntakeQueueItem.status == "pending")
+    )).scalar()
+    lag_seconds = func.extract("epoch", IntakeQueueItem.processed_at - IntakeQueueItem.created_at)
+    since = datetime.now(timezone.utc) - timedelta(minutes=lag_window_minutes)
+    lag = (await db.execute(
+        select(
+            func.count(),
+            func.percentile_cont(0.5).within_group(lag_seconds),
+            func.percentile_cont(0.95).within_group(lag_seconds),
+            func.max(lag_seconds),
+        ).where(IntakeQueueItem.status == "done", IntakeQueueItem.processed_at >= since)
+    )).one()
+    now = datetime.now(timezone.utc)
+    return {
+        "depth": counts.get("pending", 0) + counts.get("processing", 0),
+        "by_status": counts,
+        "oldest_pending_age_seconds": round((now - oldest_pending).total_seconds(), 1) if oldest_pending else None,
+        "lag_window_minutes": lag_window_minutes,
+        "processed_in_window": lag[0],
+        "lag_p50_seconds": round(float(lag[1]), 3) if lag[1] is not None else None,
+        "lag_p95_seconds": round(float(lag[2]), 3) if lag[2] is not None else None,
+        "lag_max_seconds": round(float(lag[3]), 3) if lag[3] is not None else None,
+    }
@@ -1,11 +1,14 @@
 """Orchestrator state machine - the air traffic controller for ticket lifecycle."""
 from datetime import datetime
+from typing import Optional
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.models import Ticket, AuditEvent
 from app.schemas.tickets import EventIngest
 from app.config import settings
+from app.services.emergency import detect
 
 import structlog
 
@@ -25,38 +28,50 @@ VALID_TRANSITIONS = {
     "closed": [],  # terminal state
 }
 
-EMERGENCY_KEYWORDS = settings.emergency_keyword_list
 
+def is_emergency(text: str, client_id: Optional[UUID] = None) -> bool:
+    """Check if text contains emergency indicators (global keywords plus the
+    client's own, whole words only, ignoring negated mentions)."""
+    result = detect(text, client_id)
+    if result.is_emergency:
+        logger.info("Emergency keywords matched", terms=result.terms, client_id=str(client_id) if client_id else None)
+    return result.is_emergency
 
-def is_emergency(text: str) -> bool:
-    """Check if text contains emergency indicators."""
-    text_lower = text.lower()
-    return any(kw in text_lower for kw in EMERGENCY_KEYWORDS)
 
+def validate_transition(old_status: str, new_status: str) -> None:
+    """Raise ValueError unless `old_status -> new_status` is a valid transition."""
+    if new_status not in VALID_TRANSITIONS.get(old_status, []):
+        raise ValueError(
+            f"Invalid transition: {old_status} -> {new_status}. "
+            f"Valid targets: {VALID_TRANSITIONS.get(old_status, [])}"
+        )
 
-async def transition_ticket(
-    db: AsyncSession,
+
+def apply_transition(
     ticket: Ticket,
     new_status: str,
     actor_type: str = "system",
     actor_id: str = "",
     detail: str = "",
-) -> Ticket:
-    """Transition a ticket to a new status with validation and audit logging."""
+) -> dict:
+    """Validate and apply a status change in memory. Returns the values of
+    its `status_changed` audit event for the caller to insert."""
     old_status = ticket.status
-
-    if new_status not in VALID_TRANSITIONS.get(old_status, []):
-        raise ValueError(
-            f"Invalid transition: {old_status} -> {new_status}. "
-            f"Valid targets: {VALID_TRANSITIONS.get(old_status, [])}"
-        )
+    validate_transition(old_status, new_status)
 
     ticket.status = new_status
 
     if new_status == "closed":
         ticket.closed_at = datetime.utcnow()
 
-    audit = AuditEvent(
+    logger.info(
+        "Ticket status transition",
+        ticket_id=str(ticket.id),
+        from_status=old_status,
+        to_status=new_status,
+    )
+
+    return dict(
         ticket_id=ticket.id,
         event_type="status_changed",
         agent_name="orchestrator",
@@ -65,15 +80,19 @@ async def transition_ticket(
         detail=detail or f"Status changed from {old_status} to {new_status}",
         metadata={"from_status": old_status, "to_status": new_status},
     )
-    db.add(audit)
 
-    logger.info(
-        "Ticket status transition",
-        ticket_id=str(ticket.id),
-        from_status=old_status,
-        to_status=new_status,
-    )
 
+async def transition_ticket(
+    db: AsyncSession,
+    ticket: Ticket,
+    new_status: str,
+    actor_type: str = "system",
+    actor_id: str = "",
+    detail: str = "",
+) -> Ticket:
+    """Transition a ticket to a new status with validation and audit logging."""
+    audit = apply_transition(ticket, new_status, actor_type=actor_type, actor_id=actor_id, detail=detail)
+    db.add(AuditEvent(**audit))
     return ticket
 
 
@@ -94,7 +113,11 @@ async def handle_event(db: AsyncSession, event: EventIngest) -> dict:
 
     if event.event_type == "inbound_message":
         body = event.payload.get("body", "")
-        if is_emergency(body):
+        if event.payload.get("duplicate"):
+            # Provider retry of a message whose original delivery was already routed
+            result["triage_required"] = False
+            result["decision_summary"] = "Duplicate delivery of an already processed message; nothing to do."
+        elif is_emergency(body, ticket.client_id if ticket else None):
             result["escalation_required"] = True
             result["escalation_reason"] = "Emergency keywords detected in message"
             result["next_actions"] = [
@@ -102,7 +125,12 @@ async def handle_event(db: AsyncSession, event: EventIngest) -> dict:
                 {"action": "trigger_emergency_dispatch", "owner": "dispatch_agent"},
             ]
             result["decision_summary"] = "Emergency detected. Notifying owner and triggering emergency dispatch."
+        elif event.payload.get("threaded") and not event.payload.get("retriage", False):
+            # Follow-up that didn't materially change an already triaged ticket
+            result["triage_required"] = False
+            result["decision_summary"] = "Follow-up added to existing ticket; no material change, triage not re-run."
         else:
+            result["triage_required"] = True
             result["next_actions"] = [
                 {"action": "run_intake_triage", "owner": "intake_agent"},
             ]
@@ -0,0 +1,22 @@
+"""Keyset pagination - opaque cursors over `(created_at, id)` orderings."""
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+import base64
+import json
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Opaque cursor for the row a page ended on."""
+    raw = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Inverse of `encode_cursor`. Raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
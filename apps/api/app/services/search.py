@@ -0,0 +1,181 @@
+"""Ticket search - ranked full-text and fuzzy matching over tickets, messages and properties."""
+from dataclasses import dataclass
+from typing import List, Optional
+from uuid import UUID
+import html
+
+from sqlalchemy import any_, case, distinct, func, literal, literal_column, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Ticket, Message, Property
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Text search configuration the generated tsvector columns use (migration 011)
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+# How much each kind of match contributes to a ticket's score. Full-text
+# ranks are normalized to [0, 1) (ts_rank_cd flag 32), trigram scores are
+# similarities in [0, 1].
+WEIGHTS = {"text": 1.0, "message": 0.6, "number": 1.0, "property": 0.8}
+
+HIGHLIGHT_START, HIGHLIGHT_STOP = "<mark>", "</mark>"
+HEADLINE_OPTIONS = (
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+    "MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter=\" … \""
+)
+
+
+@dataclass
+class SearchHit:
+    ticket: Ticket
+    property_name: str
+    property_address: str
+    score: float
+    matched: List[str]
+    snippet: Optional[str]
+    message_snippet: Optional[str]
+
+
+def _like_pattern(q: str) -> str:
+    escaped = q.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+    return f"%{escaped}%"
+
+
+def _safe_headline(raw: Optional[str]) -> Optional[str]:
+    """HTML-escape a ts_headline result, keeping only our highlight tags."""
+    if raw is None:
+        return None
+    return (
+        html.escape(raw)
+        .replace(html.escape(HIGHLIGHT_START), HIGHLIGHT_START)
+        .replace(html.escape(HIGHLIGHT_STOP), HIGHLIGHT_STOP)
+    )
+
+
+async def search_tickets(
+    db: AsyncSession,
+    q: str,
+    client_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    limit: int = 20,
+) -> List[SearchHit]:
+    """Tickets matching `q`, best first.
+
+    A ticket is found by any of: a full-text match (web-search syntax:
+    words AND-ed, "quoted phrases", -exclusions) on its summary, trade and
+    description or on one of its messages; a fuzzy match on its ticket
+    number; or its property's name/address containing `q` give or take a
+    typo. Scores from every path it matched are summed. Each path is a GIN
+    index scan; headlines, the expensive part, are built only for the
+    returned page.
+    """
+    q = q.strip()
+    if not q:
+        raise ValueError("Search query is blank")
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+    text_hits = select(
+        Ticket.id.label("ticket_id"),
+        (func.ts_rank_cd(Ticket.search_vector, tsquery, 32) * WEIGHTS["text"]).label("score"),
+        literal("text").label("via"),
+    ).where(Ticket.search_vector.op("@@")(tsquery))
+
+    message_hits = select(
+        Message.ticket_id.label("ticket_id"),
+        (func.max(func.ts_rank_cd(Message.search_vector, tsquery, 32)) * WEIGHTS["message"]).label("score"),
+        literal("message").label("via"),
+    ).where(
+        Message.search_vector.op("@@")(tsquery), Message.ticket_id.isnot(None)
+    ).group_by(Message.ticket_id)
+    if client_id:
+        message_hits = message_hits.join(Ticket, Ticket.id == Message.ticket_id)
+
+    number_hits = select(
+        Ticket.id.label("ticket_id"),
+        (func.similarity(Ticket.ticket_number, q) * WEIGHTS["number"]).label("score"),
+        literal("number").label("via"),
+    ).where(or_(
+        Ticket.ticket_number.op("%")(q),
+        Ticket.ticket_number.ilike(_like_pattern(q), escape="!"),
+    ))
+
+    property_hits = select(
+        Ticket.id.label("ticket_id"),
+        (func.word_similarity(q, Property.search_address) * WEIGHTS["property"]).label("score"),
+        literal("property").label("via"),
+    ).join(Property, Property.id == Ticket.property_id).where(Property.search_address.op("%>")(q))
+
+    if client_id:
+        # Per path, so one client's search never scores another's tickets
+        text_hits, message_hits, number_hits, property_hits = (
+            stmt.where(Ticket.client_id == client_id)
+            for stmt in (text_hits, message_hits, number_hits, property_hits)
+        )
+    hits = union_all(text_hits, message_hits, number_hits, property_hits).subquery("hits")
+    scored = (
+        select(
+            hits.c.ticket_id,
+            func.sum(hits.c.score).label("score"),
+            func.array_agg(distinct(hits.c.via)).label("matched"),
+        )
+        .group_by(hits.c.ticket_id)
+        .subquery("scored")
+    )
+
+    page = select(scored.c.ticket_id, scored.c.score, scored.c.matched, Ticket.created_at).join(
+        Ticket, Ticket.id == scored.c.ticket_id
+    )
+    if status:
+        page = page.where(Ticket.status == status)
+    if priority:
+        page = page.where(Ticket.priority == priority)
+    # LIMIT keeps the subquery from being flattened, so headlines below are
+    # computed for the page only
+    page = page.order_by(scored.c.score.desc(), Ticket.created_at.desc()).limit(limit).subquery("page")
+
+    snippet = func.ts_headline(
+        SEARCH_CONFIG,
+        func.concat_ws(" — ", Ticket.summary, Ticket.description),
+        tsquery,
+        HEADLINE_OPTIONS,
+    )
+    best_message = select(
+        func.ts_headline(SEARCH_CONFIG, Message.body, tsquery, HEADLINE_OPTIONS)
+    ).where(
+        Message.ticket_id == page.c.ticket_id,
+        Message.search_vector.op("@@")(tsquery),
+    ).order_by(
+        func.ts_rank_cd(Message.search_vector, tsquery, 32).desc()
+    ).limit(1).scalar_subquery()
+
+    result = await db.execute(
+        select(
+            Ticket,
+            Property.name,
+            Property.address_line1,
+            page.c.score,
+            page.c.matched,
+            snippet.label("snippet"),
+            case((literal("message") == any_(page.c.matched), best_message)).label("message_snippet"),
+        )
+        .select_from(page)
+        .join(Ticket, Ticket.id == page.c.ticket_id)
+        .join(Property, Property.id == Ticket.property_id)
+        .order_by(page.c.score.desc(), page.c.created_at.desc())
+    )
+    return [
+        SearchHit(
+            ticket=ticket,
+            property_name=name,
+            property_address=address,
+            score=round(float(score), 4),
+            matched=sorted(matched),
+            snippet=_safe_headline(snippet_text),
+            message_snippet=_safe_headline(message_text),
+        )
+        for ticket, name, address, score, matched, snippet_text, message_text in result.all()
+    ]
@@ -0,0 +1,42 @@
+"""Outbound SMS via the Twilio REST API."""
+from typing import Optional
+import asyncio
+
+from twilio.rest import Client as TwilioClient
+
+from app.config import settings
+
+import structlog
+
+logger = structlog.get_logger()
+
+_client: Optional[TwilioClient] = None
+
+
+def get_twilio_client() -> Optional[TwilioClient]:
+    """Shared Twilio client, or None when Twilio is not configured."""
+    global _client
+    if _client is None and settings.twilio_account_sid and settings.twilio_auth_token:
+        _client = TwilioClient(settings.twilio_account_sid, settings.twilio_auth_token)
+    return _client
+
+
+async def send_sms(to: str, body: str) -> Optional[str]:
+    """Send an SMS and return the Twilio message SID.
+
+    Returns None without sending when Twilio is not configured. Raises on
+    API errors so callers can retry.
+    """
+    client = get_twilio_client()
+    if client is None:
+        logger.warning("Twilio not configured, SMS not sent", to=to, body_preview=body[:100])
+        return None
+    # The Twilio SDK is blocking; keep it off the event loop
+    message = await asyncio.to_thread(
+        client.messages.create,
+        to=to,
+        from_=settings.twilio_phone_number,
+        body=body,
+    )
+    logger.info("SMS sent", to=to, sid=message.sid)
+    return message.sid
@@ -0,0 +1,117 @@
+"""Dashboard stats - ticket counts read from the trigger-maintained counter tables."""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import TicketStatusCount, TicketHourlyCount
+
+import structlog
+
+logger = structlog.get_logger()
+
+BUCKETS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+
+def _floor(ts: datetime, bucket: str) -> datetime:
+    ts = ts.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if bucket == "day" else ts
+
+
+def _counts() -> dict:
+    return {
+        "open": 0,
+        "by_status": defaultdict(int),
+        "open_by_priority": defaultdict(int),
+        "emergencies_24h": 0,
+    }
+
+
+async def dashboard_stats(
+    db: AsyncSession,
+    client_id: Optional[UUID] = None,
+    hours: int = 24,
+    bucket: str = "hour",
+    now: Optional[datetime] = None,
+) -> dict:
+    """Open tickets by status/priority, globally and per client, emergencies
+    created in the last 24 hours, and tickets created/closed per hour or day
+    over the last `hours` hours (UTC).
+
+    Reads only the counter tables from migration 012, whose size depends on
+    the number of clients and hours covered, not on the number of tickets.
+    "Last 24 hours" is the current hour plus the 23 before it.
+    """
+    now = now or datetime.now(timezone.utc)
+    current_hour = _floor(now, "hour")
+    emergencies_since = current_hour - timedelta(hours=23)
+    series_since = _floor(current_hour - timedelta(hours=hours - 1), bucket)
+
+    def scoped(query, model):
+        return query.where(model.client_id == client_id) if client_id else query
+
+    overall = _counts()
+    clients: Dict[UUID, dict] = defaultdict(_counts)
+    rows = await db.execute(scoped(
+        select(
+            TicketStatusCount.client_id,
+            TicketStatusCount.status,
+            TicketStatusCount.priority,
+            TicketStatusCount.tickets,
+        ).where(TicketStatusCount.tickets != 0),
+        TicketStatusCount,
+    ))
+    for cid, status, priority, tickets in rows.all():
+        for counts in (overall, clients[cid]):
+            counts["by_status"][status] += tickets
+            if status != "closed":
+                counts["open"] += tickets
+                counts["open_by_priority"][priority] += tickets
+
+    rows = await db.execute(scoped(
+        select(TicketHourlyCount.client_id, func.sum(TicketHourlyCount.created))
+        .where(
+            TicketHourlyCount.priority == "emergency",
+            TicketHourlyCount.bucket >= emergencies_since,
+        )
+        .group_by(TicketHourlyCount.client_id),
+        TicketHourlyCount,
+    ))
+    for cid, created in rows.all():
+        overall["emergencies_24h"] += created
+        clients[cid]["emergencies_24h"] += created
+
+    points = {}
+    start = series_since
+    while start <= current_hour:
+        points[start] = {"start": start.isoformat(), "created": 0, "closed": 0, "emergencies": 0}
+        start += BUCKETS[bucket]
+    rows = await db.execute(scoped(
+        select(
+            TicketHourlyCount.bucket,
+            TicketHourlyCount.priority,
+            func.sum(TicketHourlyCount.created),
+            func.sum(TicketHourlyCount.closed),
+        )
+        .where(TicketHourlyCount.bucket >= series_since)
+        .group_by(TicketHourlyCount.bucket, TicketHourlyCount.priority),
+        TicketHourlyCount,
+    ))
+    for hour, priority, created, closed in rows.all():
+        point = points.get(_floor(hour, bucket))
+        if point is None:
+            continue
+        point["created"] += created
+        point["closed"] += closed
+        if priority == "emergency":
+            point["emergencies"] += created
+
+    return {
+        "as_of": now.isoformat(),
+        **overall,
+        "clients": {str(cid): counts for cid, counts in clients.items()},
+        "series": {"bucket": bucket, "since": series_since.isoformat(), "points": list(points.values())},
+    }
@@ -0,0 +1,141 @@
+"""Conditional GETs for ticket reads - ETags and an in-process ticket cache."""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional, Tuple
+from uuid import UUID
+import hashlib
+import time
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Ticket
+from app.schemas.tickets import TicketResponse
+
+import structlog
+
+logger = structlog.get_logger()
+
+_PENDING_KEY = "ticket_cache_pending"
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag over the values that identify a representation's version."""
+    digest = hashlib.sha1("|".join("" if p is None else str(p) for p in parts).encode()).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+
+def ticket_etag(ticket_id: UUID, updated_at) -> str:
+    return make_etag("ticket", ticket_id, updated_at.isoformat() if updated_at else None)
+
+
+@dataclass(frozen=True)
+class CachedTicket:
+    """A ticket as serialized for `GET /tickets/{id}`, with its ETag."""
+
+    etag: str
+    body: dict
+
+    @classmethod
+    def from_model(cls, ticket: Ticket) -> "CachedTicket":
+        return cls(
+            etag=ticket_etag(ticket.id, ticket.updated_at),
+            body=TicketResponse.model_validate(ticket).model_dump(mode="json"),
+        )
+
+
+class TicketCache:
+    """Read-through LRU of serialized tickets with a TTL.
+
+    Ticket changes flushed by this process drop their entry immediately
+    (see `_invalidate_flushed_tickets`); the TTL bounds how long a change made
+    by another API or worker process can go unseen.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 5000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[UUID, Tuple[float, CachedTicket]]" = OrderedDict()
+
+    def get(self, ticket_id: UUID) -> Optional[CachedTicket]:
+        entry = self._entries.get(ticket_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[ticket_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(ticket_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, ticket: Ticket) -> CachedTicket:
+        cached = CachedTicket.from_model(ticket)
+        if self.ttl > 0:
+            self._entries[ticket.id] = (time.monotonic() + self.ttl, cached)
+            self._entries.move_to_end(ticket.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def invalidate(self, ticket_ids: Iterable[UUID]) -> None:
+        for ticket_id in ticket_ids:
+            self._entries.pop(ticket_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / (self.hits + self.misses), 4) if self.hits + self.misses else 0.0,
+        }
+
+
+ticket_cache = TicketCache(
+    ttl=settings.ticket_cache_ttl_seconds,
+    max_entries=settings.ticket_cache_max_entries,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_tickets(session: Session, flush_context) -> None:
+    """Drop cached copies of tickets changed by this flush (update_ticket,
+    transition_ticket, intake and threading writes all go through here).
+
+    The ids are dropped again after commit: a read on another session between
+    this flush and the commit would otherwise re-cache the old row.
+    """
+    ids = {
+        obj.id for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if isinstance(obj, Ticket) and obj.id is not None
+    }
+    if ids:
+        ticket_cache.invalidate(ids)
+        session.info.setdefault(_PENDING_KEY, set()).update(ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_tickets(session: Session) -> None:
+    ticket_cache.invalidate(session.info.pop(_PENDING_KEY, ()))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_tickets(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,245 @@
+"""Ticket change stream - fans Postgres NOTIFY payloads out to SSE subscribers."""
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+import asyncio
+import json
+import secrets
+
+import asyncpg
+
+from app.config import settings
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Channel the migration 010 triggers NOTIFY on
+CHANNEL = "ticket_changes"
+
+RECONNECT_BACKOFF_MAX = 30.0
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """One notification, with its SSE frame rendered once for every subscriber."""
+
+    seq: int
+    client_id: Optional[str]
+    statuses: FrozenSet[str]
+    priorities: FrozenSet[str]
+    frame: str
+
+
+class Subscriber:
+    """One connected stream: its filters and a bounded queue of events.
+
+    A subscriber that falls `queue_size` events behind is marked `overflowed`
+    and dropped by the hub rather than buffering without bound; its stream
+    closes and the client resumes from its Last-Event-ID.
+    """
+
+    __slots__ = ("client_id", "statuses", "priorities", "queue", "overflowed")
+
+    def __init__(
+        self,
+        client_id: Optional[str],
+        statuses: Optional[Iterable[str]],
+        priorities: Optional[Iterable[str]],
+        queue_size: int,
+    ):
+        self.client_id = client_id
+        self.statuses = frozenset(statuses) if statuses else None
+        self.priorities = frozenset(priorities) if priorities else None
+        self.queue: "asyncio.Queue[ChangeEvent]" = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def matches(self, event: ChangeEvent) -> bool:
+        if self.client_id is not None and event.client_id != self.client_id:
+            return False
+        # Events carry old and new values: a ticket leaving a watched status
+        # or priority is news to its watchers too
+        if self.statuses is not None and not (self.statuses & event.statuses):
+            return False
+        if self.priorities is not None and not (self.priorities & event.priorities):
+            return False
+        return True
+
+
+def _reset_event(reason: str) -> ChangeEvent:
+    """Tells a client its view may be stale and to refetch `GET /tickets`."""
+    return ChangeEvent(
+        seq=0, client_id=None, statuses=frozenset(), priorities=frozenset(),
+        frame=f"event: reset\ndata: {json.dumps({'reason': reason})}\n\n",
+    )
+
+
+class TicketChangeHub:
+    """Single LISTEN connection per process, fanned out to many subscribers.
+
+    Each notification is parsed and rendered to an SSE frame once, kept in a
+    ring buffer for resumption, and offered to the subscribers of its client
+    (plus the unfiltered ones) without blocking. Event ids are
+    `<epoch>-<seq>`; the epoch changes whenever notifications may have been
+    missed (process start, listener reconnect), and a client resuming from
+    another epoch, or from before the buffer, gets a `reset` event instead.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = 2000,
+        queue_size: int = 256,
+        max_subscribers: int = 5000,
+        keepalive: float = 30.0,
+    ):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.keepalive = keepalive
+        self.epoch = secrets.token_hex(4)
+        self.connected = False
+        self.published = 0
+        self.overflows = 0
+        self._seq = 0
+        self._buffer: Deque[ChangeEvent] = deque(maxlen=buffer_size)
+        self._subscribers: Dict[Optional[str], Set[Subscriber]] = {}
+        self._count = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start listening in the background; idempotent, never raises."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        listened = False
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(settings.database_url.replace("postgresql+asyncpg://", "postgresql://"))
+                await conn.add_listener(CHANNEL, self._on_notify)
+                if listened:
+                    # Anything committed while we were disconnected was not seen
+                    self._new_epoch("listener_reconnected")
+                listened = self.connected = True
+                backoff = 1.0
+                logger.info("Ticket change listener connected", epoch=self.epoch)
+                while True:
+                    await asyncio.sleep(self.keepalive)
+                    await conn.fetchval("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Ticket change listener failed", error=str(e), retry_in=backoff)
+            finally:
+                self.connected = False
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            logger.warning("Unparseable ticket change notification", payload=payload[:200])
+            return
+        self.publish(data, payload)
+
+    def publish(self, data: dict, raw: Optional[str] = None) -> ChangeEvent:
+        self._seq += 1
+        event_id = f"{self.epoch}-{self._seq}"
+        event = ChangeEvent(
+            seq=self._seq,
+            client_id=data.get("client_id"),
+            statuses=frozenset(v for v in (data.get("status"), data.get("old_status")) if v),
+            priorities=frozenset(v for v in (data.get("priority"), data.get("old_priority")) if v),
+            frame=f"id: {event_id}\nevent: {data.get('kind', 'ticket')}\ndata: {raw or json.dumps(data)}\n\n",
+        )
+        self._buffer.append(event)
+        self.published += 1
+        for group in (self._subscribers.get(event.client_id, ()), self._subscribers.get(None, ())):
+            for subscriber in list(group):
+                if subscriber.matches(event):
+                    self._offer(subscriber, event)
+        return event
+
+    def _offer(self, subscriber: Subscriber, event: ChangeEvent) -> None:
+        try:
+            subscriber.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            subscriber.overflowed = True
+            self.overflows += 1
+            self.unsubscribe(subscriber)
+
+    def _new_epoch(self, reason: str) -> None:
+        self.epoch = secrets.token_hex(4)
+        self._buffer.clear()
+        reset = _reset_event(reason)
+        for group in list(self._subscribers.values()):
+            for subscriber in list(group):
+                self._offer(subscriber, reset)
+
+    @property
+    def at_capacity(self) -> bool:
+        return self._count >= self.max_subscribers
+
+    def subscribe(
+        self,
+        client_id: Optional[UUID] = None,
+        statuses: Optional[Iterable[str]] = None,
+        priorities: Optional[Iterable[str]] = None,
+        last_event_id: Optional[str] = None,
+    ) -> Tuple[Subscriber, List[ChangeEvent]]:
+        """Register a subscriber; returns it and the buffered events it missed
+        since `last_event_id` (or a single `reset` if they can't be replayed).
+        Later events arrive on `subscriber.queue`."""
+        subscriber = Subscriber(str(client_id) if client_id else None, statuses, priorities, self.queue_size)
+        self._subscribers.setdefault(subscriber.client_id, set()).add(subscriber)
+        self._count += 1
+        return subscriber, self._backlog(subscriber, last_event_id)
+
+    def _backlog(self, subscriber: Subscriber, last_event_id: Optional[str]) -> List[ChangeEvent]:
+        if not last_event_id:
+            return []
+        epoch, _, seq = last_event_id.strip().rpartition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self._seq:
+            return [_reset_event("resume_unavailable")]
+        last_seq = int(seq)
+        oldest = self._buffer[0].seq if self._buffer else self._seq + 1
+        if last_seq < oldest - 1:
+            return [_reset_event("resume_unavailable")]
+        return [e for e in self._buffer if e.seq > last_seq and subscriber.matches(e)]
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        group = self._subscribers.get(subscriber.client_id)
+        if group is None or subscriber not in group:
+            return
+        group.discard(subscriber)
+        if not group:
+            del self._subscribers[subscriber.client_id]
+        self._count -= 1
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "epoch": self.epoch,
+            "subscribers": self._count,
+            "published": self.published,
+            "buffered": len(self._buffer),
+            "overflows": self.overflows,
+        }
+
+
+hub = TicketChangeHub(
+    buffer_size=settings.ticket_stream_buffer_size,
+    queue_size=settings.ticket_stream_queue_size,
+    max_subscribers=settings.ticket_stream_max_subscribers,
+)
@@ -0,0 +1,174 @@
+"""Emergency detector micro-benchmark.
+
+Compares the compiled detector in `app.services.emergency` with the previous
+substring scan (`any(kw in text.lower() for kw in keywords)`) on synthetic
+tenant messages, at the configured keyword count and at a few hundred
+phrases. Also reports how often the two disagree, which is mostly substring
+false positives ("fireplace") and negated mentions ("no smoke") that the
+old check flagged. Before timing anything it checks the detector against
+`EXPECTED`, known phrasings with the verdict they must get, and exits
+non-zero on any mismatch.
+
+    cd apps/api
+    python bench/emergency_bench.py --messages 20000 --phrases 300
+"""
+from pathlib import Path
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import settings  # noqa: E402
+from app.services.emergency import EmergencyDetector  # noqa: E402
+
+FILLER = (
+    "hi the kitchen sink in unit 4b is leaking again and the landlord said to text "
+    "this number please send someone tomorrow morning if possible thanks also the "
+    "screen door is loose and the detector beeps when the battery is low water "
+    "under the bathroom vanity heater not working since monday door lock stuck"
+).split()
+
+EXTRA_PHRASES = [
+    "gas leak", "smell gas", "burst pipe", "water pouring", "ceiling collapse", "no heat",
+    "electrical fire", "sparks", "exposed wires", "sewage backup", "break in", "broken window",
+    "fuga de gas", "inundación", "incendio", "humo", "olor a gas", "tubería rota",
+    "fuite de gaz", "inondation", "incendie", "fumée", "odeur de gaz", "dégât des eaux",
+]
+
+# Inserted into 20% of messages; "fireplace"/"gasket"/"no smoke" only fool the substring scan
+TRIGGERS = ["gas", "flooding", "smoke", "fire", "sparking", "no smoke", "fireplace", "gasket", "gas leak", "fumée"]
+
+# (message, is_emergency) with the default keywords. Real emergencies phrased
+# with a negative verb must still escalate; only a cue directly before the
+# term negates it.
+EXPECTED = [
+    ("I cant stop the flooding in my bathroom", True),
+    ("The water won't stop flooding the kitchen", True),
+    ("I can't turn off the gas", True),
+    ("Don't know where the smoke is coming from", True),
+    ("There's no way to stop the flooding", True),
+    ("It never stopped sparking", True),
+    ("No smoke, but the fire alarm keeps going off", True),
+    ("No fire, the alarm just needs a battery", False),
+    ("There is no smoke", False),
+    ("It's not a fire, just a burnt smell", False),
+    ("Heater works without any gas smell now", False),
+    ("The fireplace flue is stuck", False),
+    ("Kitchen sink is leaking", False),
+    ("I smell GAS in the hallway", True),
+    ("Carbon\nmonoxide alarm is going off", True),
+]
+
+
+def check_expected() -> list:
+    """Messages in `EXPECTED` the detector classifies differently."""
+    detector = EmergencyDetector(settings.emergency_keyword_list)
+    return [(text, want) for text, want in EXPECTED if detector.scan(text).is_emergency != want]
+
+
+def legacy_is_emergency(text: str, keywords: list) -> bool:
+    text_lower = text.lower()
+    return any(kw in text_lower for kw in keywords)
+
+
+def make_keywords(count: int) -> list:
+    keywords = dict.fromkeys(settings.emergency_keyword_list + EXTRA_PHRASES)
+    rng = random.Random(7)
+    while len(keywords) < count:
+        # Near-miss phrases built from message vocabulary, so most scans do real work
+        keywords[" ".join(rng.choice(FILLER) + rng.choice("sxz") for _ in range(rng.randint(1, 3)))] = None
+    return list(keywords)[:count]
+
+
+def make_messages(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(8, 60))]
+        if rng.random() < 0.2:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(TRIGGERS))
+        messages.append(" ".join(words).capitalize() + ".")
+    return messages
+
+
+def time_per_message(fn, messages: list, repeat: int) -> float:
+    """Best-of-`repeat` microseconds per message."""
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(messages)
+        runs.append((time.perf_counter() - started) / len(messages) * 1e6)
+    return min(runs)
+
+
+def bench(keyword_count: int, messages: list, repeat: int) -> dict:
+    keywords = make_keywords(keyword_count)
+    started = time.perf_counter()
+    detector = EmergencyDetector(keywords)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    legacy_us = time_per_message(lambda ms: [legacy_is_emergency(m, keywords) for m in ms], messages, repeat)
+    scan_us = time_per_message(lambda ms: [detector.scan(m).is_emergency for m in ms], messages, repeat)
+    batch_us = time_per_message(lambda ms: [r.is_emergency for r in detector.classify_many(ms)], messages, repeat)
+
+    legacy = [legacy_is_emergency(m, keywords) for m in messages]
+    compiled = [r.is_emergency for r in detector.classify_many(messages)]
+    return {
+        "keywords": len(detector.keywords),
+        "build_ms": round(build_ms, 2),
+        "legacy_us_per_message": round(legacy_us, 2),
+        "scan_us_per_message": round(scan_us, 2),
+        "classify_many_us_per_message": round(batch_us, 2),
+        "speedup": round(legacy_us / scan_us, 2) if scan_us else None,
+        "flagged_legacy": sum(legacy),
+        "flagged_compiled": sum(compiled),
+        "disagreements": sum(a != b for a, b in zip(legacy, compiled)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--phrases", type=int, default=300, help="keyword count for the large run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print a machine-readable report")
+    args = parser.parse_args()
+
+    mismatches = check_expected()
+    for text, want in mismatches:
+        print(f"MISMATCH: expected is_emergency={want} for {text!r}", file=sys.stderr)
+    if mismatches:
+        sys.exit(1)
+
+    messages = make_messages(args.messages, args.seed)
+    report = {
+        "messages": len(messages),
+        "mean_message_chars": round(statistics.mean(len(m) for m in messages), 1),
+        "runs": [
+            bench(len(settings.emergency_keyword_list), messages, args.repeat),
+            bench(args.phrases, messages, args.repeat),
+        ],
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['messages']} messages, {report['mean_message_chars']} chars on average")
+    for run in report["runs"]:
+        print(
+            f"\n{run['keywords']} keywords (automaton built in {run['build_ms']} ms)\n"
+            f"  legacy substring scan   {run['legacy_us_per_message']:>8} us/message\n"
+            f"  detector.scan           {run['scan_us_per_message']:>8} us/message ({run['speedup']}x)\n"
+            f"  classify_many           {run['classify_many_us_per_message']:>8} us/message\n"
+            f"  flagged: legacy {run['flagged_legacy']}, compiled {run['flagged_compiled']} "
+            f"({run['disagreements']} disagreements)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+-- =============================================
+-- Intake queue - fast-ack webhooks
+-- =============================================
+-- Inbound webhooks persist their raw payload here and return immediately;
+-- the API's intake worker pool claims rows with FOR UPDATE SKIP LOCKED,
+-- runs intake and sends the reply as an outbound message.
+
+CREATE TABLE IF NOT EXISTS intake_queue (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    channel VARCHAR(20) NOT NULL, -- sms
+    external_id VARCHAR(255), -- provider message id, e.g. Twilio MessageSid
+    payload JSONB NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    -- pending, processing, done, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_at TIMESTAMPTZ,
+    processed_at TIMESTAMPTZ,
+    result JSONB, -- intake result, kept so a retry only re-sends the reply
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Provider retries of the same message are accepted once
+CREATE UNIQUE INDEX IF NOT EXISTS uq_intake_queue_channel_external_id
+    ON intake_queue(channel, external_id) WHERE external_id IS NOT NULL;
+
+-- Claim path: oldest due pending item, or a processing item whose worker died
+CREATE INDEX IF NOT EXISTS idx_intake_queue_pending
+    ON intake_queue(available_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_intake_queue_processing
+    ON intake_queue(locked_at) WHERE status = 'processing';
+CREATE INDEX IF NOT EXISTS idx_intake_queue_processed_at
+    ON intake_queue(processed_at) WHERE status = 'done';
@@ -0,0 +1,23 @@
+-- =============================================
+-- Idempotent inbound message ingestion
+-- =============================================
+-- Providers (Twilio, SendGrid) retry slow webhooks with the same message id.
+-- One inbound message per (channel, external_id) lets intake detect replays
+-- and return the original result instead of creating a duplicate ticket.
+
+-- Keep the first copy of any duplicates already ingested; later copies get a
+-- suffixed external_id so the unique index can be built
+UPDATE messages m
+SET external_id = m.external_id || ':dup:' || m.id
+FROM (
+    SELECT id, ROW_NUMBER() OVER (
+        PARTITION BY channel, external_id ORDER BY created_at, id
+    ) AS copy
+    FROM messages
+    WHERE direction = 'inbound' AND external_id IS NOT NULL
+) d
+WHERE m.id = d.id AND d.copy > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_messages_inbound_channel_external_id
+    ON messages(channel, external_id)
+    WHERE direction = 'inbound' AND external_id IS NOT NULL;
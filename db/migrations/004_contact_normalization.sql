@@ -0,0 +1,51 @@
+-- =============================================
+-- Normalized contact phone / email for intake lookups
+-- =============================================
+-- Inbound messages are matched to contacts by phone (E.164) or email
+-- (trimmed, lowercased). The canonical forms are stored generated columns,
+-- so they can never drift from the raw values, and are indexed for the
+-- active contacts intake searches.
+-- Keep normalize_phone_e164 in sync with app/services/contacts.py.
+
+CREATE OR REPLACE FUNCTION normalize_phone_e164(raw TEXT)
+RETURNS TEXT AS $$
+DECLARE
+    digits TEXT := regexp_replace(coalesce(raw, ''), '\D', '', 'g');
+BEGIN
+    IF length(digits) = 0 THEN
+        RETURN NULL;
+    END IF;
+    IF btrim(raw) LIKE '+%' THEN
+        -- Already international
+        NULL;
+    ELSIF left(digits, 3) = '011' THEN
+        -- US international dialing prefix
+        digits := substr(digits, 4);
+    ELSIF length(digits) = 10 THEN
+        -- NANP number without country code
+        digits := '1' || digits;
+    ELSIF NOT (length(digits) = 11 AND left(digits, 1) = '1') THEN
+        RETURN NULL;
+    END IF;
+    IF length(digits) < 8 OR length(digits) > 15 THEN
+        RETURN NULL;
+    END IF;
+    RETURN '+' || digits;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION normalize_email(raw TEXT)
+RETURNS TEXT AS $$
+    SELECT nullif(lower(btrim(raw)), '');
+$$ LANGUAGE sql IMMUTABLE;
+
+ALTER TABLE contacts
+    ADD COLUMN IF NOT EXISTS phone_e164 VARCHAR(20)
+        GENERATED ALWAYS AS (normalize_phone_e164(phone)) STORED,
+    ADD COLUMN IF NOT EXISTS email_normalized VARCHAR(255)
+        GENERATED ALWAYS AS (normalize_email(email)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_contacts_phone_e164
+    ON contacts(phone_e164) WHERE active = TRUE;
+CREATE INDEX IF NOT EXISTS idx_contacts_email_normalized
+    ON contacts(email_normalized) WHERE active = TRUE;
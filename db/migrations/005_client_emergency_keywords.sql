@@ -0,0 +1,8 @@
+-- =============================================
+-- Per-client emergency keywords
+-- =============================================
+-- Phrases in clients.emergency_keywords are matched in addition to the global
+-- EMERGENCY_KEYWORDS setting for that client's inbound messages (e.g. "boiler
+-- lockout" for a client with central boilers, or phrases in tenants' languages).
+
+ALTER TABLE clients ADD COLUMN IF NOT EXISTS emergency_keywords TEXT[];
@@ -0,0 +1,17 @@
+-- =============================================
+-- Conversation threading
+-- =============================================
+-- Follow-up messages from a contact join their most recently active open
+-- ticket instead of opening a new one; email replies are matched to the
+-- ticket of the message named in In-Reply-To / References.
+
+-- Open tickets per requester, newest activity first
+CREATE INDEX IF NOT EXISTS idx_tickets_open_by_requester
+    ON tickets(requester_contact_id, updated_at DESC)
+    WHERE status <> 'closed';
+
+-- Email Message-IDs in either direction (replies usually reference our
+-- outbound notifications, which the inbound unique index does not cover)
+CREATE INDEX IF NOT EXISTS idx_messages_email_external_id
+    ON messages(external_id)
+    WHERE channel = 'email' AND external_id IS NOT NULL;
@@ -0,0 +1,121 @@
+-- =============================================
+-- Bulk historical import
+-- =============================================
+-- Onboarding loads a client's history (tickets, messages, invoices) from
+-- their previous PM system. Files are COPYed into text-typed staging tables,
+-- then resolved and loaded with set-based SQL in one transaction per job
+-- (see app/services/bulk_import.py).
+
+CREATE TABLE IF NOT EXISTS import_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    client_id UUID NOT NULL REFERENCES clients(id),
+    kind VARCHAR(20) NOT NULL, -- tickets, messages, invoices
+    format VARCHAR(10) NOT NULL, -- csv, ndjson
+    source_name VARCHAR(255),
+    status VARCHAR(20) NOT NULL DEFAULT 'staging',
+    -- staging, staged, loading, completed, failed
+    rows_staged INTEGER NOT NULL DEFAULT 0, -- checkpoint: last source row copied
+    rows_imported INTEGER NOT NULL DEFAULT 0,
+    rows_skipped INTEGER NOT NULL DEFAULT 0, -- already imported by an earlier job
+    rows_rejected INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    completed_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_import_jobs_client_id ON import_jobs(client_id);
+
+-- Legacy ticket id -> ticket, so re-running an import skips tickets already
+-- loaded and later message/invoice files can reference them
+CREATE TABLE IF NOT EXISTS import_ticket_map (
+    client_id UUID NOT NULL REFERENCES clients(id),
+    legacy_id VARCHAR(255) NOT NULL,
+    ticket_id UUID NOT NULL REFERENCES tickets(id),
+    job_id UUID NOT NULL REFERENCES import_jobs(id),
+    PRIMARY KEY (client_id, legacy_id)
+);
+
+-- Staging: every source column is TEXT so COPY never fails on bad values;
+-- casts and lookups happen in the load step, which records a per-row error.
+-- Unlogged: staged rows are reproducible from the source file.
+CREATE UNLOGGED TABLE IF NOT EXISTS import_staging_tickets (
+    job_id UUID NOT NULL,
+    line_no INTEGER NOT NULL,
+    legacy_id TEXT,
+    property TEXT, -- property name or first address line
+    unit_number TEXT,
+    requester_phone TEXT,
+    requester_email TEXT,
+    status TEXT,
+    priority TEXT,
+    trade TEXT,
+    summary TEXT,
+    description TEXT,
+    created_at TEXT,
+    closed_at TEXT,
+    closed_reason TEXT,
+    -- resolved by the load step
+    ticket_id UUID,
+    property_id UUID,
+    unit_id UUID,
+    contact_id UUID,
+    error TEXT,
+    PRIMARY KEY (job_id, line_no)
+);
+
+CREATE UNLOGGED TABLE IF NOT EXISTS import_staging_messages (
+    job_id UUID NOT NULL,
+    line_no INTEGER NOT NULL,
+    legacy_id TEXT,
+    legacy_ticket_id TEXT,
+    direction TEXT,
+    channel TEXT,
+    from_address TEXT,
+    to_address TEXT,
+    subject TEXT,
+    body TEXT,
+    external_id TEXT,
+    created_at TEXT,
+    ticket_id UUID,
+    contact_id UUID,
+    error TEXT,
+    PRIMARY KEY (job_id, line_no)
+);
+
+CREATE UNLOGGED TABLE IF NOT EXISTS import_staging_invoices (
+    job_id UUID NOT NULL,
+    line_no INTEGER NOT NULL,
+    legacy_id TEXT,
+    legacy_ticket_id TEXT,
+    vendor TEXT, -- vendor company name
+    invoice_number TEXT,
+    amount TEXT,
+    status TEXT,
+    due_date TEXT,
+    paid_at TEXT,
+    created_at TEXT,
+    ticket_id UUID,
+    vendor_id UUID,
+    error TEXT,
+    PRIMARY KEY (job_id, line_no)
+);
+
+-- Lenient casts for staged text; NULL instead of an error on bad input
+CREATE OR REPLACE FUNCTION import_try_timestamptz(raw TEXT)
+RETURNS TIMESTAMPTZ AS $$
+BEGIN
+    RETURN nullif(btrim(raw), '')::TIMESTAMPTZ;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+CREATE OR REPLACE FUNCTION import_try_numeric(raw TEXT)
+RETURNS NUMERIC AS $$
+BEGIN
+    RETURN replace(replace(nullif(btrim(raw), ''), '$', ''), ',', '')::NUMERIC;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
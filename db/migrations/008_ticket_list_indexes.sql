@@ -0,0 +1,24 @@
+-- =============================================
+-- Ticket listing indexes
+-- =============================================
+-- GET /tickets pages newest first on (created_at, id) with optional
+-- client / status / priority filters. Composite indexes in that order let
+-- each filter combination read one page by walking an index from the
+-- cursor position, instead of sorting every matching row.
+
+CREATE INDEX IF NOT EXISTS idx_tickets_created_id
+    ON tickets(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_client_created_id
+    ON tickets(client_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_status_created_id
+    ON tickets(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_client_status_created_id
+    ON tickets(client_id, status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_priority_created_id
+    ON tickets(priority, created_at DESC, id DESC);
+
+-- Superseded: each is a prefix of one of the indexes above
+DROP INDEX IF EXISTS idx_tickets_created_at;
+DROP INDEX IF EXISTS idx_tickets_client_id;
+DROP INDEX IF EXISTS idx_tickets_status;
+DROP INDEX IF EXISTS idx_tickets_priority;
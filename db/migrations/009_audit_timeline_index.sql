@@ -0,0 +1,12 @@
+-- =============================================
+-- Ticket timeline index
+-- =============================================
+-- GET /tickets/{id}/timeline reads a ticket's audit events in
+-- (created_at, id) order and tails them from an (created_at, id) position;
+-- this index serves both without a sort.
+
+CREATE INDEX IF NOT EXISTS idx_audit_events_ticket_created_id
+    ON audit_events(ticket_id, created_at, id);
+
+-- Superseded: prefix of the index above
+DROP INDEX IF EXISTS idx_audit_events_ticket_id;
@@ -0,0 +1,78 @@
+-- =============================================
+-- Ticket change notifications
+-- =============================================
+-- GET /tickets/stream (server-sent events) is fed by one LISTEN connection
+-- per API process on the `ticket_changes` channel (see
+-- app/services/ticket_stream.py). Ticket inserts/updates and audit event
+-- inserts NOTIFY a small JSON payload carrying what subscribers filter on;
+-- delivery happens at commit, so rolled-back changes are never announced.
+--
+-- Payloads stay well under the 8000-byte NOTIFY limit: no free text beyond
+-- the ticket summary (truncated), never the audit detail/metadata.
+--
+-- Bulk loads can suppress them for their transaction with
+--   SET LOCAL app.suppress_ticket_notify = 'on'
+
+CREATE OR REPLACE FUNCTION notify_ticket_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF current_setting('app.suppress_ticket_notify', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    PERFORM pg_notify('ticket_changes', json_build_object(
+        'kind', 'ticket',
+        'op', lower(TG_OP),
+        'ticket_id', NEW.id,
+        'ticket_number', NEW.ticket_number,
+        'client_id', NEW.client_id,
+        'status', NEW.status,
+        'old_status', CASE WHEN TG_OP = 'UPDATE' THEN OLD.status END,
+        'priority', NEW.priority,
+        'old_priority', CASE WHEN TG_OP = 'UPDATE' THEN OLD.priority END,
+        'trade', NEW.trade,
+        'summary', left(NEW.summary, 200),
+        'updated_at', NEW.updated_at
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION notify_audit_event()
+RETURNS TRIGGER AS $$
+DECLARE
+    t RECORD;
+BEGIN
+    IF NEW.ticket_id IS NULL OR current_setting('app.suppress_ticket_notify', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    SELECT client_id, status, priority INTO t FROM tickets WHERE id = NEW.ticket_id;
+    PERFORM pg_notify('ticket_changes', json_build_object(
+        'kind', 'audit',
+        'event_id', NEW.id,
+        'event_type', NEW.event_type,
+        'agent_name', NEW.agent_name,
+        'actor_type', NEW.actor_type,
+        'ticket_id', NEW.ticket_id,
+        'client_id', t.client_id,
+        'status', t.status,
+        'priority', t.priority,
+        'created_at', NEW.created_at
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS notify_tickets_insert ON tickets;
+CREATE TRIGGER notify_tickets_insert
+    AFTER INSERT ON tickets
+    FOR EACH ROW EXECUTE FUNCTION notify_ticket_change();
+
+DROP TRIGGER IF EXISTS notify_tickets_update ON tickets;
+CREATE TRIGGER notify_tickets_update
+    AFTER UPDATE ON tickets
+    FOR EACH ROW EXECUTE FUNCTION notify_ticket_change();
+
+DROP TRIGGER IF EXISTS notify_audit_events_insert ON audit_events;
+CREATE TRIGGER notify_audit_events_insert
+    AFTER INSERT ON audit_events
+    FOR EACH ROW EXECUTE FUNCTION notify_audit_event();
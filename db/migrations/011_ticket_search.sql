@@ -0,0 +1,47 @@
+-- =============================================
+-- Ticket search
+-- =============================================
+-- GET /tickets/search (app/services/search.py) ranks tickets by full-text
+-- match on their summary/trade/description and on their messages, plus
+-- trigram (typo-tolerant) match on ticket number and property address.
+-- The documents are stored generated columns, so every insert/update keeps
+-- them current with no triggers or reindex jobs.
+--
+-- Adding a STORED generated column rewrites the table; on a large install
+-- run this migration in a maintenance window.
+-- Keep the expressions in sync with app/models/core.py.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE tickets
+    ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english'::regconfig, coalesce(summary, '')), 'A') ||
+            setweight(to_tsvector('english'::regconfig, coalesce(trade, '')), 'A') ||
+            setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')
+        ) STORED;
+
+ALTER TABLE messages
+    ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+        GENERATED ALWAYS AS (
+            to_tsvector('english'::regconfig, coalesce(subject, '') || ' ' || coalesce(body, ''))
+        ) STORED;
+
+-- Name and street address in one string for word_similarity ("maple st")
+ALTER TABLE properties
+    ADD COLUMN IF NOT EXISTS search_address TEXT
+        GENERATED ALWAYS AS (
+            coalesce(name, '') || ' ' || coalesce(address_line1, '') || ' ' ||
+            coalesce(address_line2, '') || ' ' || coalesce(city, '')
+        ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_tickets_search_vector
+    ON tickets USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_messages_search_vector
+    ON messages USING GIN (search_vector) WHERE ticket_id IS NOT NULL;
+
+-- Trigram indexes serve `%`, `%>` (word similarity) and ILIKE '%...%'
+CREATE INDEX IF NOT EXISTS idx_tickets_ticket_number_trgm
+    ON tickets USING GIN (ticket_number gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_properties_search_address_trgm
+    ON properties USING GIN (search_address gin_trgm_ops);
@@ -0,0 +1,135 @@
+-- =============================================
+-- Dashboard counters
+-- =============================================
+-- GET /stats reads ticket counts from two small tables that triggers on
+-- `tickets` keep current in the same transaction as every insert, status
+-- or priority change and close (ORM writes, transition_ticket, bulk import
+-- alike), so a dashboard refresh costs the same at any ticket volume.
+--
+--   ticket_status_counts   tickets per (client, status, priority)
+--   ticket_hourly_counts   tickets created / closed per (client, hour, priority)
+--
+-- A ticket counts as created in the hour of its created_at under its
+-- current priority (an escalation to emergency moves it), and as closed in
+-- the hour of its closed_at (created_at if a closed ticket has none).
+-- If the counters are ever suspected of drift: SELECT rebuild_ticket_stats();
+
+CREATE TABLE IF NOT EXISTS ticket_status_counts (
+    client_id UUID NOT NULL,
+    status VARCHAR(30) NOT NULL,
+    priority VARCHAR(20) NOT NULL,
+    tickets BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (client_id, status, priority)
+);
+
+CREATE TABLE IF NOT EXISTS ticket_hourly_counts (
+    client_id UUID NOT NULL,
+    bucket TIMESTAMPTZ NOT NULL, -- start of the hour (UTC)
+    priority VARCHAR(20) NOT NULL,
+    created INTEGER NOT NULL DEFAULT 0,
+    closed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (client_id, bucket, priority)
+);
+
+-- Global time-window reads ("emergencies in the last 24h" across clients)
+CREATE INDEX IF NOT EXISTS idx_ticket_hourly_counts_bucket
+    ON ticket_hourly_counts(bucket);
+
+-- Hour bucket in UTC, so every session (whatever its TimeZone) adds and
+-- removes a ticket's contribution on the same row
+CREATE OR REPLACE FUNCTION ticket_stats_bucket(ts TIMESTAMPTZ)
+RETURNS TIMESTAMPTZ AS $$
+    SELECT date_trunc('hour', ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Add (sign = 1) or remove (sign = -1) one ticket row's contribution
+CREATE OR REPLACE FUNCTION ticket_stats_apply(t tickets, sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO ticket_status_counts AS c (client_id, status, priority, tickets)
+    VALUES (t.client_id, t.status, t.priority, sign)
+    ON CONFLICT (client_id, status, priority)
+    DO UPDATE SET tickets = c.tickets + EXCLUDED.tickets;
+
+    INSERT INTO ticket_hourly_counts AS h (client_id, bucket, priority, created)
+    VALUES (t.client_id, ticket_stats_bucket(t.created_at), t.priority, sign)
+    ON CONFLICT (client_id, bucket, priority)
+    DO UPDATE SET created = h.created + EXCLUDED.created;
+
+    IF t.status = 'closed' THEN
+        INSERT INTO ticket_hourly_counts AS h (client_id, bucket, priority, closed)
+        VALUES (t.client_id, ticket_stats_bucket(coalesce(t.closed_at, t.created_at)), t.priority, sign)
+        ON CONFLICT (client_id, bucket, priority)
+        DO UPDATE SET closed = h.closed + EXCLUDED.closed;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION ticket_stats_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM ticket_stats_apply(OLD, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM ticket_stats_apply(NEW, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS ticket_stats_insert_delete ON tickets;
+CREATE TRIGGER ticket_stats_insert_delete
+    AFTER INSERT OR DELETE ON tickets
+    FOR EACH ROW EXECUTE FUNCTION ticket_stats_trigger();
+
+-- Only the columns the counters are keyed on; most updates skip this
+DROP TRIGGER IF EXISTS ticket_stats_update ON tickets;
+CREATE TRIGGER ticket_stats_update
+    AFTER UPDATE ON tickets
+    FOR EACH ROW
+    WHEN (
+        OLD.status IS DISTINCT FROM NEW.status
+        OR OLD.priority IS DISTINCT FROM NEW.priority
+        OR OLD.client_id IS DISTINCT FROM NEW.client_id
+        OR OLD.created_at IS DISTINCT FROM NEW.created_at
+        OR OLD.closed_at IS DISTINCT FROM NEW.closed_at
+    )
+    EXECUTE FUNCTION ticket_stats_trigger();
+
+-- Recompute both tables from `tickets`. Blocks ticket writes meanwhile.
+CREATE OR REPLACE FUNCTION rebuild_ticket_stats()
+RETURNS VOID AS $$
+BEGIN
+    LOCK TABLE tickets IN SHARE MODE;
+    DELETE FROM ticket_status_counts;
+    DELETE FROM ticket_hourly_counts;
+
+    INSERT INTO ticket_status_counts (client_id, status, priority, tickets)
+    SELECT client_id, status, priority, count(*)
+    FROM tickets
+    GROUP BY client_id, status, priority;
+
+    INSERT INTO ticket_hourly_counts (client_id, bucket, priority, created, closed)
+    SELECT client_id, bucket, priority, sum(created), sum(closed)
+    FROM (
+        SELECT client_id, ticket_stats_bucket(created_at) AS bucket, priority, 1 AS created, 0 AS closed
+        FROM tickets
+        UNION ALL
+        SELECT client_id, ticket_stats_bucket(coalesce(closed_at, created_at)), priority, 0, 1
+        FROM tickets
+        WHERE status = 'closed'
+    ) contributions
+    GROUP BY client_id, bucket, priority;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill once, when the counters are first installed (migrations re-run
+-- on every deploy; the triggers keep them current from here on)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM ticket_status_counts) THEN
+        PERFORM rebuild_ticket_stats();
+    END IF;
+END;
+$$;
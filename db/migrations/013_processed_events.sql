@@ -0,0 +1,20 @@
+-- =============================================
+-- Idempotent event ingestion
+-- =============================================
+-- The agent runner's outbox retries a batch after a failure or a lost
+-- response, so events it already delivered can arrive again. Each event
+-- carries its run id; the first delivery records it here in the same
+-- transaction as the event's own writes, and later deliveries are answered
+-- from the stored result instead of being processed twice.
+
+CREATE TABLE IF NOT EXISTS processed_events (
+    run_id VARCHAR(64) PRIMARY KEY,
+    event_type VARCHAR(100) NOT NULL,
+    ticket_id UUID,
+    result JSONB, -- handle_event result, returned to replays
+    processed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Pruning old run ids
+CREATE INDEX IF NOT EXISTS idx_processed_events_processed_at
+    ON processed_events(processed_at);
@@ -0,0 +1,30 @@
+-- =============================================
+-- Bulk import - idempotent invoice and message loads
+-- =============================================
+-- Like import_ticket_map for tickets, these record which source rows a
+-- client's earlier jobs already imported, so loading the same export again
+-- skips them instead of doubling every invoice amount or message. A row's
+-- key is its legacy_id, or for rows without one a hash of its raw fields
+-- (see bulk_import.IMPORT_KEY_COLUMNS).
+
+CREATE TABLE IF NOT EXISTS import_invoice_map (
+    client_id UUID NOT NULL REFERENCES clients(id),
+    import_key TEXT NOT NULL,
+    invoice_id UUID NOT NULL REFERENCES invoices(id),
+    job_id UUID NOT NULL REFERENCES import_jobs(id),
+    PRIMARY KEY (client_id, import_key)
+);
+
+CREATE TABLE IF NOT EXISTS import_message_map (
+    client_id UUID NOT NULL REFERENCES clients(id),
+    import_key TEXT NOT NULL,
+    message_id UUID NOT NULL REFERENCES messages(id),
+    job_id UUID NOT NULL REFERENCES import_jobs(id),
+    PRIMARY KEY (client_id, import_key)
+);
+
+-- Resolved by the load step
+ALTER TABLE import_staging_invoices ADD COLUMN IF NOT EXISTS import_key TEXT;
+ALTER TABLE import_staging_invoices ADD COLUMN IF NOT EXISTS invoice_id UUID;
+ALTER TABLE import_staging_messages ADD COLUMN IF NOT EXISTS import_key TEXT;
+ALTER TABLE import_staging_messages ADD COLUMN IF NOT EXISTS message_id UUID;